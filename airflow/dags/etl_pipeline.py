@@ -1,10 +1,17 @@
+import pandas as pd
 from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from airflow.providers.amazon.aws.operators.lambda_function import LambdaInvokeFunctionOperator
-from src.data.extraction import extract_data
-from src.data.transformation import transform_data
-from src.data.validation import validate_data
+from src.data.artifacts import read_artifact, read_artifact_table, write_artifact
+from src.data.extraction import extract_frame
+from src.data.profiling import check_batch_drift
+from src.data.incremental import WatermarkStore, entity_ids, next_watermark, source_hashes
+from src.data.transformation import transform_frame
+from src.data.validation import validate_frame
+from src.models.inference import InferenceEngine
+from src.models.model_manager import ModelManager
+from src.utils.config import Config
 from src.utils.redis_client import RedisClient
 
 default_args = {
@@ -21,40 +28,109 @@ dag = DAG(
     'ml_etl_pipeline',
     default_args=default_args,
     description='End-to-end ML data pipeline',
-    schedule_interval='@hourly',
+    schedule_interval=None if Config.ETL_PARTITIONED else '@hourly',
     catchup=False,
     tags=['ml', 'etl', 'production']
 )
 
+# Tasks hand data to each other as Arrow artifacts under Config.ARTIFACT_ROOT;
+# only the small reference dict returned by write_artifact goes through XCom.
+
+SOURCE_NAME = 'users'
+
 def extract_task(**context):
     """Extract data from various sources"""
-    data = extract_data()
-    return data
+    metadata = {'timestamp': datetime.now().isoformat()}
+    if Config.INCREMENTAL_ETL:
+        # Only records newer than the last loaded batch; the new mark is
+        # committed by load_to_feature_store once the batch is stored
+        since = WatermarkStore().get(SOURCE_NAME)
+        df = extract_frame(since=since)
+        metadata['watermark'] = next_watermark(df, Config.WATERMARK_COLUMN, since)
+    else:
+        df = extract_frame()
+    return write_artifact(df, 'raw', context['run_id'], metadata)
 
 def transform_task(**context):
     """Transform and clean data"""
     ti = context['ti']
-    raw_data = ti.xcom_pull(task_ids='extract_data')
-    transformed_data = transform_data(raw_data)
-    return transformed_data
+    raw_ref = ti.xcom_pull(task_ids='extract_data')
+    if raw_ref['rows'] == 0:
+        # Nothing new since the last watermark
+        return dict(raw_ref, feature_names=[])
+    # Reuse the transformer registered with the serving model so batch
+    # encodings match what /predict applies online
+    transformer = RedisClient().load_transformer(Config.DEFAULT_MODEL_NAME)
+    raw = read_artifact(raw_ref)
+    features = transform_frame(raw, transformer=transformer)
+    metadata = {
+        'timestamp': raw_ref['timestamp'],
+        'feature_names': features.columns.tolist(),
+        'watermark': raw_ref.get('watermark')
+    }
+    # Entity ids let the feature store answer point-in-time lookups; the
+    # content hashes drive incremental upserts
+    if Config.ENTITY_KEY_COLUMN in raw.columns:
+        keys = pd.DataFrame({'entity_id': entity_ids(raw, features).astype(str).to_numpy()})
+        if Config.INCREMENTAL_ETL:
+            keys['content_hash'] = source_hashes(raw, features)
+        metadata['keys'] = write_artifact(keys, 'keys', context['run_id'])
+    return write_artifact(features, 'features', context['run_id'], metadata)
 
 def validate_task(**context):
     """Validate data quality using Great Expectations"""
     ti = context['ti']
-    data = ti.xcom_pull(task_ids='transform_data')
-    validation_result = validate_data(data)
+    ref = ti.xcom_pull(task_ids='transform_data')
+    if ref['rows'] == 0:
+        return {'success': True, 'timestamp': ref['timestamp'], 'rows': 0}
+    validation_result = validate_frame(read_artifact(ref), ref['timestamp'])
     if not validation_result['success']:
         raise ValueError(f"Data validation failed: {validation_result['errors']}")
-    return validation_result
+    
+    # Profile the raw batch (transformed features are rescaled per fit, which
+    # hides shifts) and block the load when it has drifted from recent batches
+    raw_ref = ti.xcom_pull(task_ids='extract_data')
+    drift = check_batch_drift(read_artifact_table(raw_ref), ref['timestamp'])
+    if drift['drift_detected'] and Config.DRIFT_BLOCKING:
+        raise ValueError(f"Data drift detected in columns: {drift['drifted_columns']}")
+    return {
+        'success': True,
+        'timestamp': ref['timestamp'],
+        'rows': ref['rows'],
+        'drifted_columns': drift['drifted_columns']
+    }
 
 def load_to_feature_store(**context):
     """Load processed data to Redis feature store"""
     ti = context['ti']
-    data = ti.xcom_pull(task_ids='transform_data')
+    ref = ti.xcom_pull(task_ids='transform_data')
+    
+    if ref['rows'] == 0:
+        return "No new records"
     
     redis_client = RedisClient()
-    redis_client.store_features(data)
-    return "Features stored successfully"
+    keys = read_artifact(ref['keys']) if ref.get('keys') else None
+    if not Config.INCREMENTAL_ETL:
+        redis_client.store_feature_batch(read_artifact(ref), ref['timestamp'],
+                                         entity_ids=keys['entity_id'] if keys is not None else None)
+        return "Features stored successfully"
+    
+    stats = redis_client.store_features_incremental(
+        read_artifact(ref), keys['entity_id'], keys['content_hash'], ref['timestamp']
+    )
+    if ref.get('watermark') is not None:
+        WatermarkStore(redis_client).set(SOURCE_NAME, ref['watermark'])
+    return stats
+
+def precompute_predictions_task(**context):
+    """Score the batch just loaded so /predict/batch serves it as a lookup"""
+    ref = context['ti'].xcom_pull(task_ids='transform_data')
+    if ref['rows'] == 0 or Config.INCREMENTAL_ETL:
+        # Incremental loads are keyed by entity, not by {timestamp}:{i} feature ids
+        return None
+    redis_client = RedisClient()
+    engine = InferenceEngine(redis_client, ModelManager(redis_client))
+    return engine.precompute_predictions(read_artifact(ref), ref['timestamp'], Config.DEFAULT_MODEL_NAME)
 
 # Define tasks
 extract_data_task = PythonOperator(
@@ -79,7 +155,8 @@ validate_data_task = PythonOperator(
 lambda_process_task = LambdaInvokeFunctionOperator(
     task_id='lambda_process',
     function_name='data-processor-lambda',
-    payload='{{ ti.xcom_pull(task_ids="transform_data") }}',
+    # The Lambda reads the artifact itself, so ARTIFACT_ROOT must be an s3:// URI
+    payload='{{ ti.xcom_pull(task_ids="transform_data") | tojson }}',
     dag=dag
 )
 
@@ -92,3 +169,11 @@ load_features_task = PythonOperator(
 # Set task dependencies
 extract_data_task >> transform_data_task >> validate_data_task
 validate_data_task >> [lambda_process_task, load_features_task]
+
+if Config.PRECOMPUTE_PREDICTIONS:
+    precompute_predictions = PythonOperator(
+        task_id='precompute_predictions',
+        python_callable=precompute_predictions_task,
+        dag=dag
+    )
+    load_features_task >> precompute_predictions
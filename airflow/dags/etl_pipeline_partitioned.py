@@ -0,0 +1,225 @@
+from datetime import datetime, timedelta
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from src.data.artifacts import read_artifact, write_artifact, write_state
+from src.data.extraction import extract_frame
+from src.data.incremental import WatermarkStore, next_watermark
+from src.data.partitioning import (
+    fit_partition, merge_partition_states, merge_profiles, merge_scaler_states, profile_partition,
+    scale_partition, split_into_partitions, transform_partition
+)
+from src.data.profiling import check_profile_drift
+from src.data.validation import validate_frame
+from src.models.inference import InferenceEngine
+from src.models.model_manager import ModelManager
+from src.utils.config import Config
+from src.utils.redis_client import RedisClient
+
+default_args = {
+    'owner': 'data-team',
+    'depends_on_past': False,
+    'start_date': datetime(2024, 1, 1),
+    'email_on_failure': True,
+    'email_on_retry': False,
+    'retries': 2,
+    'retry_delay': timedelta(minutes=5)
+}
+
+# Same pipeline as ml_etl_pipeline, fanned out over ETL_PARTITIONS partitions
+# with dynamic task mapping. Only one of the two DAGs is scheduled, chosen by
+# ETL_PARTITIONED.
+dag = DAG(
+    'ml_etl_pipeline_partitioned',
+    default_args=default_args,
+    description='Partition-parallel ML data pipeline',
+    schedule_interval='@hourly' if Config.ETL_PARTITIONED else None,
+    catchup=False,
+    tags=['ml', 'etl', 'production', 'partitioned']
+)
+
+SOURCE_NAME = 'users'
+
+def extract_task(**context):
+    """Extract data from various sources"""
+    metadata = {'timestamp': datetime.now().isoformat()}
+    if Config.INCREMENTAL_ETL:
+        since = WatermarkStore().get(SOURCE_NAME)
+        df = extract_frame(since=since)
+        metadata['watermark'] = next_watermark(df, Config.WATERMARK_COLUMN, since)
+    else:
+        df = extract_frame()
+    return write_artifact(df, 'raw', context['run_id'], metadata)
+
+def split_task(**context):
+    """Split the raw batch; each returned dict becomes one mapped task's kwargs"""
+    raw_ref = context['ti'].xcom_pull(task_ids='extract_data')
+    if raw_ref['rows'] == 0:
+        return []
+    return split_into_partitions(raw_ref, context['run_id'])
+
+def fit_partition_task(raw_ref, index, **context):
+    """Map: partial statistics of one partition"""
+    if RedisClient().load_transformer(Config.DEFAULT_MODEL_NAME) is not None:
+        # The registered transformer is used as is; nothing to fit
+        return None
+    return fit_partition(raw_ref, index, context['run_id'])
+
+def merge_statistics_task(**context):
+    """Reduce: one transformer with global scaler moments and vocabularies"""
+    transformer = RedisClient().load_transformer(Config.DEFAULT_MODEL_NAME)
+    if transformer is not None:
+        return write_state(transformer, 'transformer', context['run_id'])
+    state_refs = context['ti'].xcom_pull(task_ids='fit_partition')
+    return merge_partition_states(state_refs, context['run_id'])
+
+def scale_partition_task(raw_ref, index, **context):
+    """Map: scaler moments of one partition in the merged category codes"""
+    if RedisClient().load_transformer(Config.DEFAULT_MODEL_NAME) is not None:
+        return None
+    transformer_ref = context['ti'].xcom_pull(task_ids='merge_statistics')
+    return scale_partition(raw_ref, index, context['run_id'], transformer_ref)
+
+def merge_scalers_task(**context):
+    """Reduce: the merged transformer with scaler moments over the global codes"""
+    ti = context['ti']
+    transformer_ref = ti.xcom_pull(task_ids='merge_statistics')
+    moment_refs = [ref for ref in ti.xcom_pull(task_ids='scale_partition') if ref is not None]
+    if not moment_refs:
+        # The registered transformer is used as is
+        return transformer_ref
+    return merge_scaler_states(transformer_ref, moment_refs, context['run_id'])
+
+def transform_partition_task(raw_ref, index, **context):
+    """Map: transform one partition with the merged transformer"""
+    transformer_ref = context['ti'].xcom_pull(task_ids='merge_scalers')
+    return transform_partition(raw_ref, index, context['run_id'], transformer_ref,
+                               incremental=Config.INCREMENTAL_ETL)
+
+def validate_partition_task(features_ref, raw_ref, index, **context):
+    """Map: rule validation and a mergeable profile of one partition"""
+    validation_result = validate_frame(read_artifact(features_ref), features_ref['timestamp'])
+    if not validation_result['success']:
+        raise ValueError(f"Data validation failed in partition {index}: {validation_result['errors']}")
+    return profile_partition(raw_ref, index, context['run_id'])
+
+def drift_gate_task(**context):
+    """Reduce: merge partition profiles and block the load on drift"""
+    ti = context['ti']
+    profile_refs = ti.xcom_pull(task_ids='validate_partition')
+    timestamp = ti.xcom_pull(task_ids='extract_data')['timestamp']
+    drift = check_profile_drift(merge_profiles(profile_refs), timestamp)
+    if drift['drift_detected'] and Config.DRIFT_BLOCKING:
+        raise ValueError(f"Data drift detected in columns: {drift['drifted_columns']}")
+    return {'success': True, 'timestamp': timestamp, 'drifted_columns': drift['drifted_columns']}
+
+def load_partition_task(features_ref, raw_ref, index, **context):
+    """Map: load one partition into the feature store"""
+    redis_client = RedisClient()
+    keys = read_artifact(features_ref['keys']) if features_ref.get('keys') else None
+    if not Config.INCREMENTAL_ETL:
+        redis_client.store_feature_batch(read_artifact(features_ref), f"{features_ref['timestamp']}:p{index}",
+                                         entity_ids=keys['entity_id'] if keys is not None else None)
+        return {'rows': features_ref['rows']}
+    return redis_client.store_features_incremental(
+        read_artifact(features_ref), keys['entity_id'], keys['content_hash'], features_ref['timestamp']
+    )
+
+def precompute_partition_task(features_ref, raw_ref, index, **context):
+    """Map: score one loaded partition so /predict/batch serves it as a lookup"""
+    if Config.INCREMENTAL_ETL:
+        # Incremental loads are keyed by entity, not by batch feature ids
+        return None
+    redis_client = RedisClient()
+    engine = InferenceEngine(redis_client, ModelManager(redis_client))
+    return engine.precompute_predictions(read_artifact(features_ref), f"{features_ref['timestamp']}:p{index}",
+                                         Config.DEFAULT_MODEL_NAME)
+
+def commit_watermark_task(**context):
+    """Advance the watermark once every partition is loaded"""
+    raw_ref = context['ti'].xcom_pull(task_ids='extract_data')
+    if Config.INCREMENTAL_ETL and raw_ref.get('watermark') is not None:
+        WatermarkStore().set(SOURCE_NAME, raw_ref['watermark'])
+
+extract_data_task = PythonOperator(
+    task_id='extract_data',
+    python_callable=extract_task,
+    dag=dag
+)
+
+split_data_task = PythonOperator(
+    task_id='split_partitions',
+    python_callable=split_task,
+    dag=dag
+)
+
+fit_partitions = PythonOperator.partial(
+    task_id='fit_partition',
+    python_callable=fit_partition_task,
+    max_active_tis_per_dag=Config.ETL_MAX_ACTIVE_PARTITIONS,
+    dag=dag
+).expand(op_kwargs=split_data_task.output)
+
+merge_statistics = PythonOperator(
+    task_id='merge_statistics',
+    python_callable=merge_statistics_task,
+    dag=dag
+)
+
+scale_partitions = PythonOperator.partial(
+    task_id='scale_partition',
+    python_callable=scale_partition_task,
+    max_active_tis_per_dag=Config.ETL_MAX_ACTIVE_PARTITIONS,
+    dag=dag
+).expand(op_kwargs=split_data_task.output)
+
+merge_scalers = PythonOperator(
+    task_id='merge_scalers',
+    python_callable=merge_scalers_task,
+    dag=dag
+)
+
+transform_partitions = PythonOperator.partial(
+    task_id='transform_partition',
+    python_callable=transform_partition_task,
+    max_active_tis_per_dag=Config.ETL_MAX_ACTIVE_PARTITIONS,
+    dag=dag
+).expand(op_kwargs=split_data_task.output)
+
+validate_partitions = PythonOperator.partial(
+    task_id='validate_partition',
+    python_callable=validate_partition_task,
+    max_active_tis_per_dag=Config.ETL_MAX_ACTIVE_PARTITIONS,
+    dag=dag
+).expand(op_kwargs=transform_partitions.output)
+
+drift_gate = PythonOperator(
+    task_id='drift_gate',
+    python_callable=drift_gate_task,
+    dag=dag
+)
+
+load_partitions = PythonOperator.partial(
+    task_id='load_partition',
+    python_callable=load_partition_task,
+    max_active_tis_per_dag=Config.ETL_MAX_ACTIVE_PARTITIONS,
+    dag=dag
+).expand(op_kwargs=transform_partitions.output)
+
+commit_watermark = PythonOperator(
+    task_id='commit_watermark',
+    python_callable=commit_watermark_task,
+    dag=dag
+)
+
+extract_data_task >> split_data_task >> fit_partitions >> merge_statistics >> scale_partitions
+scale_partitions >> merge_scalers >> transform_partitions
+transform_partitions >> validate_partitions >> drift_gate >> load_partitions >> commit_watermark
+
+if Config.PRECOMPUTE_PREDICTIONS:
+    precompute_partitions = PythonOperator.partial(
+        task_id='precompute_predictions',
+        python_callable=precompute_partition_task,
+        max_active_tis_per_dag=Config.ETL_MAX_ACTIVE_PARTITIONS,
+        dag=dag
+    ).expand(op_kwargs=transform_partitions.output)
+    load_partitions >> precompute_partitions
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+from src.utils.config import Config
+from src.utils.feature_store import BucketedFeatureStore
+
+default_args = {
+    'owner': 'data-team',
+    'depends_on_past': False,
+    'start_date': datetime(2024, 1, 1),
+    'email_on_failure': True,
+    'email_on_retry': False,
+    'retries': 1,
+    'retry_delay': timedelta(minutes=5)
+}
+
+dag = DAG(
+    'feature_store_compaction',
+    default_args=default_args,
+    description='Prune expired feature buckets and fold per-row keys into buckets',
+    schedule_interval='@hourly',
+    catchup=False,
+    max_active_runs=1,
+    tags=['ml', 'feature-store', 'maintenance']
+)
+
+def compact_task(**context):
+    """Compact the bucketed feature store"""
+    # Per-row keys are only migrated once the loaders write buckets
+    return BucketedFeatureStore().compact(migrate=Config.FEATURE_LAYOUT == 'buckets')
+
+compact_feature_store_task = PythonOperator(
+    task_id='compact_feature_store',
+    python_callable=compact_task,
+    dag=dag
+)
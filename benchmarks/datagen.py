@@ -0,0 +1,64 @@
+"""Synthetic raw batches shaped like the ``users`` source
+
+Columns are ``user_id`` (unique int64), ``feature_1..feature_{numeric}``
+(floats), ``category_1..category_{categorical}`` (strings drawn from
+``cardinality`` values) and an ISO ``timestamp``. Numeric and categorical
+values are nulled at ``null_rate``; the same arguments always give the same
+frame, so separate processes can rebuild a batch instead of shipping it.
+
+    python -m benchmarks.datagen --rows 1000000 --output users.parquet
+"""
+import argparse
+import sys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def parse_size(value: str) -> int:
+    """``"10k"``, ``"1M"``, ``"10M"`` or a plain integer -> rows"""
+    value = value.strip()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1:].lower(), 1)
+    return int(float(value[:-1] if multiplier > 1 else value) * multiplier)
+
+
+def make_frame(rows: int, numeric: int = 8, categorical: int = 2, cardinality: int = 50,
+               null_rate: float = 0.05, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data: Dict[str, Any] = {'user_id': np.arange(rows, dtype=np.int64)}
+    for i in range(1, numeric + 1):
+        values = rng.normal(loc=i * 10.0, scale=i, size=rows).round(4)
+        values[rng.random(rows) < null_rate] = np.nan
+        data[f'feature_{i}'] = values
+    vocabulary = np.array([f'value_{j:05d}' for j in range(cardinality)], dtype=object)
+    for i in range(1, categorical + 1):
+        values = vocabulary[rng.integers(0, cardinality, rows)]
+        values[rng.random(rows) < null_rate] = None
+        data[f'category_{i}'] = values
+    start = np.datetime64('2024-01-01T00:00:00')
+    data['timestamp'] = (start + rng.integers(0, 30 * 24 * 3600, rows).astype('timedelta64[s]')).astype(str)
+    return pd.DataFrame(data)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic raw batch")
+    parser.add_argument("--rows", type=parse_size, default=parse_size("10k"))
+    parser.add_argument("--numeric", type=int, default=8)
+    parser.add_argument("--categorical", type=int, default=2)
+    parser.add_argument("--cardinality", type=int, default=50)
+    parser.add_argument("--null-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="Parquet (.parquet) or CSV file")
+    args = parser.parse_args(argv)
+
+    df = make_frame(args.rows, args.numeric, args.categorical, args.cardinality, args.null_rate, args.seed)
+    if args.output.endswith('.parquet'):
+        df.to_parquet(args.output, index=False)
+    else:
+        df.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Time and peak memory of each ETL stage, checked against stored baselines
+
+For every size, a synthetic batch (``benchmarks.datagen``) is served by a
+local stub of the ``users`` API running in a separate process, and the
+pipeline functions run in order on it: ``extract_data``, each
+``DataTransformer`` stage, ``transform_data``, ``validate_data`` and
+``RedisClient.store_features`` (into fakeredis unless ``--redis`` is given).
+Peak memory is the tracemalloc peak above what was allocated when the stage
+started, so it covers Python objects and NumPy buffers but not the stub.
+
+Results are compared with ``--baseline``; a stage regresses when it is
+slower or uses more memory than its baseline by more than the tolerance
+(and by more than a small absolute noise floor). The exit code is 1 if any
+stage regressed. Baselines are machine-specific: refresh them with
+``--update-baseline`` on the machine that runs the check. tracemalloc is on
+for the whole run, so timings are only comparable with runs that had it on
+too. ``extract_data``, ``transform_data`` and ``validate_data`` exchange lists
+of row dicts, so 10M rows needs tens of GB of RAM.
+
+    python -m benchmarks.etl_bench --sizes 10k,1M
+    python -m benchmarks.etl_bench --sizes 10k,1M,10M --update-baseline
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from benchmarks.datagen import make_frame, parse_size
+from src.data.extraction import extract_data
+from src.data.transformation import DataTransformer, transform_data
+from src.data.validation import validate_data
+from src.utils.config import Config
+from src.utils.redis_client import RedisClient
+
+TRANSFORMER_STAGES = ("clean_data", "engineer_features", "encode_categorical", "normalize_features")
+STAGES = (("extract_data",) + tuple(f"DataTransformer.{stage}" for stage in TRANSFORMER_STAGES)
+          + ("transform_data", "validate_data", "store_features"))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "etl_bench.json")
+# Differences below these are noise whatever the relative change
+NOISE_FLOOR = {"seconds": 0.01, "peak_mb": 1.0}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    frame: pd.DataFrame = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/users':
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+        if Config.API_PAGE_PARAM in query:
+            size = int(query.get(Config.API_PAGE_SIZE_PARAM, [Config.API_PAGE_SIZE])[0])
+            start = (int(query[Config.API_PAGE_PARAM][0]) - 1) * size
+            part = self.frame.iloc[start:start + size]
+        else:
+            part = self.frame
+        body = part.to_json(orient='records').encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve(frame_args: Dict[str, Any], ready) -> None:
+    _StubHandler.frame = make_frame(**frame_args)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+@contextmanager
+def stub_api(frame_args: Dict[str, Any], startup_timeout: float = 600) -> Iterator[str]:
+    """Serve ``make_frame(**frame_args)`` as ``GET /users`` (paged or whole) from a child process"""
+    context = multiprocessing.get_context('spawn')
+    ready = context.Queue()
+    process = context.Process(target=_serve, args=(frame_args, ready), daemon=True)
+    process.start()
+    try:
+        yield f"http://127.0.0.1:{ready.get(timeout=startup_timeout)}"
+    finally:
+        process.terminate()
+        process.join()
+
+
+@contextmanager
+def _configured(**values) -> Iterator[None]:
+    original = {name: getattr(Config, name) for name in values}
+    for name, value in values.items():
+        setattr(Config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in original.items():
+            setattr(Config, name, value)
+
+
+def measure(fn: Callable[[], Any], rows: int) -> Tuple[Any, Dict[str, Any]]:
+    """Run ``fn`` once; wall time and the tracemalloc peak above the starting allocation"""
+    gc.collect()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] - start_bytes
+    return result, {
+        "seconds": seconds,
+        "peak_mb": peak / 2 ** 20,
+        "rows_per_sec": rows / seconds if seconds else None
+    }
+
+
+def _redis_client(use_redis: bool) -> RedisClient:
+    redis_client = RedisClient()
+    if not use_redis:
+        import fakeredis
+        redis_client.client = fakeredis.FakeRedis(decode_responses=True)
+    return redis_client
+
+
+def run_size(rows: int, frame_args: Dict[str, Any], page_size: int = 10000, use_redis: bool = False,
+             stages: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run every stage once on a batch of ``rows``; stages not in ``stages`` still run but are not reported"""
+    results: Dict[str, Dict[str, Any]] = {}
+
+    with stub_api(dict(frame_args, rows=rows)) as url, \
+            _configured(API_BASE_URL=url, API_PAGINATED=True, API_PAGE_SIZE=page_size):
+        raw, results["extract_data"] = measure(extract_data, rows)
+
+    df = pd.DataFrame(raw['api_data'])
+    transformer = DataTransformer()
+    for stage in TRANSFORMER_STAGES:
+        df, results[f"DataTransformer.{stage}"] = measure(lambda: getattr(transformer, stage)(df), rows)
+    del df, transformer
+
+    features, results["transform_data"] = measure(lambda: transform_data(raw), rows)
+    del raw
+    validation, results["validate_data"] = measure(lambda: validate_data(features), rows)
+
+    redis_client = _redis_client(use_redis)
+    # Short TTL so a real Redis gets rid of the rows on its own
+    _, results["store_features"] = measure(lambda: redis_client.store_features(features, ttl=300), rows)
+    if use_redis:
+        keys = list(redis_client.client.scan_iter(match=f"features:{features['timestamp']}:*", count=1000))
+        for start in range(0, len(keys), 1000):
+            redis_client.client.unlink(*keys[start:start + 1000])
+        redis_client.client.unlink(f"metadata:{features['timestamp']}")
+
+    return {
+        "rows": rows,
+        "validation_success": validation['success'],
+        "stages": {stage: results[stage] for stage in STAGES if not stages or stage in stages}
+    }
+
+
+def run_benchmark(sizes: List[int], numeric: int = 8, categorical: int = 2, cardinality: int = 50,
+                  null_rate: float = 0.05, page_size: int = 10000, use_redis: bool = False,
+                  stages: Optional[List[str]] = None) -> Dict[str, Any]:
+    frame_args = {"numeric": numeric, "categorical": categorical, "cardinality": cardinality,
+                  "null_rate": null_rate}
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        runs = {str(rows): run_size(rows, frame_args, page_size, use_redis, stages) for rows in sizes}
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "data": frame_args,
+        "store": "redis" if use_redis else "fakeredis",
+        "sizes": runs
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], time_tolerance: float = 0.5,
+            memory_tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """Stages whose time or peak memory exceeds the baseline by more than the tolerance
+
+    Sizes and stages missing from the baseline are not checked.
+    """
+    tolerances = {"seconds": time_tolerance, "peak_mb": memory_tolerance}
+    regressions = []
+    for size, run in report["sizes"].items():
+        expected_stages = baseline.get("sizes", {}).get(size, {}).get("stages", {})
+        for stage, measured in run["stages"].items():
+            expected = expected_stages.get(stage)
+            if not expected:
+                continue
+            for metric, tolerance in tolerances.items():
+                if expected.get(metric) is None:
+                    continue
+                limit = max(expected[metric] * (1 + tolerance), expected[metric] + NOISE_FLOOR[metric])
+                if measured[metric] > limit:
+                    regressions.append({
+                        "size": size,
+                        "stage": stage,
+                        "metric": metric,
+                        "baseline": expected[metric],
+                        "current": measured[metric],
+                        "ratio": measured[metric] / expected[metric] if expected[metric] else None
+                    })
+    return regressions
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def update_baseline(path: str, report: Dict[str, Any]) -> None:
+    """Replace the baseline of every size in ``report``, keeping the other sizes"""
+    baseline = load_baseline(path)
+    sizes = baseline.get("sizes", {})
+    for size, run in report["sizes"].items():
+        sizes[size] = {"stages": {
+            stage: {"seconds": round(measured["seconds"], 4), "peak_mb": round(measured["peak_mb"], 2)}
+            for stage, measured in run["stages"].items()
+        }}
+    baseline.update({"environment": report["environment"], "data": report["data"], "store": report["store"],
+                     "sizes": dict(sorted(sizes.items(), key=lambda item: int(item[0])))})
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ETL stages and check them against baselines")
+    parser.add_argument("--sizes", default="10k", help="Comma-separated row counts, e.g. 10k,1M,10M")
+    parser.add_argument("--numeric", type=int, default=8)
+    parser.add_argument("--categorical", type=int, default=2)
+    parser.add_argument("--cardinality", type=int, default=50)
+    parser.add_argument("--null-rate", type=float, default=0.05)
+    parser.add_argument("--page-size", type=int, default=10000, help="Rows per page served by the stub API")
+    parser.add_argument("--stages", help="Comma-separated stages to report (all run regardless)")
+    parser.add_argument("--redis", action="store_true", help="Store into REDIS_HOST instead of fakeredis")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="Allowed relative slowdown")
+    parser.add_argument("--memory-tolerance", type=float, default=0.2, help="Allowed relative peak memory growth")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        [parse_size(size) for size in args.sizes.split(',') if size.strip()],
+        args.numeric, args.categorical, args.cardinality, args.null_rate, args.page_size, args.redis,
+        args.stages.split(',') if args.stages else None
+    )
+    if args.update_baseline:
+        update_baseline(args.baseline, report)
+        report["regressions"] = []
+    else:
+        report["regressions"] = compare(report, load_baseline(args.baseline),
+                                        args.time_tolerance, args.memory_tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 1 if report["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
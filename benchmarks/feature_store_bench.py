@@ -0,0 +1,92 @@
+"""Redis memory footprint per feature row for each feature store layout
+
+Writes the same synthetic batch as per-row keys (``store_feature_frame``),
+as one hash per batch and as bucket hashes of ``FEATURE_BUCKET_ROWS`` rows,
+and reports bytes/row from ``MEMORY USAGE`` and from the ``used_memory``
+delta (which also counts the expires dictionary). Needs a real Redis at
+REDIS_HOST/REDIS_PORT; every key written is deleted afterwards.
+
+    python -m benchmarks.feature_store_bench --rows 100000 --columns 8
+"""
+import argparse
+import json
+import sys
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import Config
+from src.utils.feature_store import BucketedFeatureStore
+from src.utils.redis_client import RedisClient
+
+
+def make_frame(rows: int, columns: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(size=(rows, columns)).round(4),
+                        columns=[f'feature_{i}' for i in range(columns)])
+
+
+def _measure(redis_client: RedisClient, pattern: str, write: Callable[[], Any], rows: int) -> Dict[str, Any]:
+    client = redis_client.client
+    before = client.info('memory')['used_memory']
+    write()
+    after = client.info('memory')['used_memory']
+
+    keys = list(client.scan_iter(match=pattern, count=1000))
+    usage = sum(client.memory_usage(key, samples=0) or 0 for key in keys)
+    encodings = sorted({client.object('encoding', key) for key in keys[:100]})
+    for start in range(0, len(keys), 1000):
+        client.unlink(*keys[start:start + 1000])
+    return {
+        'keys': len(keys),
+        'memory_usage_bytes_per_row': usage / rows,
+        'used_memory_bytes_per_row': (after - before) / rows,
+        'encodings': encodings
+    }
+
+
+def run_benchmark(rows: int, columns: int, bucket_rows: Optional[int] = None) -> Dict[str, Any]:
+    redis_client = RedisClient()
+    df = make_frame(rows, columns)
+    bucket_rows = bucket_rows or Config.FEATURE_BUCKET_ROWS
+    run = uuid.uuid4().hex[:8]
+    timestamp = pd.Timestamp.now().isoformat()
+
+    layouts = {
+        'keys': (f'features:bench-{run}:*',
+                 lambda: redis_client.store_feature_frame(df, f'bench-{run}')),
+        'batch_hash': (f'bench-batch-{run}:*',
+                       lambda: BucketedFeatureStore(redis_client, bucket_rows=rows,
+                                                    prefix=f'bench-batch-{run}').store_frame(df, timestamp)),
+        'buckets': (f'bench-bucket-{run}:*',
+                    lambda: BucketedFeatureStore(redis_client, bucket_rows=bucket_rows,
+                                                 prefix=f'bench-bucket-{run}').store_frame(df, timestamp))
+    }
+    report: Dict[str, Any] = {'rows': rows, 'columns': columns, 'bucket_rows': bucket_rows}
+    for name, (pattern, write) in layouts.items():
+        report[name] = _measure(redis_client, pattern, write, rows)
+    redis_client.client.delete(f'metadata:bench-{run}')
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare feature store layouts by Redis memory per row")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--columns", type=int, default=8)
+    parser.add_argument("--bucket-rows", type=int, help="Rows per bucket (default FEATURE_BUCKET_ROWS)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    output = json.dumps(run_benchmark(args.rows, args.columns, args.bucket_rows), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
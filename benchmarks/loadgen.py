@@ -0,0 +1,301 @@
+"""Load generator and capacity report for the inference API
+
+Drives the FastAPI app either in-process (ASGI transport) or over HTTP and
+reports throughput, latency percentiles and error rate as JSON.
+
+    python -m benchmarks.loadgen --target inprocess --fake-redis --mode closed --concurrency 16
+    python -m benchmarks.loadgen --target http://localhost:8000 --mode rate --rate 200
+    python -m benchmarks.loadgen --target inprocess --fake-redis --find-saturation --slo-ms 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+DEFAULT_MIX = "predict=0.7,batch=0.2,features=0.1"
+FEATURE_NAMES = ['feature_1', 'feature_2', 'feature_3', 'feature_4']
+SEED_TIMESTAMP = "2024-01-01T00:00:00"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse a payload mix such as ``predict=0.7,batch=0.2,features=0.1``"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in REQUEST_BUILDERS:
+            raise ValueError(f"Unknown request type in mix: {name!r}")
+        weights[name] = float(weight or 1)
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError("Payload mix must contain at least one positive weight")
+    return weights
+
+
+def _predict_request(rng: random.Random, batch_size: int) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+    features = {name: rng.random() for name in FEATURE_NAMES}
+    return "POST", "/predict", {"features": features}
+
+
+def _batch_request(rng: random.Random, batch_size: int) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+    ids = [str(rng.randrange(batch_size * 10)) for _ in range(batch_size)]
+    return "POST", "/predict/batch", {"feature_ids": ids}
+
+
+def _features_request(rng: random.Random, batch_size: int) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+    return "GET", "/features/latest?limit=10", None
+
+
+REQUEST_BUILDERS: Dict[str, Callable] = {
+    "predict": _predict_request,
+    "batch": _batch_request,
+    "features": _features_request,
+}
+
+
+def install_fake_redis(seed_rows: int = 1000) -> Callable[[], None]:
+    """Back the in-process app with fakeredis and seed a model and features
+
+    Returns a callable that puts the original Redis clients and model cache back.
+    """
+    import fakeredis
+    from sklearn.linear_model import LinearRegression
+    from src.api import main
+
+    original_client = main.redis_client.client
+    original_binary_client = main.redis_client.binary_client
+    original_models = dict(main.model_manager.loaded_models)
+
+    def restore() -> None:
+        main.redis_client.client = original_client
+        main.redis_client.binary_client = original_binary_client
+        main.model_manager.loaded_models.clear()
+        main.model_manager.loaded_models.update(original_models)
+
+    server = fakeredis.FakeServer()
+    main.redis_client.client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    main.redis_client.binary_client = fakeredis.FakeRedis(server=server, decode_responses=False)
+    main.model_manager.loaded_models.clear()
+
+    rng = np.random.default_rng(0)
+    X = rng.random((seed_rows, len(FEATURE_NAMES)))
+    model = LinearRegression().fit(X, X @ np.arange(1, len(FEATURE_NAMES) + 1))
+    main.redis_client.store_model("default", model, version="v1")
+
+    main.redis_client.store_features({
+        'features': [dict(zip(FEATURE_NAMES, row)) for row in X.tolist()],
+        'feature_names': FEATURE_NAMES,
+        'timestamp': SEED_TIMESTAMP
+    }, ttl=24 * 3600)
+
+    return restore
+
+
+def make_client(target: str, timeout: float) -> httpx.AsyncClient:
+    if target == "inprocess":
+        from src.api.main import app
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://loadgen", timeout=timeout)
+    return httpx.AsyncClient(base_url=target, timeout=timeout)
+
+
+class LoadGenerator:
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float],
+                 batch_size: int = 10, seed: int = 0):
+        self.client = client
+        self.kinds = list(mix)
+        self.weights = [mix[kind] for kind in self.kinds]
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+
+    async def _send(self, samples: List[Tuple[str, float, bool]], started: Optional[float] = None) -> None:
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        method, path, payload = REQUEST_BUILDERS[kind](self.rng, self.batch_size)
+        # Open-loop requests are timed from their scheduled start so queueing
+        # delay in the generator is not hidden (coordinated omission)
+        start = started if started is not None else time.perf_counter()
+        try:
+            response = await self.client.request(method, path, json=payload)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        samples.append((kind, time.perf_counter() - start, ok))
+
+    async def run_closed_loop(self, concurrency: int, duration: float) -> Dict[str, Any]:
+        """Each of ``concurrency`` workers sends its next request as soon as the last completes"""
+        samples: List[Tuple[str, float, bool]] = []
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self._send(samples)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        report = summarize(samples, time.perf_counter() - start)
+        report.update({"mode": "closed", "concurrency": concurrency})
+        return report
+
+    async def run_constant_rate(self, rate: float, duration: float,
+                                max_in_flight: int = 1000) -> Dict[str, Any]:
+        """Issue requests on a fixed schedule regardless of response times"""
+        samples: List[Tuple[str, float, bool]] = []
+        interval = 1.0 / rate
+        total = int(rate * duration)
+        in_flight = asyncio.Semaphore(max_in_flight)
+        tasks = []
+
+        async def fire(scheduled: float):
+            async with in_flight:
+                await self._send(samples, started=scheduled)
+
+        start = time.perf_counter()
+        for i in range(total):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(fire(scheduled)))
+        await asyncio.gather(*tasks)
+
+        report = summarize(samples, time.perf_counter() - start)
+        report.update({"mode": "rate", "target_rate": rate})
+        return report
+
+    async def find_saturation(self, start_rate: float, duration: float, slo_ms: float,
+                              max_error_rate: float = 0.01, step_factor: float = 1.5,
+                              max_rate: float = 100000) -> Dict[str, Any]:
+        """Step the offered rate up until throughput, p99 or error rate break down"""
+        steps = []
+        saturation_rate = None
+        rate = start_rate
+
+        while rate <= max_rate:
+            report = await self.run_constant_rate(rate, duration)
+            healthy = (
+                report["throughput"] >= 0.9 * rate
+                and report["latency_ms"]["p99"] <= slo_ms
+                and report["error_rate"] <= max_error_rate
+            )
+            report["healthy"] = healthy
+            steps.append(report)
+            if not healthy:
+                break
+            saturation_rate = rate
+            rate *= step_factor
+
+        return {
+            "mode": "saturation",
+            "slo_ms": slo_ms,
+            "max_error_rate": max_error_rate,
+            "saturation_rate": saturation_rate,
+            "steps": steps
+        }
+
+
+def summarize(samples: List[Tuple[str, float, bool]], elapsed: float) -> Dict[str, Any]:
+    """Aggregate raw samples into throughput, latency and error statistics"""
+    report: Dict[str, Any] = {
+        "requests": len(samples),
+        "elapsed_s": elapsed,
+        "throughput": len(samples) / elapsed if elapsed > 0 else 0.0,
+        "error_rate": 0.0,
+        "latency_ms": _latency_stats([]),
+        "endpoints": {}
+    }
+    if not samples:
+        return report
+
+    kinds = np.array([kind for kind, _, _ in samples])
+    latencies = np.array([latency for _, latency, _ in samples]) * 1000
+    ok = np.array([success for _, _, success in samples])
+
+    report["error_rate"] = float(1 - ok.mean())
+    report["latency_ms"] = _latency_stats(latencies)
+    for kind in np.unique(kinds):
+        mask = kinds == kind
+        report["endpoints"][str(kind)] = {
+            "requests": int(mask.sum()),
+            "error_rate": float(1 - ok[mask].mean()),
+            "latency_ms": _latency_stats(latencies[mask])
+        }
+    return report
+
+
+def _latency_stats(latencies) -> Dict[str, float]:
+    if len(latencies) == 0:
+        return {key: 0.0 for key in ("mean", "p50", "p95", "p99", "p999", "max")}
+    p50, p95, p99, p999 = np.percentile(latencies, [50, 95, 99, 99.9])
+    return {
+        "mean": float(np.mean(latencies)),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "p999": float(p999),
+        "max": float(np.max(latencies))
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.fake_redis:
+        if args.target != "inprocess":
+            raise ValueError("--fake-redis requires --target inprocess")
+        install_fake_redis()
+
+    async with make_client(args.target, args.timeout) as client:
+        generator = LoadGenerator(client, parse_mix(args.mix), args.batch_size, args.seed)
+        if args.find_saturation:
+            report = await generator.find_saturation(
+                args.rate, args.duration, args.slo_ms, args.max_error_rate, args.step_factor
+            )
+        elif args.mode == "closed":
+            report = await generator.run_closed_loop(args.concurrency, args.duration)
+        else:
+            report = await generator.run_constant_rate(args.rate, args.duration)
+
+    report.update({"target": args.target, "mix": parse_mix(args.mix)})
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the inference API")
+    parser.add_argument("--target", default="inprocess",
+                        help="'inprocess' or the base URL of a running API")
+    parser.add_argument("--fake-redis", action="store_true",
+                        help="Back the in-process app with a seeded fakeredis")
+    parser.add_argument("--mode", choices=["closed", "rate"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=50.0,
+                        help="Requests/sec for rate mode, start rate for saturation search")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--find-saturation", action="store_true")
+    parser.add_argument("--slo-ms", type=float, default=100.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--step-factor", type=float, default=1.5)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    # Per-request access logs would dominate the run
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
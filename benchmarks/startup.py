@@ -0,0 +1,146 @@
+"""Cold-start benchmark for the API process and the Lambda processor
+
+Every measurement runs in a fresh interpreter so module caches do not hide
+import cost. Reports the median over ``--repeat`` runs as JSON.
+
+    python -m benchmarks.startup --repeat 5
+"""
+import argparse
+import json
+import os
+import pickle
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+API_IMPORT = """
+import time
+t0 = time.perf_counter()
+import src.api.main
+print(time.perf_counter() - t0)
+"""
+
+# The model pickle is written by the parent so that training it (and the
+# sklearn import that implies) is not counted; unpickling it in the child is.
+API_FIRST_PREDICT = """
+import time
+t0 = time.perf_counter()
+import asyncio
+import fakeredis
+import httpx
+from src.api import main
+
+server = fakeredis.FakeServer()
+main.redis_client.client = fakeredis.FakeRedis(server=server, decode_responses=True)
+main.redis_client.binary_client = fakeredis.FakeRedis(server=server, decode_responses=False)
+with open({model_path!r}, 'rb') as f:
+    main.redis_client.binary_client.set('model:default:v1', f.read())
+main.redis_client.client.set('model:default:latest', 'v1')
+
+async def first_predict():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://startup') as client:
+        response = await client.post('/predict', json={{'features': {{'feature_1': 1.0, 'feature_2': 2.0}}}})
+        assert response.status_code == 200, response.text
+
+asyncio.run(first_predict())
+print(time.perf_counter() - t0)
+"""
+
+LAMBDA_IMPORT = """
+import sys, time
+sys.path.insert(0, 'lambda')
+t0 = time.perf_counter()
+import data_processor
+print(time.perf_counter() - t0)
+"""
+
+LAMBDA_INVOCATIONS = """
+import os, sys, time
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+sys.path.insert(0, 'lambda')
+t0 = time.perf_counter()
+import data_processor
+from botocore.stub import Stubber
+
+stubber = Stubber(data_processor.get_s3_client())
+stubber.add_response('put_object', {})
+stubber.add_response('put_object', {})
+stubber.activate()
+
+event = {'features': [{'feature_1': 1.0, 'feature_2': 2.0}] * 10, 'timestamp': '2024-01-01T00:00:00'}
+assert data_processor.lambda_handler(event, None)['statusCode'] == 200
+t1 = time.perf_counter()
+assert data_processor.lambda_handler(event, None)['statusCode'] == 200
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+"""
+
+
+def _run(script: str) -> List[float]:
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return [float(value) for value in result.stdout.split()]
+
+
+def _write_model(path: str) -> None:
+    import numpy as np
+    from sklearn.linear_model import LinearRegression
+
+    X = np.array([[1.0, 0.0], [2.0, 1.0], [3.0, 0.0]])
+    with open(path, 'wb') as f:
+        pickle.dump(LinearRegression().fit(X, X.sum(axis=1)), f)
+
+
+def _median_ms(samples: List[float]) -> float:
+    return statistics.median(samples) * 1000
+
+
+def run_benchmark(repeat: int = 5) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.pkl')
+        _write_model(model_path)
+
+        api_import = [_run(API_IMPORT)[0] for _ in range(repeat)]
+        api_predict = [_run(API_FIRST_PREDICT.format(model_path=model_path))[0] for _ in range(repeat)]
+        lambda_import = [_run(LAMBDA_IMPORT)[0] for _ in range(repeat)]
+        lambda_runs = [_run(LAMBDA_INVOCATIONS) for _ in range(repeat)]
+
+    return {
+        "repeat": repeat,
+        "api_import_ms": _median_ms(api_import),
+        "api_first_predict_ms": _median_ms(api_predict),
+        "lambda_import_ms": _median_ms(lambda_import),
+        "lambda_cold_invocation_ms": _median_ms([cold for cold, _ in lambda_runs]),
+        "lambda_warm_invocation_ms": _median_ms([warm for _, warm in lambda_runs])
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure API and Lambda cold-start latency")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    output = json.dumps(run_benchmark(args.repeat), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Native rule engine against the Great Expectations backend on the same suite
+
+Builds a synthetic frame, runs the suite with both engines, checks that
+they agree on every expectation and reports wall time as JSON.
+
+    python -m benchmarks.validation_bench --rows 10000000
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.rules import GreatExpectationsBackend, RuleEngine, RuleSuite
+
+SUITE = {
+    'expectation_suite_name': 'benchmark_suite',
+    'expectations': [
+        {'expectation_type': 'expect_table_row_count_to_be_between', 'kwargs': {'min_value': 1}},
+        {'expectation_type': 'expect_column_values_to_not_be_null', 'kwargs': {'column': 'user_id'}},
+        {'expectation_type': 'expect_column_values_to_be_unique', 'kwargs': {'column': 'user_id'}},
+        {'expectation_type': 'expect_column_values_to_be_of_type', 'kwargs': {'column': 'user_id', 'type_': 'int64'}},
+        {'expectation_type': 'expect_column_values_to_not_be_null', 'kwargs': {'column': 'amount', 'mostly': 0.9}},
+        {'expectation_type': 'expect_column_values_to_be_between',
+         'kwargs': {'column': 'amount', 'min_value': 0, 'max_value': 1000}},
+        {'expectation_type': 'expect_column_values_to_be_in_set',
+         'kwargs': {'column': 'country', 'value_set': ['US', 'DE', 'IN', 'BR', 'JP']}},
+        {'expectation_type': 'expect_column_values_to_match_regex',
+         'kwargs': {'column': 'email', 'regex': '^[a-z0-9]+@[a-z]+\\.com$'}}
+    ]
+}
+
+
+def make_frame(rows: int, null_rate: float = 0.01, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    amount = rng.gamma(2.0, 50.0, rows)
+    amount[rng.random(rows) < null_rate] = np.nan
+    countries = np.array(['US', 'DE', 'IN', 'BR', 'JP'], dtype=object)
+    domains = np.array(['@example.com', '@mail.com', '@corp.com'], dtype=object)
+    user_id = np.arange(rows)
+    return pd.DataFrame({
+        'user_id': user_id,
+        'amount': amount,
+        'country': countries[rng.integers(0, len(countries), rows)],
+        'email': pd.Series(user_id).astype(str).to_numpy(dtype=object) + domains[rng.integers(0, len(domains), rows)]
+    })
+
+
+def _timed(engine, df: pd.DataFrame) -> Dict[str, Any]:
+    started = time.perf_counter()
+    result = engine.evaluate(df)
+    return {'seconds': time.perf_counter() - started, 'result': result}
+
+
+def run_benchmark(rows: int, include_gx: bool = True) -> Dict[str, Any]:
+    suite = RuleSuite.from_dict(SUITE)
+    df = make_frame(rows)
+
+    native = _timed(RuleEngine(suite), df)
+    report: Dict[str, Any] = {
+        'rows': rows,
+        'expectations': len(suite.rules),
+        'native_seconds': native['seconds'],
+        'native_rows_per_sec': rows / native['seconds'] if native['seconds'] else None
+    }
+
+    if include_gx:
+        started = time.perf_counter()
+        backend = GreatExpectationsBackend(suite)
+        report['gx_setup_seconds'] = time.perf_counter() - started
+        gx = _timed(backend, df)
+        native_success = {
+            (r['expectation_type'], r['column']): r['success'] for r in native['result']['results']
+        }
+        gx_success = {
+            (r['expectation_config']['type'], r['expectation_config']['kwargs'].get('column')): r['success']
+            for r in gx['result']['results']
+        }
+        report.update({
+            'gx_seconds': gx['seconds'],
+            'gx_rows_per_sec': rows / gx['seconds'] if gx['seconds'] else None,
+            'speedup': gx['seconds'] / native['seconds'] if native['seconds'] else None,
+            'results_agree': native_success == gx_success
+        })
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the validation rule engine")
+    parser.add_argument("--rows", type=int, default=10000000)
+    parser.add_argument("--skip-gx", action="store_true", help="Only time the native engine")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    output = json.dumps(run_benchmark(args.rows, include_gx=not args.skip_gx), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
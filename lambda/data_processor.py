@@ -1,11 +1,36 @@
+import io
 import json
-import boto3
-import pandas as pd
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Iterator, Optional
+
+# Created once per execution environment and reused by warm invocations
+_s3_client = None
+
+PROCESSED_BUCKET = os.getenv('PROCESSED_BUCKET', 'ml-pipeline-processed-data')
+ROLLING_WINDOW = int(os.getenv('ROLLING_WINDOW', '3'))
+STREAM_CHUNK_ROWS = int(os.getenv('STREAM_CHUNK_ROWS', '65536'))
+OUTPUT_COMPRESSION = os.getenv('OUTPUT_COMPRESSION', 'zstd')
+# S3 rejects multipart parts smaller than 5 MiB (except the last one)
+MULTIPART_PART_SIZE = max(int(os.getenv('MULTIPART_PART_SIZE', str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+RANGE_READ_SIZE = int(os.getenv('RANGE_READ_SIZE', str(8 * 1024 * 1024)))
+
+def get_s3_client():
+    """Return the module-level S3 client, creating it on first use"""
+    global _s3_client
+    if _s3_client is None:
+        # boto3 is only imported when results are actually stored
+        import boto3
+        _s3_client = boto3.client('s3')
+    return _s3_client
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     AWS Lambda function for additional data processing
+
+    Small batches may be sent inline as ``{'features': [...]}``. The ETL DAG
+    sends a reference to an object instead (``{'uri': 's3://...'}``); it is
+    read, processed and written back chunk by chunk, so neither the payload
+    limit nor the function's memory bounds the batch size.
     """
     try:
         # Parse input data
@@ -14,6 +39,17 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         else:
             data = event
         
+        if 'uri' in data:
+            result = process_stream(data)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Data processed successfully',
+                    'processed_records': result['rows'],
+                    'output_uri': result['uri']
+                })
+            }
+        
         # Process data
         processed_data = process_data(data)
         
@@ -36,8 +72,28 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             })
         }
 
+def add_rolling_means(df, window: int = ROLLING_WINDOW, history=None):
+    """Append ``{col}_rolling_mean`` for every numeric column in one rolling call
+
+    ``history`` holds the rows preceding ``df`` (the previous chunk's tail),
+    so chunked results match a rolling mean over the whole dataset.
+    """
+    import pandas as pd
+
+    numeric_cols = df.select_dtypes(include=['number']).columns
+    if len(numeric_cols) == 0:
+        return df
+    values = df[numeric_cols]
+    if history is not None and len(history):
+        values = pd.concat([history[numeric_cols], values], ignore_index=True)
+    rolling = values.rolling(window=window, min_periods=1).mean().iloc[len(values) - len(df):]
+    rolling.index = df.index
+    return pd.concat([df, rolling.add_suffix('_rolling_mean')], axis=1)
+
 def process_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """Process the data with additional transformations"""
+    import pandas as pd
+
     features = data.get('features', [])
     
     # Convert to DataFrame for processing
@@ -45,10 +101,7 @@ def process_data(data: Dict[str, Any]) -> Dict[str, Any]:
     
     # Additional processing (aggregations, advanced transformations)
     if not df.empty:
-        # Example: Calculate rolling statistics
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        for col in numeric_cols:
-            df[f'{col}_rolling_mean'] = df[col].rolling(window=3, min_periods=1).mean()
+        df = add_rolling_means(df)
     
     return {
         'features': df.to_dict('records'),
@@ -59,9 +112,9 @@ def process_data(data: Dict[str, Any]) -> Dict[str, Any]:
 def store_results(data: Dict[str, Any]) -> None:
     """Store processed results to AWS services"""
     # Example: Store to S3
-    s3_client = boto3.client('s3')
+    s3_client = get_s3_client()
     
-    bucket_name = 'ml-pipeline-processed-data'
+    bucket_name = PROCESSED_BUCKET
     key = f"processed/{data['timestamp']}.json"
     
     s3_client.put_object(
@@ -70,3 +123,170 @@ def store_results(data: Dict[str, Any]) -> None:
         Body=json.dumps(data),
         ContentType='application/json'
     )
+
+def _split_s3(uri: str):
+    bucket, _, key = uri[len('s3://'):].partition('/')
+    return bucket, key
+
+class S3RangeReader(io.RawIOBase):
+    """Seekable read-only view of an S3 object backed by ranged GETs
+
+    Arrow and Parquet readers only fetch the footer and the batches they
+    decode, so an object can be processed without downloading it whole.
+    """
+
+    def __init__(self, bucket: str, key: str, client=None, block_size: int = RANGE_READ_SIZE):
+        self.bucket = bucket
+        self.key = key
+        self.client = client or get_s3_client()
+        self.block_size = block_size
+        self.size = self.client.head_object(Bucket=bucket, Key=key)['ContentLength']
+        self.position = 0
+        self._block_start = 0
+        self._block = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def readinto(self, buffer) -> int:
+        if self.position >= self.size:
+            return 0
+        offset = self.position - self._block_start
+        if not 0 <= offset < len(self._block):
+            # Read ahead a block so small sequential reads share one GET
+            end = min(self.size, self.position + max(len(buffer), self.block_size)) - 1
+            response = self.client.get_object(Bucket=self.bucket, Key=self.key, Range=f'bytes={self.position}-{end}')
+            self._block_start, self._block = self.position, response['Body'].read()
+            offset = 0
+        n = min(len(buffer), len(self._block) - offset)
+        buffer[:n] = self._block[offset:offset + n]
+        self.position += n
+        return n
+
+class MultipartUploadWriter(io.RawIOBase):
+    """Write-only file that streams into an S3 multipart upload
+
+    At most one part is buffered; ``close`` completes the upload and
+    ``abort`` discards it so no orphaned parts are left behind.
+    """
+
+    def __init__(self, bucket: str, key: str, client=None, part_size: int = MULTIPART_PART_SIZE,
+                 content_type: str = 'application/octet-stream'):
+        self.bucket = bucket
+        self.key = key
+        self.client = client or get_s3_client()
+        self.part_size = part_size
+        self.upload_id = self.client.create_multipart_upload(
+            Bucket=bucket, Key=key, ContentType=content_type
+        )['UploadId']
+        self.parts = []
+        self.written = 0
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.written
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self.written += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+
+    def _upload_part(self, body: bytes) -> None:
+        number = len(self.parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=body
+        )
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': number})
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self._buffer or not self.parts:
+            self._upload_part(bytes(self._buffer))
+            self._buffer.clear()
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, MultipartUpload={'Parts': self.parts}
+        )
+        super().close()
+
+    def abort(self) -> None:
+        if not self.closed:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+            super().close()
+
+def iter_batches(uri: str, chunk_rows: int = STREAM_CHUNK_ROWS, client=None) -> Iterator[Any]:
+    """Yield ``pyarrow.RecordBatch`` chunks of an Arrow IPC or Parquet object"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    bucket, key = _split_s3(uri)
+    source = S3RangeReader(bucket, key, client)
+    if key.endswith('.parquet'):
+        yield from pq.ParquetFile(source).iter_batches(batch_size=chunk_rows)
+        return
+    reader = pa.ipc.open_file(source)
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        for offset in range(0, batch.num_rows, chunk_rows):
+            yield batch.slice(offset, chunk_rows)
+
+def process_stream(ref: Dict[str, Any], window: int = ROLLING_WINDOW, chunk_rows: int = STREAM_CHUNK_ROWS,
+                   output_bucket: Optional[str] = None) -> Dict[str, Any]:
+    """Process the object at ``ref['uri']`` chunk by chunk into compressed Parquet
+
+    The last ``window - 1`` rows of each chunk are carried into the next one,
+    so rolling means are identical to processing the whole dataset at once.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    client = get_s3_client()
+    bucket = output_bucket or PROCESSED_BUCKET
+    key = f"processed/{ref.get('timestamp') or _split_s3(ref['uri'])[1].replace('/', '_')}.parquet"
+    sink = MultipartUploadWriter(bucket, key, client)
+    writer = None
+    history = None
+    rows = 0
+    try:
+        for batch in iter_batches(ref['uri'], chunk_rows, client):
+            chunk = batch.to_pandas()
+            df = add_rolling_means(chunk, window, history)
+            if window > 1:
+                # A chunk shorter than the window keeps part of the older tail
+                history = chunk if history is None else pd.concat([history, chunk], ignore_index=True)
+                history = history.iloc[-(window - 1):]
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.schema, compression=OUTPUT_COMPRESSION)
+            writer.write_table(table)
+            rows += len(df)
+        if writer is None:
+            # Empty input still produces a readable (empty) Parquet file
+            writer = pq.ParquetWriter(sink, pa.schema([]), compression=OUTPUT_COMPRESSION)
+        writer.close()
+        sink.close()
+    except Exception:
+        sink.abort()
+        raise
+    return {'uri': f's3://{bucket}/{key}', 'rows': rows, 'bytes': sink.written}
@@ -0,0 +1,207 @@
+import asyncio
+import math
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Mapping, Optional
+from src.utils.config import Config
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of being queued"""
+
+    def __init__(self, status_code: int, reason: str, retry_after: Optional[int] = None):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def parse_model_limits(spec: Optional[str]) -> Dict[str, int]:
+    """Parse per-model limits such as ``default=8,ranker=2``"""
+    limits = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        name, _, limit = part.partition("=")
+        limits[name.strip()] = int(limit)
+    return limits
+
+
+class AdmissionController:
+    """Global and per-model concurrency limits with a bounded FIFO wait queue
+
+    Requests that find the queue full are rejected with 429, requests whose
+    deadline expires (or is estimated to expire) while queued get 503. Both
+    carry a Retry-After hint derived from the observed service time. Queued
+    requests are served FIFO per model, so a saturated model never blocks
+    admission to a model with spare capacity.
+
+    The deadline is enforced while queued and checked again by the caller
+    through ``AdmissionSlot.check_deadline`` (before inference starts and
+    between bulk chunks); inference that is already running is not interrupted.
+    """
+
+    def __init__(self, max_concurrency: int = None, max_concurrency_per_model: int = None,
+                 max_queue_depth: int = None, model_limits: Dict[str, int] = None,
+                 default_timeout_ms: int = None):
+        config = Config()
+        self.max_concurrency = max_concurrency or config.MAX_CONCURRENT_REQUESTS
+        self.max_concurrency_per_model = max_concurrency_per_model or config.MAX_CONCURRENT_PER_MODEL
+        self.max_queue_depth = config.MAX_QUEUE_DEPTH if max_queue_depth is None else max_queue_depth
+        self.model_limits = parse_model_limits(config.MODEL_CONCURRENCY_LIMITS) if model_limits is None else model_limits
+        self.default_timeout_ms = config.DEFAULT_REQUEST_TIMEOUT_MS if default_timeout_ms is None else default_timeout_ms
+        self.timeout_header = config.REQUEST_TIMEOUT_HEADER
+
+        self._active = 0
+        self._active_per_model = defaultdict(int)
+        self._waiters = deque()
+        self._service_time = 0.05  # EWMA seconds, seeded with a conservative guess
+        self._admitted = 0
+        self._shed = {"queue_full": 0, "deadline": 0}
+
+    def deadline_from_headers(self, headers: Mapping[str, str]) -> Optional[float]:
+        """Turn the request timeout header (milliseconds of budget) into a monotonic deadline"""
+        value = headers.get(self.timeout_header)
+        if value is None:
+            if not self.default_timeout_ms:
+                return None
+            return time.monotonic() + self.default_timeout_ms / 1000
+
+        try:
+            timeout_ms = float(value)
+        except ValueError:
+            timeout_ms = float('nan')
+        if not timeout_ms > 0 or math.isinf(timeout_ms):
+            raise AdmissionRejected(400, f"Invalid {self.timeout_header} header: {value!r}")
+        return time.monotonic() + timeout_ms / 1000
+
+    def _limit_for(self, model_name: str) -> int:
+        return self.model_limits.get(model_name, self.max_concurrency_per_model)
+
+    def _has_capacity(self, model_name: str) -> bool:
+        return (self._active < self.max_concurrency
+                and self._active_per_model[model_name] < self._limit_for(model_name))
+
+    def _model_is_queued(self, model_name: str) -> bool:
+        return any(waiting_model == model_name for waiting_model, _ in self._waiters)
+
+    def _take(self, model_name: str) -> None:
+        self._active += 1
+        self._active_per_model[model_name] += 1
+        self._admitted += 1
+
+    def _retry_after(self) -> int:
+        drain_time = (len(self._waiters) + 1) * self._service_time / self.max_concurrency
+        return max(1, math.ceil(drain_time))
+
+    def _reject(self, kind: str, status_code: int, reason: str) -> AdmissionRejected:
+        self._shed[kind] += 1
+        return AdmissionRejected(status_code, reason, self._retry_after())
+
+    async def acquire(self, model_name: str, deadline: Optional[float] = None) -> None:
+        """Wait for a slot, or raise AdmissionRejected"""
+        # FIFO per model: only jump straight in if nobody for this model is ahead
+        if self._has_capacity(model_name) and not self._model_is_queued(model_name):
+            self._take(model_name)
+            return
+
+        if len(self._waiters) >= self.max_queue_depth:
+            raise self._reject("queue_full", 429, "Admission queue is full")
+
+        timeout = None
+        if deadline is not None:
+            timeout = deadline - time.monotonic()
+            expected_wait = (len(self._waiters) + 1) * self._service_time / self.max_concurrency
+            if timeout <= 0 or expected_wait > timeout:
+                raise self._reject("deadline", 503, "Request deadline cannot be met")
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (model_name, waiter)
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as the deadline passed, hand it back
+                self.release(model_name)
+            else:
+                self._waiters.remove(entry)
+            raise self._reject("deadline", 503, "Request deadline exceeded while queued")
+        except asyncio.CancelledError:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+            elif waiter.done():
+                self.release(model_name)
+            raise
+
+    def release(self, model_name: str, service_time: float = None) -> None:
+        """Free a slot and wake queued requests that can now run"""
+        self._active -= 1
+        self._active_per_model[model_name] -= 1
+        if service_time is not None:
+            self._service_time = 0.9 * self._service_time + 0.1 * service_time
+
+        for entry in list(self._waiters):
+            if self._active >= self.max_concurrency:
+                break
+            waiting_model, waiter = entry
+            if self._has_capacity(waiting_model):
+                self._waiters.remove(entry)
+                self._take(waiting_model)
+                waiter.set_result(None)
+
+    async def hold(self, model_name: str, headers: Mapping[str, str] = None) -> "AdmissionSlot":
+        """Acquire a slot that the caller releases explicitly (e.g. after a stream ends)"""
+        deadline = self.deadline_from_headers(headers or {})
+        await self.acquire(model_name, deadline)
+        return AdmissionSlot(self, model_name, deadline)
+
+    @asynccontextmanager
+    async def admit(self, model_name: str, headers: Mapping[str, str] = None):
+        """Hold a slot for the duration of the block"""
+        slot = await self.hold(model_name, headers)
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def _deadline_exceeded(self) -> AdmissionRejected:
+        return self._reject("deadline", 503, "Request deadline exceeded")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "active_per_model": {name: count for name, count in self._active_per_model.items() if count},
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self._admitted,
+            "shed": dict(self._shed),
+            "service_time_ms": self._service_time * 1000
+        }
+
+
+class AdmissionSlot:
+    """An admitted request's slot; releasing it more than once is a no-op"""
+
+    def __init__(self, controller: AdmissionController, model_name: str,
+                 deadline: Optional[float] = None):
+        self.controller = controller
+        self.model_name = model_name
+        self.deadline = deadline
+        self.started = time.monotonic()
+        self.released = False
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def check_deadline(self) -> None:
+        """Raise a 503 rejection if the request's budget is already spent"""
+        if self.expired():
+            raise self.controller._deadline_exceeded()
+
+    def release(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        self.controller.release(self.model_name, time.monotonic() - self.started)
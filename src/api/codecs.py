@@ -0,0 +1,93 @@
+import io
+import numpy as np
+from typing import List, Optional, Tuple
+
+ARROW_CONTENT_TYPES = ("application/vnd.apache.arrow.stream", "application/x-arrow")
+NPY_CONTENT_TYPES = ("application/x-npy", "application/octet-stream")
+CSV_CONTENT_TYPES = ("text/csv",)
+
+
+def decode_feature_matrix(body: bytes, content_type: str) -> Tuple[np.ndarray, Optional[List[str]]]:
+    """Decode a request body into a 2-D feature matrix and optional column names"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+
+    if not body:
+        raise ValueError("Request body is empty")
+
+    if media_type in ARROW_CONTENT_TYPES:
+        return _decode_arrow(body)
+    if media_type in NPY_CONTENT_TYPES:
+        return _decode_npy(body), None
+    if media_type in CSV_CONTENT_TYPES:
+        return _decode_csv(body)
+
+    raise ValueError(f"Unsupported content type: {content_type!r}")
+
+
+def _decode_npy(body: bytes) -> np.ndarray:
+    """Decode an .npy buffer without copying the array data"""
+    stream = io.BytesIO(body)
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+
+    if dtype.hasobject:
+        raise ValueError("Object arrays are not supported")
+
+    count = int(np.prod(shape)) if shape else 1
+    # View straight into the request buffer, the header is the only thing parsed
+    matrix = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+    matrix = matrix.reshape(shape, order="F" if fortran_order else "C")
+    return _as_matrix(matrix)
+
+
+def _decode_arrow(body: bytes) -> Tuple[np.ndarray, List[str]]:
+    """Decode an Arrow IPC stream"""
+    import pyarrow as pa
+
+    reader = pa.ipc.open_stream(pa.py_buffer(body))
+    return _table_to_matrix(reader.read_all())
+
+
+def _decode_csv(body: bytes) -> Tuple[np.ndarray, List[str]]:
+    """Decode a CSV body with a header row"""
+    import pyarrow as pa
+    from pyarrow import csv
+
+    return _table_to_matrix(csv.read_csv(pa.BufferReader(body)))
+
+
+def _table_to_matrix(table) -> Tuple[np.ndarray, List[str]]:
+    """Convert an Arrow table to a row-major matrix"""
+    import pyarrow as pa
+
+    if table.num_columns == 0:
+        raise ValueError("Payload has no columns")
+
+    # A single fixed-size-list column is already a row-major matrix
+    if table.num_columns == 1 and pa.types.is_fixed_size_list(table.schema.field(0).type):
+        column = table.column(0).combine_chunks()
+        if column.null_count or column.flatten().null_count:
+            raise ValueError(f"Column {table.column_names[0]!r} contains null values")
+        width = column.type.list_size
+        values = column.flatten().to_numpy(zero_copy_only=False)
+        return values.reshape(-1, width), None
+
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        if column.null_count:
+            raise ValueError(f"Column {name!r} contains null values")
+        # Zero-copy for primitive single-chunk columns; stacking below is the only copy
+        columns.append(column.combine_chunks().to_numpy(zero_copy_only=False))
+
+    return _as_matrix(np.column_stack(columns)), table.column_names
+
+
+def _as_matrix(array: np.ndarray) -> np.ndarray:
+    if array.ndim == 1:
+        return array.reshape(-1, 1)
+    if array.ndim != 2:
+        raise ValueError(f"Expected a 2-D feature matrix, got {array.ndim} dimensions")
+    return array
@@ -1,10 +1,15 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
-import numpy as np
+from typing import Dict, Any, List, Optional, Union
+from datetime import datetime
+import json
 import logging
-from src.utils.redis_client import RedisClient
+from src.api.admission import AdmissionController, AdmissionRejected
+from src.utils.redis_client import FeaturesNotFoundError, ModelNotFoundError, RedisClient
 from src.models.model_manager import ModelManager
 from src.models.inference import InferenceEngine
 
@@ -26,10 +31,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize components
+# Initialize components (cheap: Redis connections and models are created on first use)
 redis_client = RedisClient()
 model_manager = ModelManager(redis_client)
 inference_engine = InferenceEngine(redis_client, model_manager)
+admission_controller = AdmissionController()
 
 class PredictionRequest(BaseModel):
     features: Dict[str, Any]
@@ -48,6 +54,34 @@ class BatchPredictionRequest(BaseModel):
     model_name: Optional[str] = "default"
     model_version: Optional[str] = "latest"
 
+class EntityPredictionRequest(BaseModel):
+    entity_ids: List[Union[int, str]]
+    model_name: Optional[str] = "default"
+    model_version: Optional[str] = "latest"
+
+class EnsembleMember(BaseModel):
+    model_name: str
+    model_version: Optional[str] = "latest"
+    weight: Optional[float] = 1.0
+    timeout_ms: Optional[float] = None
+
+class EnsemblePredictionRequest(BaseModel):
+    features: Dict[str, Any]
+    models: List[EnsembleMember]
+    strategy: Optional[str] = "all"
+    timeout_ms: Optional[float] = None
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Shed load fast instead of letting requests pile up"""
+    logger.warning(f"Request rejected: {exc.reason}")
+    headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after is not None else None
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.reason},
+        headers=headers
+    )
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
@@ -73,41 +107,167 @@ async def health_check():
     return {
         "status": "healthy" if redis_healthy else "unhealthy",
         "redis": redis_healthy,
-        "timestamp": pd.Timestamp.now().isoformat()
+        "timestamp": datetime.now().isoformat()
     }
 
 @app.post("/predict", response_model=PredictionResponse)
-async def predict(request: PredictionRequest):
+async def predict(request: PredictionRequest, http_request: Request):
     """Single prediction endpoint"""
-    try:
-        result = inference_engine.predict(
-            features=request.features,
-            model_name=request.model_name,
-            model_version=request.model_version
-        )
-        
-        return PredictionResponse(**result)
-        
-    except Exception as e:
-        logger.error(f"Prediction failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    async with admission_controller.admit(request.model_name, http_request.headers) as slot:
+        slot.check_deadline()
+        try:
+            result = await run_in_threadpool(
+                inference_engine.predict,
+                features=request.features,
+                model_name=request.model_name,
+                model_version=request.model_version
+            )
+            
+            return PredictionResponse(**result)
+            
+        except Exception as e:
+            logger.error(f"Prediction failed: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/predict/batch")
-async def batch_predict(request: BatchPredictionRequest):
+async def batch_predict(request: BatchPredictionRequest, http_request: Request):
     """Batch prediction endpoint"""
+    async with admission_controller.admit(request.model_name, http_request.headers) as slot:
+        slot.check_deadline()
+        try:
+            results = await run_in_threadpool(
+                inference_engine.batch_predict,
+                feature_ids=request.feature_ids,
+                model_name=request.model_name,
+                model_version=request.model_version
+            )
+            
+            return {"predictions": results}
+            
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/entity")
+async def entity_predict(request: EntityPredictionRequest, http_request: Request):
+    """Score entities by id; their features are looked up server-side"""
+    async with admission_controller.admit(request.model_name, http_request.headers) as slot:
+        slot.check_deadline()
+        try:
+            return await run_in_threadpool(
+                inference_engine.predict_entities,
+                entity_ids=[str(entity_id) for entity_id in request.entity_ids],
+                model_name=request.model_name,
+                model_version=request.model_version
+            )
+            
+        except (FeaturesNotFoundError, ModelNotFoundError) as e:
+            logger.error(f"Entity prediction failed: {e}")
+            raise HTTPException(status_code=404, detail=str(e))
+        except ValueError as e:
+            logger.error(f"Entity prediction rejected: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Entity prediction failed: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/ensemble")
+async def ensemble_predict(request: EnsemblePredictionRequest, http_request: Request):
+    """Score the same features with several models concurrently and combine the results"""
+    models = [
+        {
+            "model_name": member.model_name,
+            "model_version": member.model_version,
+            "weight": member.weight,
+            "timeout": member.timeout_ms / 1000 if member.timeout_ms else None
+        }
+        for member in request.models
+    ]
+    async with admission_controller.admit("ensemble", http_request.headers) as slot:
+        slot.check_deadline()
+        try:
+            return await run_in_threadpool(
+                inference_engine.ensemble_predict,
+                features=request.features,
+                models=models,
+                strategy=request.strategy,
+                timeout=request.timeout_ms / 1000 if request.timeout_ms else None
+            )
+            
+        except ValueError as e:
+            logger.error(f"Ensemble prediction rejected: {e}")
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"Ensemble prediction failed: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/bulk")
+async def bulk_predict(request: Request, model_name: str = "default",
+                       model_version: str = "latest", chunk_size: int = 10000):
+    """Bulk prediction over a raw feature matrix (Arrow IPC stream, .npy or CSV body)
+
+    Results are streamed back as newline-delimited JSON, one line per chunk.
+    """
+    # numpy/pyarrow decoding is only needed by this endpoint
+    from src.api.codecs import decode_feature_matrix
+
+    body = await request.body()
+    # The slot is held until the whole result stream has been sent
+    slot = await admission_controller.hold(model_name, request.headers)
     try:
-        results = inference_engine.batch_predict(
-            feature_ids=request.feature_ids,
-            model_name=request.model_name,
-            model_version=request.model_version
+        slot.check_deadline()
+        matrix, columns = await run_in_threadpool(
+            decode_feature_matrix, body, request.headers.get("content-type", "")
         )
-        
-        return {"predictions": results}
-        
+        slot.check_deadline()
+        chunks = await run_in_threadpool(
+            inference_engine.predict_matrix,
+            matrix,
+            model_name=model_name,
+            model_version=model_version,
+            columns=columns,
+            chunk_size=chunk_size
+        )
+    except AdmissionRejected:
+        slot.release()
+        raise
+    except ModelNotFoundError as e:
+        slot.release()
+        logger.error(f"Bulk prediction failed: {e}")
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        slot.release()
+        logger.error(f"Bulk prediction rejected: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Batch prediction failed: {e}")
+        slot.release()
+        logger.error(f"Bulk prediction failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def stream_results():
+        try:
+            async for chunk in iterate_in_threadpool(chunks):
+                yield json.dumps(chunk) + "\n"
+                if slot.expired():
+                    # Headers are already sent, so report the cut-off in-band
+                    yield json.dumps({"error": "Request deadline exceeded",
+                                      "offset": chunk["offset"] + len(chunk["predictions"])}) + "\n"
+                    break
+        finally:
+            slot.release()
+
+    async def release_slot():
+        # A coroutine, so Starlette runs it on the event loop: release() resolves
+        # queued waiters' futures, which must not happen from a worker thread
+        slot.release()
+
+    # Releasing is idempotent; the background task covers streams that never start
+    return StreamingResponse(
+        stream_results(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(release_slot)
+    )
+
 @app.post("/models/{model_name}/deploy")
 async def deploy_model(model_name: str, background_tasks: BackgroundTasks):
     """Deploy new model version"""
@@ -130,6 +290,16 @@ async def list_models():
         logger.error(f"Failed to list models: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics/admission")
+async def admission_metrics():
+    """Concurrency, queue depth and shed counts"""
+    return admission_controller.metrics()
+
+@app.get("/metrics/model_loads")
+async def model_load_metrics():
+    """Model loads executed, deduplicated by singleflight, timed out or failed"""
+    return model_manager.load_metrics()
+
 @app.get("/features/latest")
 async def get_latest_features(limit: int = 10):
     """Get latest features from feature store"""
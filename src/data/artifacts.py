@@ -0,0 +1,142 @@
+import os
+import re
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
+from src.utils.config import Config
+
+ARTIFACT_FORMAT = 'arrow'
+
+
+def _split_s3(uri: str):
+    bucket, _, key = uri[len('s3://'):].partition('/')
+    return bucket, key
+
+
+def safe_run_id(run_id: str) -> str:
+    """Airflow run ids contain ':' and '+', which are awkward in paths and keys"""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', run_id)
+
+
+def artifact_uri(run_id: str, name: str, root: Optional[str] = None, extension: str = ARTIFACT_FORMAT) -> str:
+    root = (root or Config.ARTIFACT_ROOT).rstrip('/')
+    return f"{root}/{safe_run_id(run_id)}/{name}.{extension}"
+
+
+def _store(uri: str, write: Callable[[str], None]) -> None:
+    """Run ``write(path)`` and publish the file at ``uri``"""
+    if uri.startswith('s3://'):
+        from src.data.object_store import S3ObjectStore
+
+        bucket, key = _split_s3(uri)
+        fd, path = tempfile.mkstemp(suffix=os.path.splitext(uri)[1])
+        os.close(fd)
+        try:
+            write(path)
+            S3ObjectStore(bucket).put_file(key, path)
+        finally:
+            os.remove(path)
+    else:
+        os.makedirs(os.path.dirname(uri), exist_ok=True)
+        # Written aside and renamed so a retried task never exposes a partial file
+        partial = f"{uri}.partial"
+        write(partial)
+        os.replace(partial, uri)
+
+
+def _write_ipc(table, path: str) -> None:
+    import pyarrow as pa
+
+    # Uncompressed IPC files can be memory-mapped and read without copying
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=Config.ARTIFACT_BATCH_SIZE)
+
+
+def write_artifact(df, name: str, run_id: str, metadata: Optional[Dict[str, Any]] = None,
+                   root: Optional[str] = None) -> Dict[str, Any]:
+    """Persist a DataFrame as an Arrow IPC file and return a small reference for XCom
+
+    ``root`` (default ``ARTIFACT_ROOT``) is a local directory or an
+    ``s3://bucket/prefix`` URI. ``metadata`` is merged into the reference.
+    """
+    import pyarrow as pa
+
+    table = df if isinstance(df, pa.Table) else pa.Table.from_pandas(df, preserve_index=False)
+    uri = artifact_uri(run_id, name, root)
+    _store(uri, lambda path: _write_ipc(table, path))
+
+    ref = {
+        'uri': uri,
+        'format': ARTIFACT_FORMAT,
+        'rows': table.num_rows,
+        'columns': table.column_names
+    }
+    ref.update(metadata or {})
+    return ref
+
+
+def is_artifact_ref(value: Any) -> bool:
+    return isinstance(value, dict) and 'uri' in value and value.get('format') == ARTIFACT_FORMAT
+
+
+def read_artifact_table(ref: Any, columns: Optional[List[str]] = None):
+    """Open an artifact as an Arrow table
+
+    Local artifacts are memory-mapped, so the table's buffers point into the
+    page cache rather than the Python heap. S3 artifacts are fetched with
+    concurrent ranged GETs.
+    """
+    import pyarrow as pa
+
+    uri = ref['uri'] if isinstance(ref, dict) else ref
+    if uri.startswith('s3://'):
+        from src.data.object_store import S3ObjectStore, download
+
+        bucket, key = _split_s3(uri)
+        source = pa.BufferReader(download(S3ObjectStore(bucket), key))
+    else:
+        source = pa.memory_map(uri, 'r')
+
+    table = pa.ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+
+def read_artifact(ref: Any, columns: Optional[List[str]] = None):
+    """Read an artifact into a DataFrame"""
+    return read_artifact_table(ref, columns).to_pandas()
+
+
+def write_state(obj: Any, name: str, run_id: str, root: Optional[str] = None) -> Dict[str, Any]:
+    """Pickle small Python state (fitted transformers, sketches) next to the run's data"""
+    import pickle
+
+    uri = artifact_uri(run_id, name, root, extension='pkl')
+
+    def write(path: str) -> None:
+        with open(path, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    _store(uri, write)
+    return {'uri': uri, 'format': 'pickle'}
+
+
+def read_state(ref: Any) -> Any:
+    import pickle
+
+    uri = ref['uri'] if isinstance(ref, dict) else ref
+    if uri.startswith('s3://'):
+        from src.data.object_store import S3ObjectStore
+
+        bucket, key = _split_s3(uri)
+        return pickle.loads(S3ObjectStore(bucket).get(key))
+    with open(uri, 'rb') as f:
+        return pickle.load(f)
+
+
+def delete_run_artifacts(run_id: str, root: Optional[str] = None) -> None:
+    """Remove a run's local artifacts (S3 artifacts expire via bucket lifecycle rules)"""
+    import shutil
+
+    root = (root or Config.ARTIFACT_ROOT).rstrip('/')
+    if not root.startswith('s3://'):
+        shutil.rmtree(os.path.join(root, safe_run_id(run_id)), ignore_errors=True)
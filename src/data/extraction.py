@@ -1,37 +1,381 @@
 import pandas as pd
 import requests
-from typing import Dict, Any
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from src.utils.config import Config
 
 class DataExtractor:
     def __init__(self):
         self.config = Config()
+        self._session = None
+        self._rate_limit_lock = threading.Lock()
+        self._rate_limited_until = 0.0
+        self.last_extraction_stats = {}
     
-    def extract_from_api(self, endpoint: str) -> pd.DataFrame:
-        """Extract data from REST API"""
+    @property
+    def session(self) -> requests.Session:
+        """Pooled HTTP session with retry/backoff on 429 and 5xx"""
+        if self._session is None:
+            retry = Retry(
+                total=self.config.API_MAX_RETRIES,
+                backoff_factor=self.config.API_BACKOFF_FACTOR,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                respect_retry_after_header=True
+            )
+            adapter = HTTPAdapter(
+                max_retries=retry,
+                pool_connections=self.config.API_MAX_CONCURRENCY,
+                pool_maxsize=self.config.API_MAX_CONCURRENCY
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if self.config.API_KEY:
+                session.headers["Authorization"] = f"Bearer {self.config.API_KEY}"
+            self._session = session
+        return self._session
+    
+    def extract_from_api(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Extract data from REST API through the pooled, retrying session"""
         try:
-            response = requests.get(f"{self.config.API_BASE_URL}/{endpoint}")
+            response = self.session.get(
+                f"{self.config.API_BASE_URL}/{endpoint}",
+                params=params,
+                timeout=self.config.API_TIMEOUT
+            )
             response.raise_for_status()
             return pd.DataFrame(response.json())
         except Exception as e:
             raise Exception(f"API extraction failed: {str(e)}")
     
-    def extract_from_database(self, query: str) -> pd.DataFrame:
+    def iter_api_pages(self, endpoint: str, page_size: int = None, max_concurrency: int = None,
+                       params: Optional[Dict[str, Any]] = None) -> Iterator[pd.DataFrame]:
+        """Fetch a paginated endpoint concurrently and yield one DataFrame per page, in order
+        
+        Pages are requested ``page=1, 2, ...`` with at most ``max_concurrency``
+        in flight; the first page shorter than ``page_size`` ends the scan.
+        Throughput is recorded in ``last_extraction_stats``.
+        """
+        page_size = page_size or self.config.API_PAGE_SIZE
+        max_concurrency = max_concurrency or self.config.API_MAX_CONCURRENCY
+        url = f"{self.config.API_BASE_URL}/{endpoint}"
+        stats = {'pages': 0, 'records': 0, 'bytes': 0}
+        started = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="api-extract") as pool:
+            in_flight = deque()
+            next_page = 1
+            exhausted = False
+            try:
+                while True:
+                    while not exhausted and len(in_flight) < max_concurrency:
+                        in_flight.append(pool.submit(self._fetch_page, url, next_page, page_size, params))
+                        next_page += 1
+                    if not in_flight:
+                        break
+                    
+                    records, size = in_flight.popleft().result()
+                    stats['pages'] += 1
+                    stats['records'] += len(records)
+                    stats['bytes'] += size
+                    if len(records) < page_size:
+                        # Later pages are past the end; don't wait for them
+                        exhausted = True
+                        for future in in_flight:
+                            future.cancel()
+                        in_flight.clear()
+                    if records:
+                        yield pd.DataFrame(records)
+            except Exception as e:
+                for future in in_flight:
+                    future.cancel()
+                raise Exception(f"API extraction failed: {str(e)}")
+            finally:
+                elapsed = time.perf_counter() - started
+                stats['elapsed_s'] = elapsed
+                stats['pages_per_sec'] = stats['pages'] / elapsed if elapsed else 0.0
+                stats['bytes_per_sec'] = stats['bytes'] / elapsed if elapsed else 0.0
+                self.last_extraction_stats = stats
+    
+    def _fetch_page(self, url: str, page: int, page_size: int,
+                    params: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], int]:
+        self._wait_for_rate_limit()
+        query = dict(params or {})
+        query[self.config.API_PAGE_PARAM] = page
+        query[self.config.API_PAGE_SIZE_PARAM] = page_size
+        
+        response = self.session.get(url, params=query, timeout=self.config.API_TIMEOUT)
+        response.raise_for_status()
+        self._record_rate_limit(response)
+        
+        payload = response.json()
+        if isinstance(payload, dict):
+            payload = payload.get('data', payload.get('results', []))
+        return payload, len(response.content)
+    
+    def _wait_for_rate_limit(self) -> None:
+        delay = self._rate_limited_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    
+    def _record_rate_limit(self, response: requests.Response) -> None:
+        """Pause all workers when the server reports an exhausted quota"""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        try:
+            if int(remaining) > 0:
+                return
+            # Reset is seconds until the window reopens
+            until = time.monotonic() + float(reset)
+        except ValueError:
+            return
+        with self._rate_limit_lock:
+            self._rate_limited_until = max(self._rate_limited_until, until)
+    
+    def extract_from_database(self, query: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """Extract data from database"""
-        # Implement database connection and query execution
-        pass
+        try:
+            batches = list(self.iter_database_batches(query, columns=columns))
+            if not batches:
+                return pd.DataFrame(columns=columns)
+            return pd.concat(batches, ignore_index=True)
+        except Exception as e:
+            raise Exception(f"Database extraction failed: {str(e)}")
+    
+    def iter_database_batches(self, source: str, columns: Optional[List[str]] = None,
+                              batch_size: int = None, as_arrow: bool = False,
+                              where: Optional[str] = None, params: Tuple = ()) -> Iterator[Any]:
+        """Stream a table or query as fixed-size pandas (or Arrow) batches
+        
+        ``source`` is a table name or a SELECT statement. ``columns`` are
+        pushed into the SELECT so unused columns never leave the database.
+        Rows are pulled with ``fetchmany`` (a server-side cursor on
+        PostgreSQL), so only one batch is held in memory at a time.
+        """
+        batch_size = batch_size or self.config.DATABASE_BATCH_SIZE
+        sql = _build_select(source, columns, where)
+        
+        connection = self._connect_database()
+        try:
+            cursor = self._open_cursor(connection)
+            cursor.execute(sql, params)
+            names = [description[0] for description in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield _rows_to_batch(rows, names, as_arrow)
+            cursor.close()
+        finally:
+            connection.close()
+    
+    def iter_database_partitions(self, table: str, key: str, partitions: int = None,
+                                 columns: Optional[List[str]] = None, batch_size: int = None,
+                                 as_arrow: bool = False) -> Iterator[Any]:
+        """Read a table in parallel, one connection per key range
+        
+        The numeric ``key`` column's [min, max] is split into ``partitions``
+        contiguous ranges read concurrently. Batches are yielded as they
+        arrive, so ordering across partitions is not preserved; a bounded
+        queue keeps readers from running ahead of the consumer.
+        """
+        partitions = partitions or self.config.DATABASE_PARTITIONS
+        _check_identifier(key)
+        
+        connection = self._connect_database()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM {_check_identifier(table)}")
+            low, high = cursor.fetchone()
+            cursor.close()
+        finally:
+            connection.close()
+        if low is None:
+            return
+        
+        step = (high - low) / partitions
+        bounds = [low + step * i for i in range(partitions)] + [high]
+        marker = '?' if self.config.DATABASE_URL.startswith('sqlite') else '%s'
+        ranges = []
+        for i in range(partitions):
+            # The last range is closed so the maximum key is included
+            upper_op = '<=' if i == partitions - 1 else '<'
+            ranges.append((f"{key} >= {marker} AND {key} {upper_op} {marker}", (bounds[i], bounds[i + 1])))
+        
+        results = queue.Queue(maxsize=partitions * 2)
+        stop = threading.Event()
+        done = object()
+        
+        def offer(item) -> bool:
+            # Gives up once the consumer has gone away
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def read(where, params):
+            try:
+                for batch in self.iter_database_batches(table, columns, batch_size, as_arrow, where, params):
+                    if not offer(batch):
+                        return
+                offer(done)
+            except Exception as e:
+                offer(e)
+        
+        with ThreadPoolExecutor(max_workers=partitions, thread_name_prefix="db-extract") as pool:
+            for where, params in ranges:
+                pool.submit(read, where, params)
+            remaining = partitions
+            try:
+                while remaining:
+                    item = results.get()
+                    if item is done:
+                        remaining -= 1
+                    elif isinstance(item, Exception):
+                        raise Exception(f"Database extraction failed: {str(item)}")
+                    else:
+                        yield item
+            finally:
+                stop.set()
+    
+    def _connect_database(self):
+        """Open a DB-API connection for ``DATABASE_URL``
+        
+        ``sqlite:///path`` uses the standard library; other URLs go through
+        SQLAlchemy's raw DBAPI connection.
+        """
+        url = self.config.DATABASE_URL
+        if not url:
+            raise ValueError("DATABASE_URL is not configured")
+        if url.startswith('sqlite:///'):
+            import sqlite3
+            return sqlite3.connect(url[len('sqlite:///'):])
+        
+        from sqlalchemy import create_engine
+        return create_engine(url).raw_connection()
+    
+    def _open_cursor(self, connection):
+        if self.config.DATABASE_URL.startswith('postgres'):
+            # Named cursors are server-side in psycopg2
+            return connection.cursor(name='extract_stream')
+        return connection.cursor()
     
-    def extract_from_s3(self, bucket: str, key: str) -> pd.DataFrame:
+    def extract_from_s3(self, bucket: str, key: str, columns: Optional[List[str]] = None,
+                        filters: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
         """Extract data from S3"""
-        # Implement S3 data extraction
-        pass
+        try:
+            import pyarrow as pa
+            batches = list(self.iter_object_batches(bucket, key, columns=columns, filters=filters))
+            if not batches:
+                return pd.DataFrame(columns=columns)
+            return pa.Table.from_batches(batches).to_pandas()
+        except Exception as e:
+            raise Exception(f"S3 extraction failed: {str(e)}")
+    
+    def iter_object_batches(self, bucket: str, prefix: str, columns: Optional[List[str]] = None,
+                            filters: Optional[Dict[str, Any]] = None, row_groups: Optional[List[int]] = None,
+                            max_concurrency: int = None, store=None) -> Iterator[Any]:
+        """Stream Parquet/CSV objects under ``prefix`` as Arrow record batches
+        
+        Keys whose hive partitions (``date=.../region=...``) are excluded by
+        ``filters`` are pruned before any GET. Remaining objects are read
+        concurrently with at most ``max_concurrency`` in flight and their
+        batches are yielded in key order.
+        """
+        from src.data.object_store import get_object_store, parse_partitions, partition_matches, read_object
+        
+        store = store or get_object_store(bucket)
+        max_concurrency = max_concurrency or self.config.OBJECT_STORE_WORKERS
+        keys = [
+            key for key in store.list_keys(prefix)
+            if key.endswith(('.parquet', '.csv')) and partition_matches(parse_partitions(key), filters)
+        ]
+        stats = {'objects': len(keys), 'batches': 0, 'rows': 0}
+        started = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="object-extract") as pool:
+            in_flight = deque()
+            pending = iter(keys)
+            try:
+                while True:
+                    while len(in_flight) < max_concurrency:
+                        key = next(pending, None)
+                        if key is None:
+                            break
+                        in_flight.append(pool.submit(read_object, store, key, columns, filters, row_groups))
+                    if not in_flight:
+                        break
+                    for batch in in_flight.popleft().result():
+                        stats['batches'] += 1
+                        stats['rows'] += batch.num_rows
+                        yield batch
+            finally:
+                for future in in_flight:
+                    future.cancel()
+                stats['elapsed_s'] = time.perf_counter() - started
+                self.last_extraction_stats = stats
 
-def extract_data() -> Dict[str, Any]:
-    """Main extraction function"""
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_.]*$')
+
+def _check_identifier(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return name
+
+def _build_select(source: str, columns: Optional[List[str]] = None, where: Optional[str] = None) -> str:
+    projection = ', '.join(_check_identifier(col) for col in columns) if columns else '*'
+    if source.lstrip().lower().startswith('select'):
+        # Pushdown still applies: the database only materializes the projected columns
+        sql = f"SELECT {projection} FROM ({source}) AS extract_source"
+    else:
+        sql = f"SELECT {projection} FROM {_check_identifier(source)}"
+    if where:
+        sql += f" WHERE {where}"
+    return sql
+
+def _rows_to_batch(rows: List[Tuple], names: List[str], as_arrow: bool):
+    if as_arrow:
+        import pyarrow as pa
+        arrays = [pa.array(values) for values in zip(*rows)]
+        return pa.record_batch(arrays, names=names)
+    return pd.DataFrame.from_records(rows, columns=names)
+
+def extract_frame(since: Optional[Any] = None) -> pd.DataFrame:
+    """Extract the source data as a DataFrame
+    
+    With ``since`` (a watermark) the API is asked for newer records only and
+    the result is filtered on ``WATERMARK_COLUMN`` in case it ignores the
+    parameter.
+    """
+    from src.data.incremental import filter_since
+    
     extractor = DataExtractor()
+    params = {extractor.config.API_WATERMARK_PARAM: since} if since is not None else None
     
     # Extract from multiple sources
-    api_data = extractor.extract_from_api("users")
+    if extractor.config.API_PAGINATED:
+        pages = list(extractor.iter_api_pages("users", params=params))
+        df = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame()
+    else:
+        df = extractor.extract_from_api("users", params=params)
+    return filter_since(df, extractor.config.WATERMARK_COLUMN, since).reset_index(drop=True)
+
+def extract_data() -> Dict[str, Any]:
+    """Main extraction function"""
+    api_data = extract_frame()
     
     return {
         'api_data': api_data.to_dict('records'),
@@ -0,0 +1,137 @@
+import math
+import numpy as np
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+ENGINEERED_FEATURES = ('hour', 'day_of_week')
+
+
+class FeatureTransform:
+    """Compiled, read-only form of a fitted DataTransformer for online scoring
+
+    The scaler's shift/scale, the fill values and the category -> code
+    tables are precomputed into NumPy arrays and dicts, so a single record
+    is transformed with one dict lookup per column and one vectorized
+    affine step instead of a round trip through pandas and sklearn.
+    """
+
+    def __init__(self, feature_names: List[str], fill: np.ndarray, shift: np.ndarray,
+                 scale: np.ndarray, category_codes: Dict[str, Dict[str, int]],
+                 timestamp_fill: Optional[str] = None):
+        self.feature_names = list(feature_names)
+        self.fill = np.asarray(fill, dtype=np.float64)
+        self.shift = np.asarray(shift, dtype=np.float64)
+        self.inv_scale = 1.0 / np.asarray(scale, dtype=np.float64)
+        self.category_codes = category_codes
+        self.timestamp_fill = timestamp_fill
+
+        self._positions = {name: i for i, name in enumerate(self.feature_names)}
+        self._numeric = [
+            (i, name) for i, name in enumerate(self.feature_names)
+            if name not in category_codes and name not in ENGINEERED_FEATURES
+        ]
+        self._categorical = [
+            (i, name, category_codes[name]) for i, name in enumerate(self.feature_names)
+            if name in category_codes
+        ]
+        self._engineered = [
+            (self._positions[name], name) for name in ENGINEERED_FEATURES if name in self._positions
+        ]
+
+    @classmethod
+    def from_transformer(cls, transformer) -> "FeatureTransform":
+        """Compile a fitted DataTransformer"""
+        if not transformer.fitted:
+            raise ValueError("DataTransformer has not been fitted")
+
+        feature_names = transformer.feature_names_
+        category_codes = {
+            col: {category: code for code, category in enumerate(categories)}
+            for col, categories in transformer.categories_.items()
+        }
+        timestamp_fill = transformer.fill_values.get('timestamp')
+
+        fill = np.zeros(len(feature_names))
+        for i, name in enumerate(feature_names):
+            if name in category_codes:
+                fill_value = transformer.fill_values.get(name)
+                fill[i] = category_codes[name].get(str(fill_value), -1)
+            elif name in ENGINEERED_FEATURES:
+                fill[i] = _engineered_value(name, timestamp_fill) if timestamp_fill else np.nan
+            else:
+                fill[i] = transformer.fill_values.get(name, np.nan)
+
+        # Columns the scaler did not see pass through unchanged
+        shift = np.zeros(len(feature_names))
+        scale = np.ones(len(feature_names))
+        scaler = transformer.scaler
+        for j, name in enumerate(transformer.scaled_columns_):
+            i = feature_names.index(name)
+            shift[i] = scaler.mean_[j] if scaler.with_mean else 0.0
+            scale[i] = scaler.scale_[j] if scaler.with_std else 1.0
+
+        return cls(feature_names, fill, shift, scale, category_codes, timestamp_fill)
+
+    def transform_row(self, record: Dict[str, Any]) -> np.ndarray:
+        """Transform one raw record into a (1, n_features) matrix"""
+        x = self.fill.copy()
+
+        for i, name in self._numeric:
+            value = record.get(name)
+            if not _is_missing(value):
+                x[i] = float(value)
+
+        for i, name, codes in self._categorical:
+            value = record.get(name)
+            if not _is_missing(value):
+                x[i] = codes.get(str(value), -1)
+
+        if self._engineered:
+            timestamp = record.get('timestamp')
+            if _is_missing(timestamp):
+                timestamp = self.timestamp_fill
+            if timestamp is not None:
+                for i, name in self._engineered:
+                    x[i] = _engineered_value(name, timestamp)
+
+        x -= self.shift
+        x *= self.inv_scale
+        return x.reshape(1, -1)
+
+    def transform_batch(self, records) -> np.ndarray:
+        """Transform a list of raw records (or a DataFrame) into a feature matrix"""
+        import pandas as pd
+
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+        x = np.tile(self.fill, (len(df), 1))
+
+        for i, name in self._numeric:
+            if name in df.columns:
+                values = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+                x[:, i] = np.where(np.isnan(values), self.fill[i], values)
+
+        for i, name, codes in self._categorical:
+            if name in df.columns:
+                column = df[name]
+                mapped = column.astype(str).map(codes).fillna(-1).to_numpy(dtype=np.float64)
+                x[:, i] = np.where(column.isna().to_numpy(), self.fill[i], mapped)
+
+        if self._engineered and 'timestamp' in df.columns:
+            timestamps = pd.to_datetime(df['timestamp'].fillna(self.timestamp_fill))
+            for i, name in self._engineered:
+                values = timestamps.dt.hour if name == 'hour' else timestamps.dt.dayofweek
+                x[:, i] = values.to_numpy(dtype=np.float64)
+
+        x -= self.shift
+        x *= self.inv_scale
+        return x
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _engineered_value(name: str, timestamp: Any) -> float:
+    if not isinstance(timestamp, datetime):
+        timestamp = datetime.fromisoformat(str(timestamp))
+    return float(timestamp.hour if name == 'hour' else timestamp.weekday())
@@ -0,0 +1,318 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from src.utils.config import Config
+
+
+class ObjectStore:
+    """Minimal read interface over a bucket-like key space"""
+
+    def list_keys(self, prefix: str = '') -> List[str]:
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        raise NotImplementedError
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        """Bytes ``[start, end)`` of an object"""
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes:
+        return self.get_range(key, 0, self.size(key))
+
+    def put_file(self, key: str, path: str) -> None:
+        raise NotImplementedError
+
+
+class LocalObjectStore(ObjectStore):
+    """Directory-backed store, used offline and in benchmarks"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split('/'))
+
+    def list_keys(self, prefix: str = '') -> List[str]:
+        keys = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                key = os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, '/')
+                if key.startswith(prefix):
+                    keys.append(key)
+        return sorted(keys)
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self._path(key))
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        with open(self._path(key), 'rb') as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def put_file(self, key: str, path: str) -> None:
+        import shutil
+
+        destination = self._path(key)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copyfile(path, destination)
+
+
+class S3ObjectStore(ObjectStore):
+    """S3 bucket read with ranged GETs"""
+
+    def __init__(self, bucket: str, client=None):
+        self.bucket = bucket
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('s3', region_name=Config.AWS_REGION)
+        return self._client
+
+    def list_keys(self, prefix: str = '') -> List[str]:
+        keys = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            keys.extend(item['Key'] for item in page.get('Contents', []))
+        return sorted(keys)
+
+    def size(self, key: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=key)['ContentLength']
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        if end <= start:
+            return b''
+        response = self.client.get_object(Bucket=self.bucket, Key=key, Range=f'bytes={start}-{end - 1}')
+        return response['Body'].read()
+
+    def put_file(self, key: str, path: str) -> None:
+        # upload_file switches to concurrent multipart uploads for large files
+        self.client.upload_file(path, self.bucket, key)
+
+
+def get_object_store(bucket: str) -> ObjectStore:
+    """Local directory under ``OBJECT_STORE_ROOT`` when set, S3 otherwise"""
+    if Config.OBJECT_STORE_ROOT:
+        return LocalObjectStore(os.path.join(Config.OBJECT_STORE_ROOT, bucket))
+    return S3ObjectStore(bucket)
+
+
+def download(store: ObjectStore, key: str, size: Optional[int] = None,
+             part_size: int = None, workers: int = None) -> bytes:
+    """Fetch a whole object, splitting large ones into concurrent ranged GETs"""
+    part_size = part_size or Config.OBJECT_STORE_PART_SIZE
+    workers = workers or Config.OBJECT_STORE_WORKERS
+    size = store.size(key) if size is None else size
+    if size <= part_size:
+        return store.get_range(key, 0, size)
+
+    ranges = [(start, min(start + part_size, size)) for start in range(0, size, part_size)]
+    buffer = bytearray(size)
+    with ThreadPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        parts = pool.map(lambda bounds: (bounds[0], store.get_range(key, *bounds)), ranges)
+        for start, data in parts:
+            buffer[start:start + len(data)] = data
+    return bytes(buffer)
+
+
+class RangedFile(io.RawIOBase):
+    """Seekable read-only file over ranged GETs
+
+    Parquet readers only touch the footer and the column chunks they need,
+    so projected reads of a large object transfer a fraction of it.
+    ``prefetch`` pulls known ranges concurrently ahead of the reader.
+    """
+
+    def __init__(self, store: ObjectStore, key: str, size: Optional[int] = None):
+        self.store = store
+        self.key = key
+        self._size = store.size(key) if size is None else size
+        self._position = 0
+        self._cache: List[Tuple[int, bytes]] = []
+        self.bytes_fetched = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = max(0, offset)
+        return self._position
+
+    def size(self) -> int:
+        return self._size
+
+    def prefetch(self, ranges: Iterable[Tuple[int, int]], workers: int = None) -> None:
+        ranges = _coalesce(bounds for bounds in ranges if bounds[1] > bounds[0])
+        if not ranges:
+            return
+        workers = workers or Config.OBJECT_STORE_WORKERS
+        with ThreadPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            for start, data in pool.map(lambda bounds: (bounds[0], self.store.get_range(self.key, *bounds)), ranges):
+                self._cache.append((start, data))
+                self.bytes_fetched += len(data)
+
+    def readinto(self, b) -> int:
+        end = min(self._position + len(b), self._size)
+        if end <= self._position:
+            return 0
+        data = self._from_cache(self._position, end)
+        if data is None:
+            data = self.store.get_range(self.key, self._position, end)
+            self.bytes_fetched += len(data)
+        b[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def _from_cache(self, start: int, end: int) -> Optional[bytes]:
+        for offset, data in self._cache:
+            if offset <= start and end <= offset + len(data):
+                return data[start - offset:end - offset]
+        return None
+
+
+def _coalesce(ranges: Iterable[Tuple[int, int]], hole_size: int = 8192) -> List[Tuple[int, int]]:
+    """Merge ranges separated by small gaps, as Arrow does for its own reads"""
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start - merged[-1][1] <= hole_size:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def parse_partitions(key: str) -> Dict[str, str]:
+    """Hive-style ``name=value`` path segments of a key"""
+    partitions = {}
+    for segment in key.split('/')[:-1]:
+        name, sep, value = segment.partition('=')
+        if sep:
+            partitions[name] = value
+    return partitions
+
+
+def _allowed(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple, set, frozenset)) else [value]
+
+
+def partition_matches(partitions: Dict[str, str], filters: Optional[Dict[str, Any]]) -> bool:
+    """False when a filter on a partition column excludes the key"""
+    for name, value in (filters or {}).items():
+        if name in partitions and partitions[name] not in {str(v) for v in _allowed(value)}:
+            return False
+    return True
+
+
+def _row_group_may_match(row_group, schema_names: List[str], filters: Dict[str, Any]) -> bool:
+    """Skip row groups whose min/max statistics exclude every filter value"""
+    for name, value in filters.items():
+        if name not in schema_names:
+            continue
+        statistics = row_group.column(schema_names.index(name)).statistics
+        if statistics is None or not statistics.has_min_max:
+            continue
+        try:
+            if not any(statistics.min <= v <= statistics.max for v in _allowed(value)):
+                return False
+        except TypeError:
+            continue
+    return True
+
+
+def _column_chunk_ranges(metadata, row_groups: List[int], columns: List[str]) -> List[Tuple[int, int]]:
+    names = metadata.schema.names
+    indices = [names.index(col) for col in columns] if columns else range(len(names))
+    ranges = []
+    for i in row_groups:
+        row_group = metadata.row_group(i)
+        for j in indices:
+            chunk = row_group.column(j)
+            start = chunk.data_page_offset
+            if chunk.has_dictionary_page and chunk.dictionary_page_offset:
+                start = min(start, chunk.dictionary_page_offset)
+            ranges.append((start, start + chunk.total_compressed_size))
+    return ranges
+
+
+def read_object(store: ObjectStore, key: str, columns: Optional[List[str]] = None,
+                filters: Optional[Dict[str, Any]] = None, row_groups: Optional[List[int]] = None,
+                batch_size: int = None) -> List[Any]:
+    """Read one Parquet or CSV object into Arrow record batches
+
+    ``columns`` and equality/membership ``filters`` are pushed down: Parquet
+    objects at least ``OBJECT_STORE_RANGE_THRESHOLD`` bytes are read through
+    ranged GETs of just the selected column chunks, row groups whose
+    statistics exclude the filters are skipped, and hive partition values
+    from the key are appended as columns.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    batch_size = batch_size or Config.OBJECT_STORE_BATCH_SIZE
+    filters = filters or {}
+    partitions = parse_partitions(key)
+    file_filters = {name: value for name, value in filters.items() if name not in partitions}
+    size = store.size(key)
+
+    if key.endswith('.parquet'):
+        import pyarrow.parquet as pq
+
+        if size >= Config.OBJECT_STORE_RANGE_THRESHOLD:
+            source = RangedFile(store, key, size)
+        else:
+            source = pa.BufferReader(download(store, key, size))
+        parquet_file = pq.ParquetFile(source)
+        metadata = parquet_file.metadata
+        names = metadata.schema.names
+
+        wanted = [col for col in columns if col in names] if columns else list(names)
+        read_columns = wanted + [col for col in file_filters if col in names and col not in wanted]
+        selected = row_groups if row_groups is not None else range(metadata.num_row_groups)
+        selected = [i for i in selected if _row_group_may_match(metadata.row_group(i), names, file_filters)]
+        if not selected:
+            return []
+        if isinstance(source, RangedFile):
+            source.prefetch(_column_chunk_ranges(metadata, selected, read_columns))
+        batches = parquet_file.iter_batches(batch_size=batch_size, row_groups=selected, columns=read_columns)
+    elif key.endswith('.csv'):
+        from pyarrow import csv
+
+        table = csv.read_csv(pa.BufferReader(download(store, key, size)))
+        names = table.column_names
+        wanted = [col for col in columns if col in names] if columns else list(names)
+        read_columns = wanted + [col for col in file_filters if col in names and col not in wanted]
+        batches = table.select(read_columns).to_batches(max_chunksize=batch_size)
+    else:
+        raise ValueError(f"Unsupported object format: {key}")
+
+    partition_columns = [name for name in partitions if columns is None or name in columns]
+    output_names = [col for col in columns if col in wanted or col in partition_columns] if columns \
+        else wanted + partition_columns
+
+    result = []
+    for batch in batches:
+        for name, value in file_filters.items():
+            if name in batch.schema.names:
+                value_set = pa.array(_allowed(value), type=batch.schema.field(name).type)
+                batch = batch.filter(pc.is_in(batch.column(name), value_set=value_set))
+        if not batch.num_rows:
+            continue
+        arrays = {name: batch.column(name) for name in wanted}
+        for name in partition_columns:
+            arrays[name] = pa.array([partitions[name]] * batch.num_rows, type=pa.string())
+        result.append(pa.record_batch([arrays[name] for name in output_names], names=output_names))
+    return result
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+from src.data.artifacts import read_artifact, read_state, write_artifact, write_state
+from src.data.streaming import StreamingTransformer
+from src.utils.config import Config
+
+# Map-side and reduce-side steps of the partitioned ETL DAG. Every step
+# takes and returns artifact references, so the Airflow tasks stay thin and
+# only references travel through XCom.
+
+
+def partition_frame(df: pd.DataFrame, partitions: int, key: Optional[str] = None,
+                    time_column: Optional[str] = None) -> List[pd.DataFrame]:
+    """Split rows into at most ``partitions`` disjoint frames
+
+    ``time_column`` gives contiguous, equally sized time ranges; ``key``
+    hashes the key so every row of an entity lands in the same partition.
+    Without either, rows are split into contiguous ranges.
+    """
+    if partitions <= 1 or len(df) <= 1:
+        return [df]
+    if time_column and time_column in df.columns:
+        order = np.argsort(pd.to_datetime(df[time_column], utc=True, errors='coerce').to_numpy(), kind='stable')
+        return [df.iloc[part] for part in np.array_split(order, partitions) if len(part)]
+    if key and key in df.columns:
+        codes = pd.util.hash_pandas_object(df[key], index=False).to_numpy() % np.uint64(partitions)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.cumsum(np.bincount(codes.astype(np.intp), minlength=partitions))[:-1]
+        return [df.iloc[part] for part in np.split(order, bounds) if len(part)]
+    return [df.iloc[part] for part in np.array_split(np.arange(len(df)), partitions) if len(part)]
+
+
+def split_into_partitions(raw_ref: Dict[str, Any], run_id: str, partitions: int = None,
+                          key: Optional[str] = None, time_column: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Write one raw artifact per partition; returns the mapped tasks' kwargs"""
+    partitions = partitions or Config.ETL_PARTITIONS
+    key = key if key is not None else Config.ETL_PARTITION_KEY
+    time_column = time_column if time_column is not None else Config.ETL_PARTITION_TIME_COLUMN
+    metadata = {name: raw_ref[name] for name in ('timestamp', 'watermark') if name in raw_ref}
+
+    parts = partition_frame(read_artifact(raw_ref), partitions, key, time_column)
+    return [
+        {'raw_ref': write_artifact(part, f'raw-part-{index:04d}', run_id, metadata), 'index': index}
+        for index, part in enumerate(parts)
+    ]
+
+
+def fit_partition(raw_ref: Dict[str, Any], index: int, run_id: str) -> Dict[str, Any]:
+    """Fit a StreamingTransformer on one partition (map side of the statistics reduce)"""
+    transformer = StreamingTransformer().partial_fit(read_artifact(raw_ref))
+    return write_state(transformer, f'transformer-part-{index:04d}', run_id)
+
+
+def merge_partition_states(state_refs: Iterable[Dict[str, Any]], run_id: str) -> Dict[str, Any]:
+    """Reduce the partitions' quantile sketches and vocabularies (scaler moments follow in a second pass)"""
+    merged = StreamingTransformer()
+    for ref in state_refs:
+        if ref is not None:
+            merged.merge(read_state(ref))
+    if not merged.fitted:
+        raise ValueError("No partition produced a fitted transformer")
+    return write_state(merged, 'transformer', run_id)
+
+
+def scale_partition(raw_ref: Dict[str, Any], index: int, run_id: str,
+                    transformer_ref: Dict[str, Any]) -> Dict[str, Any]:
+    """Scaler moments of one partition under the merged fill values and category codes
+
+    Second map pass: the first pass's moments used partition-local codes.
+    """
+    transformer = read_state(transformer_ref)
+    return write_state(transformer.scaler_moments(read_artifact(raw_ref)), f'scaler-part-{index:04d}', run_id)
+
+
+def merge_scaler_states(transformer_ref: Dict[str, Any], moment_refs: Iterable[Dict[str, Any]],
+                        run_id: str) -> Dict[str, Any]:
+    """Reduce the second pass into the transformer the partitions are transformed with"""
+    transformer = read_state(transformer_ref)
+    transformer.set_scaler_moments(read_state(ref) for ref in moment_refs if ref is not None)
+    return write_state(transformer, 'transformer-scaled', run_id)
+
+
+def transform_partition(raw_ref: Dict[str, Any], index: int, run_id: str,
+                        transformer_ref: Dict[str, Any], incremental: bool = False) -> Dict[str, Any]:
+    """Apply the merged transformer to one partition"""
+    from src.data.incremental import entity_ids, source_hashes
+
+    raw = read_artifact(raw_ref)
+    features = read_state(transformer_ref).transform(raw)
+    metadata = {
+        'timestamp': raw_ref['timestamp'],
+        'feature_names': features.columns.tolist(),
+        'index': index
+    }
+    if Config.ENTITY_KEY_COLUMN in raw.columns:
+        keys = pd.DataFrame({'entity_id': entity_ids(raw, features).astype(str).to_numpy()})
+        if incremental:
+            keys['content_hash'] = source_hashes(raw, features)
+        metadata['keys'] = write_artifact(keys, f'keys-part-{index:04d}', run_id)
+    return {
+        'features_ref': write_artifact(features, f'features-part-{index:04d}', run_id, metadata),
+        'raw_ref': raw_ref,
+        'index': index
+    }
+
+
+def profile_partition(raw_ref: Dict[str, Any], index: int, run_id: str) -> Dict[str, Any]:
+    from src.data.profiling import profile_frame
+
+    return write_state(profile_frame(read_artifact(raw_ref)), f'profile-part-{index:04d}', run_id)
+
+
+def merge_profiles(profile_refs: Iterable[Dict[str, Any]]):
+    """Reduce the partition profiles into one batch profile"""
+    from src.data.profiling import DatasetProfile
+
+    merged = DatasetProfile()
+    for ref in profile_refs:
+        merged.merge(read_state(ref))
+    return merged
@@ -0,0 +1,236 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from src.utils.config import Config
+from src.utils.feature_store import BucketedFeatureStore, batch_time
+
+# Point-in-time training sets from the feature store. Every stored batch is
+# a snapshot of feature values taken at its timestamp; an event is joined to
+# the latest snapshot of its entity at or before the event time, so no
+# feature computed after the label leaks into training.
+
+ENTITY_COLUMN = 'entity_id'
+FEATURE_TIME_COLUMN = 'feature_timestamp'
+
+
+def _redis(redis_client=None):
+    if redis_client is None:
+        from src.utils.redis_client import RedisClient
+        redis_client = RedisClient()
+    return redis_client
+
+
+def list_batches(redis_client=None, layout: str = None) -> List[str]:
+    """Ids of the feature batches in the store, oldest first
+
+    Per-row (``keys``) batches are found by SCANning ``metadata:*``;
+    metadata written by the incremental entity upserts is skipped, as those
+    keys only hold each entity's latest row and have no history.
+    """
+    redis_client = _redis(redis_client)
+    layout = layout or Config.FEATURE_LAYOUT
+    if layout == 'buckets':
+        ids = BucketedFeatureStore(redis_client).batch_ids()
+    else:
+        client = redis_client.client
+        keys = list(client.scan_iter(match='metadata:*', count=1000))
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(key)
+        ids = [
+            key[len('metadata:'):] for key, value in zip(keys, pipe.execute())
+            if value and 'written' not in json.loads(value)
+        ]
+    return sorted(ids, key=lambda batch_id: (batch_time(batch_id) or pd.Timestamp.min, batch_id))
+
+
+def _read_row_keys(client, batch_id: str, chunk_size: int) -> Optional[Dict[str, Any]]:
+    metadata, entities = client.mget([f"metadata:{batch_id}", f"entities:{batch_id}"])
+    if not metadata:
+        return None
+    metadata = json.loads(metadata)
+    lines: List[Optional[str]] = []
+    for start in range(0, metadata['count'], chunk_size):
+        stop = min(start + chunk_size, metadata['count'])
+        lines.extend(client.mget([f"features:{batch_id}:{i}" for i in range(start, stop)]))
+    return {
+        'lines': lines,
+        'entity_ids': json.loads(entities) if entities else None,
+        'feature_names': metadata.get('feature_names', [])
+    }
+
+
+def read_batch(batch_id: str, redis_client=None, layout: str = None, chunk_size: int = 10000) -> pd.DataFrame:
+    """One batch as a frame with ``entity_id`` and ``feature_timestamp`` columns
+
+    Rows whose keys have expired are dropped. ``entity_id`` is null for
+    batches stored without entity ids.
+    """
+    redis_client = _redis(redis_client)
+    layout = layout or Config.FEATURE_LAYOUT
+    if layout == 'buckets':
+        batch = BucketedFeatureStore(redis_client).read_batch(batch_id)
+    else:
+        batch = _read_row_keys(redis_client.client, batch_id, chunk_size)
+    if batch is None:
+        return pd.DataFrame(columns=[ENTITY_COLUMN, FEATURE_TIME_COLUMN])
+
+    keep = [i for i, line in enumerate(batch['lines']) if line is not None]
+    if keep:
+        frame = pd.read_json(io.StringIO('\n'.join(batch['lines'][i] for i in keep)), lines=True,
+                             dtype=False, convert_dates=False)
+    else:
+        frame = pd.DataFrame(columns=batch['feature_names'])
+    entities = batch['entity_ids']
+    frame.insert(0, FEATURE_TIME_COLUMN, pd.Timestamp(batch_time(batch_id)) if batch_time(batch_id) else pd.NaT)
+    frame.insert(0, ENTITY_COLUMN, [entities[i] for i in keep] if entities else None)
+    return frame
+
+
+def iter_batch_frames(batch_ids: Iterable[str], redis_client=None, layout: str = None,
+                      workers: int = None) -> Iterator[pd.DataFrame]:
+    """Read batches concurrently, yielding frames in ``batch_ids`` order"""
+    redis_client = _redis(redis_client)
+    workers = workers or Config.FEATURE_EXPORT_WORKERS
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(lambda batch_id: read_batch(batch_id, redis_client, layout), batch_ids)
+
+
+def load_feature_history(redis_client=None, layout: str = None, entities: Optional[Iterable[Any]] = None,
+                         since: Optional[Any] = None, until: Optional[Any] = None,
+                         workers: int = None) -> pd.DataFrame:
+    """Every stored snapshot in ``[since, until]``, optionally restricted to ``entities``"""
+    since = pd.Timestamp(since) if since is not None else None
+    until = pd.Timestamp(until) if until is not None else None
+    batch_ids = []
+    for batch_id in list_batches(redis_client, layout):
+        when = batch_time(batch_id)
+        if when is None or (since is not None and when < since) or (until is not None and when > until):
+            continue
+        batch_ids.append(batch_id)
+
+    wanted = set(map(str, entities)) if entities is not None else None
+    frames = []
+    for frame in iter_batch_frames(batch_ids, redis_client, layout, workers):
+        frame = frame[frame[ENTITY_COLUMN].notna()]
+        if wanted is not None:
+            frame = frame[frame[ENTITY_COLUMN].isin(wanted)]
+        if len(frame):
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=[ENTITY_COLUMN, FEATURE_TIME_COLUMN])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _naive(values: pd.Series) -> pd.Series:
+    """Datetimes without a timezone (batch ids are naive local time)"""
+    values = pd.to_datetime(values)
+    return values.dt.tz_convert(None) if values.dt.tz is not None else values
+
+
+def point_in_time_join(events: pd.DataFrame, history: pd.DataFrame, entity_column: str = None,
+                       time_column: str = 'event_timestamp', max_age: Optional[Any] = None) -> pd.DataFrame:
+    """Attach to each event the features of its entity as of the event time
+
+    A sorted as-of search (``merge_asof`` by entity) picks, per event, the
+    latest snapshot with ``feature_timestamp <= event time``; snapshots older
+    than ``max_age`` (a Timedelta or string like ``'2h'``) are ignored.
+    Events without a snapshot get nulls. The events' order is kept and the
+    chosen ``feature_timestamp`` is returned with the features.
+    """
+    entity_column = entity_column or Config.ENTITY_KEY_COLUMN
+    left = events.copy()
+    left['_row'] = np.arange(len(left))
+    left['_entity'] = left[entity_column].astype(str)
+    left['_time'] = _naive(left[time_column])
+
+    right = history.drop(columns=[ENTITY_COLUMN]).assign(
+        _entity=history[ENTITY_COLUMN].astype(str),
+        _time=_naive(history[FEATURE_TIME_COLUMN])
+    )
+    joined = pd.merge_asof(
+        left.sort_values('_time', kind='stable'),
+        right.sort_values('_time', kind='stable'),
+        on='_time', by='_entity', direction='backward',
+        tolerance=pd.Timedelta(max_age) if max_age is not None else None,
+        suffixes=('', '_feature')
+    )
+    return joined.sort_values('_row').drop(columns=['_row', '_entity', '_time']).reset_index(drop=True)
+
+
+def build_training_set(events: pd.DataFrame, entity_column: str = None, time_column: str = 'event_timestamp',
+                       max_age: Optional[Any] = None, history: Optional[pd.DataFrame] = None,
+                       redis_client=None, layout: str = None) -> pd.DataFrame:
+    """Point-in-time correct training set for an entity/label/event-time frame
+
+    ``history`` (e.g. from ``read_feature_export``) is read from the live
+    store when not given, limited to the events' entities and time span.
+    """
+    entity_column = entity_column or Config.ENTITY_KEY_COLUMN
+    if history is None:
+        times = _naive(events[time_column])
+        since = times.min() - pd.Timedelta(max_age) if max_age is not None else None
+        history = load_feature_history(redis_client, layout, entities=events[entity_column].unique(),
+                                       since=since, until=times.max())
+    return point_in_time_join(events, history, entity_column, time_column, max_age)
+
+
+def export_feature_store(root: str, redis_client=None, layout: str = None, workers: int = None,
+                         compression: str = 'zstd') -> Dict[str, Any]:
+    """Write every batch of the store to ``{root}/{batch}.parquet``
+
+    ``root`` is a local directory or an ``s3://bucket/prefix`` URI. Batches
+    are discovered by SCAN, read with pipelined MGET/HMGET and written by a
+    pool of ``workers``; each file is one snapshot, so schema changes between
+    batches don't conflict. ``read_feature_export`` loads the result back as
+    the same history frame the live store produces.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from src.data.artifacts import _store, safe_run_id
+
+    redis_client = _redis(redis_client)
+    workers = workers or Config.FEATURE_EXPORT_WORKERS
+    root = root.rstrip('/')
+
+    def export(batch_id: str) -> int:
+        frame = read_batch(batch_id, redis_client, layout)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        _store(f"{root}/{safe_run_id(batch_id)}.parquet",
+               lambda path: pq.write_table(table, path, compression=compression))
+        return table.num_rows
+
+    batch_ids = list_batches(redis_client, layout)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        rows = sum(executor.map(export, batch_ids))
+    return {'root': root, 'batches': len(batch_ids), 'rows': rows}
+
+
+def read_feature_export(root: str, entities: Optional[Iterable[Any]] = None) -> pd.DataFrame:
+    """Load an ``export_feature_store`` directory as a feature history frame"""
+    import pyarrow.dataset as ds
+
+    if root.startswith('s3://'):
+        from pyarrow import fs
+        dataset = ds.dataset(root[len('s3://'):], format='parquet',
+                             filesystem=fs.S3FileSystem(region=Config.AWS_REGION))
+    else:
+        dataset = ds.dataset(root, format='parquet')
+    # Batches may differ in feature columns; missing ones become null
+    table = ds.dataset(dataset.files, schema=_unified_schema(dataset), format='parquet',
+                       filesystem=dataset.filesystem).to_table()
+    history = table.to_pandas()
+    if entities is not None:
+        history = history[history[ENTITY_COLUMN].isin(set(map(str, entities)))]
+    return history.reset_index(drop=True)
+
+
+def _unified_schema(dataset):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schemas = [pq.read_schema(path, filesystem=dataset.filesystem) for path in dataset.files]
+    return pa.unify_schemas(schemas) if schemas else dataset.schema
@@ -0,0 +1,329 @@
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from src.data.sketches import CategoryCounter, HyperLogLog, QuantileSketch
+from src.utils.config import Config
+
+
+class ColumnProfile:
+    """Constant-size summary of one column
+
+    Numeric columns keep a quantile sketch plus running sums, categorical
+    ones a bounded category counter; both keep null counts and a
+    HyperLogLog for distinct values. Memory does not grow with row count.
+    """
+
+    def __init__(self, kind: str, compression: int = 100, precision: int = 12, max_categories: int = 1000):
+        self.kind = kind
+        self.count = 0
+        self.null_count = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.distinct = HyperLogLog(precision)
+        self.sketch = QuantileSketch(compression) if kind == 'numeric' else None
+        self.counter = CategoryCounter(max_categories) if kind == 'categorical' else None
+
+    def update(self, series: pd.Series) -> "ColumnProfile":
+        present = series.dropna()
+        self.count += len(series)
+        self.null_count += len(series) - len(present)
+        self.distinct.update(present)
+        if self.kind == 'numeric':
+            values = pd.to_numeric(present, errors='coerce').to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            self.sketch.update(values)
+            self.total += float(values.sum())
+            self.total_squares += float(np.square(values).sum())
+        else:
+            self.counter.update(present)
+        return self
+
+    def merge(self, other: "ColumnProfile") -> "ColumnProfile":
+        self.count += other.count
+        self.null_count += other.null_count
+        self.total += other.total
+        self.total_squares += other.total_squares
+        self.distinct.merge(other.distinct)
+        if self.kind == 'numeric':
+            self.sketch.merge(other.sketch)
+        else:
+            self.counter.merge(other.counter)
+        return self
+
+    @property
+    def null_rate(self) -> float:
+        return self.null_count / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        summary = {
+            'kind': self.kind,
+            'count': self.count,
+            'null_rate': self.null_rate,
+            'distinct': self.distinct.estimate()
+        }
+        if self.kind == 'numeric':
+            n = self.sketch.count
+            mean = self.total / n if n else None
+            summary.update({
+                'mean': mean,
+                'std': float(np.sqrt(max(self.total_squares / n - mean ** 2, 0.0))) if n else None,
+                'min': self.sketch.min if n else None,
+                'max': self.sketch.max if n else None,
+                'quantiles': dict(zip(('p01', 'p25', 'p50', 'p75', 'p99'),
+                                      np.atleast_1d(self.sketch.quantile([0.01, 0.25, 0.5, 0.75, 0.99])).tolist()))
+            })
+        summary['histogram'] = self.histogram()
+        return summary
+
+    def histogram(self, bins: int = 10) -> Dict[str, List[Any]]:
+        """Equal-width bins for numeric columns (from the sketch), top categories otherwise"""
+        if self.kind == 'categorical':
+            top = sorted(self.counter.counts.items(), key=lambda item: item[1], reverse=True)[:bins]
+            return {'values': [value for value, _ in top], 'counts': [count for _, count in top]}
+        if not self.sketch.count:
+            return {'edges': [], 'counts': []}
+        edges = np.linspace(self.sketch.min, self.sketch.max, bins + 1)
+        cdf = np.concatenate([[0.0], np.atleast_1d(self.sketch.cdf(edges[1:-1])), [1.0]])
+        counts = np.diff(cdf) * self.sketch.count
+        return {'edges': edges.tolist(), 'counts': counts.tolist()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'kind': self.kind,
+            'count': self.count,
+            'null_count': self.null_count,
+            'total': self.total,
+            'total_squares': self.total_squares,
+            'distinct': self.distinct.to_dict(),
+            'sketch': self.sketch.to_dict() if self.sketch is not None else None,
+            'counter': self.counter.to_dict() if self.counter is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ColumnProfile":
+        profile = cls(data['kind'])
+        profile.count = data['count']
+        profile.null_count = data['null_count']
+        profile.total = data['total']
+        profile.total_squares = data['total_squares']
+        profile.distinct = HyperLogLog.from_dict(data['distinct'])
+        if data['sketch'] is not None:
+            profile.sketch = QuantileSketch.from_dict(data['sketch'])
+        if data['counter'] is not None:
+            profile.counter = CategoryCounter.from_dict(data['counter'])
+        return profile
+
+
+class DatasetProfile:
+    """Per-column profiles of a batch, built in one pass over its chunks"""
+
+    def __init__(self, compression: int = 100, precision: int = 12, max_categories: int = None):
+        self.compression = compression
+        self.precision = precision
+        self.max_categories = max_categories or Config.PROFILE_MAX_CATEGORIES
+        self.row_count = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+
+    def update(self, chunk: pd.DataFrame) -> "DatasetProfile":
+        self.row_count += len(chunk)
+        for col in chunk.columns:
+            profile = self.columns.get(col)
+            if profile is None:
+                kind = 'numeric' if pd.api.types.is_numeric_dtype(chunk[col]) else 'categorical'
+                profile = self.columns[col] = ColumnProfile(
+                    kind, self.compression, self.precision, self.max_categories
+                )
+            profile.update(chunk[col])
+        return self
+
+    def merge(self, other: "DatasetProfile") -> "DatasetProfile":
+        self.row_count += other.row_count
+        for col, profile in other.columns.items():
+            if col in self.columns:
+                self.columns[col].merge(profile)
+            else:
+                self.columns[col] = ColumnProfile.from_dict(profile.to_dict())
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'row_count': self.row_count,
+            'columns': {col: profile.summary() for col, profile in self.columns.items()}
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'row_count': self.row_count,
+            'columns': {col: profile.to_dict() for col, profile in self.columns.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DatasetProfile":
+        profile = cls()
+        profile.row_count = data['row_count']
+        profile.columns = {col: ColumnProfile.from_dict(item) for col, item in data['columns'].items()}
+        return profile
+
+
+def profile_frame(data: Any, chunk_size: int = 100000) -> DatasetProfile:
+    """Profile a DataFrame, an Arrow table or an iterable of DataFrame chunks"""
+    profile = DatasetProfile()
+    if isinstance(data, pd.DataFrame):
+        chunks: Iterable[pd.DataFrame] = (data.iloc[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+    elif hasattr(data, 'to_batches'):
+        chunks = (batch.to_pandas() for batch in data.to_batches(max_chunksize=chunk_size))
+    else:
+        chunks = data
+    for chunk in chunks:
+        profile.update(chunk)
+    return profile
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray, epsilon: float = 1e-4) -> float:
+    expected = np.clip(np.asarray(expected, dtype=np.float64), epsilon, None)
+    actual = np.clip(np.asarray(actual, dtype=np.float64), epsilon, None)
+    expected /= expected.sum()
+    actual /= actual.sum()
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def _numeric_drift(reference: ColumnProfile, current: ColumnProfile, bins: int) -> Dict[str, float]:
+    if not reference.sketch.count or not current.sketch.count:
+        return {'psi': 0.0, 'ks': 0.0}
+    # PSI over the reference's quantile bins, read back from both sketches
+    edges = np.unique(np.atleast_1d(reference.sketch.quantile(np.linspace(0, 1, bins + 1)[1:-1])))
+    expected = np.diff(np.concatenate([[0.0], np.atleast_1d(reference.sketch.cdf(edges)), [1.0]]))
+    actual = np.diff(np.concatenate([[0.0], np.atleast_1d(current.sketch.cdf(edges)), [1.0]]))
+    # KS statistic evaluated at every centroid of either sketch
+    points = np.concatenate([reference.sketch.means, current.sketch.means])
+    ks = np.max(np.abs(np.atleast_1d(reference.sketch.cdf(points)) - np.atleast_1d(current.sketch.cdf(points))))
+    return {'psi': population_stability_index(expected, actual), 'ks': float(ks)}
+
+
+def _categorical_drift(reference: ColumnProfile, current: ColumnProfile) -> Dict[str, float]:
+    categories = list(dict.fromkeys(list(reference.counter.counts) + list(current.counter.counts)))
+    if not categories:
+        return {'psi': 0.0}
+    expected = np.array([reference.counter.counts.get(c, 0) for c in categories], dtype=np.float64)
+    actual = np.array([current.counter.counts.get(c, 0) for c in categories], dtype=np.float64)
+    if not expected.sum() or not actual.sum():
+        return {'psi': 0.0}
+    return {'psi': population_stability_index(expected, actual)}
+
+
+def _identifier_like(profile: ColumnProfile) -> bool:
+    """Mostly-unique categoricals (ids, raw timestamps) have no stable distribution"""
+    present = profile.count - profile.null_count
+    return profile.kind == 'categorical' and present > 0 and profile.distinct.estimate() > 0.5 * present
+
+
+def compare_profiles(reference: DatasetProfile, current: DatasetProfile, bins: int = 10,
+                     psi_threshold: float = None, ks_threshold: float = None,
+                     null_rate_threshold: float = None, exclude: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Drift scores of ``current`` against ``reference``, per shared column
+    
+    Columns in ``exclude`` (default ``DRIFT_EXCLUDE_COLUMNS``) are skipped and
+    identifier-like categoricals are only checked for null-rate changes.
+    """
+    if exclude is None:
+        exclude = [col.strip() for col in Config.DRIFT_EXCLUDE_COLUMNS.split(',') if col.strip()]
+    exclude = set(exclude)
+    psi_threshold = Config.DRIFT_PSI_THRESHOLD if psi_threshold is None else psi_threshold
+    ks_threshold = Config.DRIFT_KS_THRESHOLD if ks_threshold is None else ks_threshold
+    null_rate_threshold = Config.DRIFT_NULL_RATE_THRESHOLD if null_rate_threshold is None else null_rate_threshold
+
+    columns = {}
+    for col, profile in current.columns.items():
+        base = reference.columns.get(col)
+        if col in exclude or base is None or base.kind != profile.kind:
+            continue
+        if profile.kind == 'numeric':
+            scores = _numeric_drift(base, profile, bins)
+        elif _identifier_like(base) or _identifier_like(profile):
+            scores = {'psi': 0.0}
+        else:
+            scores = _categorical_drift(base, profile)
+        scores['null_rate_delta'] = profile.null_rate - base.null_rate
+        scores['drifted'] = bool(
+            scores['psi'] > psi_threshold
+            or scores.get('ks', 0.0) > ks_threshold
+            or abs(scores['null_rate_delta']) > null_rate_threshold
+        )
+        columns[col] = scores
+
+    return {
+        'drift_detected': any(scores['drifted'] for scores in columns.values()),
+        'drifted_columns': [col for col, scores in columns.items() if scores['drifted']],
+        'missing_columns': [col for col in reference.columns if col not in current.columns],
+        'new_columns': [col for col in current.columns if col not in reference.columns],
+        'columns': columns
+    }
+
+
+class ProfileStore:
+    """Batch profiles in Redis under ``profile:{timestamp}``
+
+    Accepted profiles are also indexed in the ``profiles`` sorted set (by
+    batch time) and form the reference for later batches; rejected ones are
+    kept for inspection only.
+    """
+
+    def __init__(self, redis_client=None):
+        if redis_client is None:
+            from src.utils.redis_client import RedisClient
+            redis_client = RedisClient()
+        self.redis_client = redis_client
+
+    def save(self, profile: DatasetProfile, timestamp: str, accepted: bool = True,
+             drift: Optional[Dict[str, Any]] = None, ttl: int = None) -> None:
+        ttl = ttl or Config.PROFILE_TTL
+        client = self.redis_client.client
+        client.setex(f"profile:{timestamp}", ttl, json.dumps({
+            'profile': profile.to_dict(),
+            'accepted': accepted,
+            'drift': drift
+        }))
+        if accepted:
+            client.zadd("profiles", {timestamp: datetime.fromisoformat(timestamp).timestamp()})
+
+    def load(self, timestamp: str) -> Optional[DatasetProfile]:
+        data = self.redis_client.client.get(f"profile:{timestamp}")
+        return DatasetProfile.from_dict(json.loads(data)['profile']) if data else None
+
+    def reference(self, window: int = None) -> Optional[DatasetProfile]:
+        """Merge of the last ``window`` accepted profiles"""
+        window = window or Config.DRIFT_REFERENCE_WINDOW
+        reference = None
+        for timestamp in self.redis_client.client.zrevrange("profiles", 0, window - 1):
+            profile = self.load(timestamp)
+            if profile is None:
+                # Expired; drop it from the index
+                self.redis_client.client.zrem("profiles", timestamp)
+                continue
+            reference = profile if reference is None else reference.merge(profile)
+        return reference
+
+
+def check_batch_drift(data: Any, timestamp: str, store: Optional[ProfileStore] = None) -> Dict[str, Any]:
+    """Profile a batch, compare it with the stored reference and persist it
+
+    Returns the drift report (``drift_detected`` is False when there is no
+    reference yet) with the batch summary attached.
+    """
+    return check_profile_drift(profile_frame(data), timestamp, store)
+
+
+def check_profile_drift(profile: DatasetProfile, timestamp: str,
+                        store: Optional[ProfileStore] = None) -> Dict[str, Any]:
+    """``check_batch_drift`` for an already built (e.g. merged) profile"""
+    store = store or ProfileStore()
+    reference = store.reference()
+    if reference is None:
+        drift = {'drift_detected': False, 'drifted_columns': [], 'columns': {}}
+    else:
+        drift = compare_profiles(reference, profile)
+    store.save(profile, timestamp, accepted=not drift['drift_detected'], drift=drift)
+    drift['summary'] = profile.summary()
+    return drift
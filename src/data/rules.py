@@ -0,0 +1,283 @@
+import json
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+# Checks that describe the shape of the data rather than its values;
+# DataValidator.validate_schema runs these, validate_data_quality the rest
+SCHEMA_EXPECTATIONS = frozenset([
+    'expect_column_to_exist',
+    'expect_column_values_to_be_of_type',
+    'expect_column_values_to_not_be_null'
+])
+
+
+class Rule:
+    """One expectation from a suite file"""
+
+    def __init__(self, expectation_type: str, kwargs: Optional[Dict[str, Any]] = None,
+                 meta: Optional[Dict[str, Any]] = None):
+        if expectation_type not in RULE_CHECKS and expectation_type not in TABLE_CHECKS:
+            raise ValueError(f"Unsupported expectation: {expectation_type}")
+        self.expectation_type = expectation_type
+        self.kwargs = dict(kwargs or {})
+        self.meta = dict(meta or {})
+
+    @property
+    def column(self) -> Optional[str]:
+        return self.kwargs.get('column')
+
+    @property
+    def severity(self) -> str:
+        return self.meta.get('severity', 'error')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'expectation_type': self.expectation_type, 'kwargs': self.kwargs, 'meta': self.meta}
+
+
+class RuleSuite:
+    """Declarative validation suite in Great Expectations' JSON layout
+
+    ``{"expectation_suite_name": ..., "expectations": [{"expectation_type":
+    ..., "kwargs": {...}, "meta": {"severity": "warning"}}]}``, so the same
+    file can be run natively or by the Great Expectations backend.
+    """
+
+    def __init__(self, name: str, rules: Iterable[Rule]):
+        self.name = name
+        self.rules = list(rules)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RuleSuite":
+        rules = [
+            Rule(item['expectation_type'], item.get('kwargs'), item.get('meta'))
+            for item in data.get('expectations', [])
+        ]
+        return cls(data.get('expectation_suite_name', 'suite'), rules)
+
+    @classmethod
+    def load(cls, path: str) -> "RuleSuite":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def select(self, include: Optional[Iterable[str]] = None,
+               exclude: Optional[Iterable[str]] = None) -> "RuleSuite":
+        include = set(include) if include is not None else None
+        exclude = set(exclude or ())
+        rules = [
+            rule for rule in self.rules
+            if (include is None or rule.expectation_type in include) and rule.expectation_type not in exclude
+        ]
+        return RuleSuite(self.name, rules)
+
+
+class _ColumnView:
+    """A column materialized once and shared by every rule on it"""
+
+    def __init__(self, series: pd.Series):
+        self.series = series
+        self.null = series.isna().to_numpy()
+        self.element_count = len(series)
+        self.nonnull_count = int(self.element_count - self.null.sum())
+        self._numeric = None
+        self._present = None
+
+    @property
+    def present(self) -> pd.Series:
+        if self._present is None:
+            self._present = self.series[~self.null]
+        return self._present
+
+    @property
+    def numeric(self) -> np.ndarray:
+        if self._numeric is None:
+            self._numeric = pd.to_numeric(self.present, errors='coerce').to_numpy(dtype=np.float64)
+        return self._numeric
+
+
+def _check_not_null(view: _ColumnView, kwargs: Dict[str, Any]) -> int:
+    return view.element_count - view.nonnull_count
+
+
+def _check_type(view: _ColumnView, kwargs: Dict[str, Any]) -> int:
+    # Column-level check: every element counts when the dtype is wrong
+    allowed = kwargs.get('type_list') or [kwargs['type_']]
+    return 0 if str(view.series.dtype) in allowed else view.element_count
+
+
+def _check_between(view: _ColumnView, kwargs: Dict[str, Any]) -> int:
+    values = view.numeric
+    bad = np.isnan(values)
+    low, high = kwargs.get('min_value'), kwargs.get('max_value')
+    if low is not None:
+        bad |= values <= low if kwargs.get('strict_min') else values < low
+    if high is not None:
+        bad |= values >= high if kwargs.get('strict_max') else values > high
+    return int(bad.sum())
+
+
+def _check_unique(view: _ColumnView, kwargs: Dict[str, Any]) -> int:
+    return int(view.present.duplicated(keep=False).sum())
+
+
+def _check_in_set(view: _ColumnView, kwargs: Dict[str, Any]) -> int:
+    return int((~view.present.isin(kwargs['value_set'])).sum())
+
+
+def _check_regex(view: _ColumnView, kwargs: Dict[str, Any]) -> int:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    # Arrow's RE2 kernel runs over the whole column without per-row Python calls
+    strings = pa.array(view.present.astype(str).to_numpy(), type=pa.string())
+    matched = pc.match_substring_regex(strings, kwargs['regex'])
+    return int(len(strings) - pc.sum(matched).as_py()) if len(strings) else 0
+
+
+RULE_CHECKS = {
+    'expect_column_to_exist': None,
+    'expect_column_values_to_not_be_null': _check_not_null,
+    'expect_column_values_to_be_of_type': _check_type,
+    'expect_column_values_to_be_between': _check_between,
+    'expect_column_values_to_be_unique': _check_unique,
+    'expect_column_values_to_be_in_set': _check_in_set,
+    'expect_column_values_to_match_regex': _check_regex
+}
+
+TABLE_CHECKS = ('expect_table_row_count_to_be_between', 'expect_table_column_count_to_equal')
+
+MESSAGES = {
+    'expect_column_values_to_not_be_null': "Null values found in column {column} ({unexpected_count} rows)",
+    'expect_column_values_to_be_of_type': "Column {column} has dtype {dtype}, expected {expected}",
+    'expect_column_values_to_be_between': "{unexpected_count} values of {column} outside [{min_value}, {max_value}]",
+    'expect_column_values_to_be_unique': "{unexpected_count} duplicated values in column {column}",
+    'expect_column_values_to_be_in_set': "{unexpected_count} values of {column} not in the allowed set",
+    'expect_column_values_to_match_regex': "{unexpected_count} values of {column} do not match {regex}"
+}
+
+
+class RuleEngine:
+    """Evaluates a RuleSuite against a DataFrame
+
+    Rules are grouped by column and each column is materialized once (null
+    mask, present values, numeric view) for all of its rules; every check is
+    a vectorized NumPy, pandas or Arrow operation.
+    """
+
+    def __init__(self, suite: RuleSuite):
+        self.suite = suite
+
+    def evaluate(self, df: pd.DataFrame) -> Dict[str, Any]:
+        results = []
+        views: Dict[str, _ColumnView] = {}
+
+        for rule in self.suite.rules:
+            if rule.expectation_type in TABLE_CHECKS:
+                results.append(self._evaluate_table(rule, df))
+                continue
+
+            column = rule.column
+            if column not in df.columns:
+                results.append(self._result(rule, False, message=f"Missing column: {column}"))
+                continue
+            if rule.expectation_type == 'expect_column_to_exist':
+                results.append(self._result(rule, True))
+                continue
+
+            view = views.get(column)
+            if view is None:
+                view = views[column] = _ColumnView(df[column])
+            unexpected = RULE_CHECKS[rule.expectation_type](view, rule.kwargs)
+            results.append(self._column_result(rule, view, unexpected))
+
+        failed = [result for result in results if not result['success']]
+        evaluated = len(results)
+        return {
+            'success': not any(result['severity'] == 'error' for result in failed),
+            'statistics': {
+                'evaluated_expectations': evaluated,
+                'successful_expectations': evaluated - len(failed),
+                'unsuccessful_expectations': len(failed),
+                'success_percent': 100.0 * (evaluated - len(failed)) / evaluated if evaluated else 100.0
+            },
+            'results': results
+        }
+
+    def _evaluate_table(self, rule: Rule, df: pd.DataFrame) -> Dict[str, Any]:
+        if rule.expectation_type == 'expect_table_row_count_to_be_between':
+            low, high = rule.kwargs.get('min_value'), rule.kwargs.get('max_value')
+            observed = len(df)
+            success = (low is None or observed >= low) and (high is None or observed <= high)
+            message = f"Row count {observed} outside [{low}, {high}]"
+        else:
+            observed = len(df.columns)
+            success = observed == rule.kwargs['value']
+            message = f"Column count {observed}, expected {rule.kwargs['value']}"
+        return self._result(rule, success, observed_value=observed, message=None if success else message)
+
+    def _column_result(self, rule: Rule, view: _ColumnView, unexpected: int) -> Dict[str, Any]:
+        # Null checks count against every row, value checks only against present values
+        if rule.expectation_type in ('expect_column_values_to_not_be_null', 'expect_column_values_to_be_of_type'):
+            denominator = view.element_count
+        else:
+            denominator = view.nonnull_count
+        unexpected_percent = 100.0 * unexpected / denominator if denominator else 0.0
+        mostly = rule.kwargs.get('mostly', 1.0)
+        success = unexpected == 0 or (denominator and 1 - unexpected / denominator >= mostly)
+
+        message = None
+        if not success:
+            expected = rule.kwargs.get('type_list') or rule.kwargs.get('type_')
+            message = MESSAGES[rule.expectation_type].format(
+                unexpected_count=unexpected, dtype=view.series.dtype, expected=expected,
+                **{key: rule.kwargs.get(key) for key in ('column', 'min_value', 'max_value', 'regex')}
+            )
+        return self._result(rule, bool(success), element_count=view.element_count,
+                            unexpected_count=unexpected, unexpected_percent=unexpected_percent,
+                            message=message)
+
+    @staticmethod
+    def _result(rule: Rule, success: bool, message: Optional[str] = None, **details) -> Dict[str, Any]:
+        result = {
+            'expectation_type': rule.expectation_type,
+            'column': rule.column,
+            'success': success,
+            'severity': rule.severity,
+            'message': message
+        }
+        result.update(details)
+        return result
+
+
+def _expectation_class(expectation_type: str) -> str:
+    return ''.join(part.capitalize() for part in expectation_type.split('_'))
+
+
+class GreatExpectationsBackend:
+    """Runs a RuleSuite through Great Expectations (1.x)
+
+    The ephemeral context, pandas data source and suite are registered once
+    per backend instance and reused for every batch.
+    """
+
+    def __init__(self, suite: RuleSuite):
+        import great_expectations as gx
+
+        self.context = gx.get_context(mode='ephemeral')
+        asset = self.context.data_sources.add_pandas('validation_source').add_dataframe_asset('validation_asset')
+        self.batch_definition = asset.add_batch_definition_whole_dataframe('validation_batch')
+
+        gx_suite = gx.ExpectationSuite(name=suite.name)
+        for rule in suite.rules:
+            expectation = getattr(gx.expectations, _expectation_class(rule.expectation_type))
+            gx_suite.add_expectation(expectation(**rule.kwargs, meta=rule.meta or None))
+        self.suite = self.context.suites.add(gx_suite)
+
+    def evaluate(self, df: pd.DataFrame) -> Dict[str, Any]:
+        batch = self.batch_definition.get_batch(batch_parameters={'dataframe': df})
+        result = batch.validate(self.suite)
+        return {
+            'success': result.success,
+            'statistics': result.statistics,
+            'results': [item.to_json_dict() for item in result.results]
+        }
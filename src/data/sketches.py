@@ -0,0 +1,217 @@
+import numpy as np
+from typing import Any, Dict, Iterable, List
+
+
+class QuantileSketch:
+    """Mergeable t-digest style quantile sketch
+
+    Values are summarized as weighted centroids whose size is bounded by the
+    arcsine scale function, so the tails stay precise while memory stays at
+    roughly ``compression`` centroids however many values are added.
+    Updates and merges are vectorized: points are sorted once and grouped
+    with ``np.add.reduceat``.
+    """
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: Iterable[float]) -> "QuantileSketch":
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size:
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self._compress(values, np.ones(values.size))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.weights.size:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(other.means, other.weights)
+        return self
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        total = weights.sum()
+        q_mid = (np.cumsum(weights) - weights / 2) / total
+        # Centroids are the runs of points falling in the same unit of k
+        k = np.floor(self.compression / np.pi * np.arcsin(2 * q_mid - 1))
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(k)) + 1])
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def _knots(self):
+        total = self.weights.sum()
+        cum_mid = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], cum_mid, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return positions, values, total
+
+    def quantile(self, q):
+        """Approximate value at quantile(s) q in [0, 1]"""
+        if not self.weights.size:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        positions, values, total = self._knots()
+        result = np.interp(np.asarray(q, dtype=np.float64) * total, positions, values)
+        return result if np.ndim(q) else float(result)
+
+    def cdf(self, x):
+        """Approximate fraction of values <= x"""
+        if not self.weights.size:
+            return np.full(np.shape(x), np.nan) if np.ndim(x) else np.nan
+        positions, values, total = self._knots()
+        result = np.interp(np.asarray(x, dtype=np.float64), values, positions) / total
+        return result if np.ndim(x) else float(result)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'compression': self.compression,
+            'means': self.means.tolist(),
+            'weights': self.weights.tolist(),
+            'min': self.min if self.weights.size else None,
+            'max': self.max if self.weights.size else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(compression=data['compression'])
+        sketch.means = np.asarray(data['means'], dtype=np.float64)
+        sketch.weights = np.asarray(data['weights'], dtype=np.float64)
+        if sketch.weights.size:
+            sketch.min, sketch.max = data['min'], data['max']
+        return sketch
+
+
+class CategoryCounter:
+    """Incrementally grown category vocabulary with occurrence counts
+
+    Categories keep their first-seen position, so codes handed out for
+    earlier chunks never change. Once ``max_categories`` is reached new
+    values are no longer added (they encode as unknown), which keeps memory
+    bounded for high-cardinality columns.
+    """
+
+    def __init__(self, max_categories: int = 100000):
+        self.max_categories = max_categories
+        self.counts: Dict[str, int] = {}
+
+    @property
+    def vocabulary(self) -> List[str]:
+        return list(self.counts)
+
+    def update(self, values) -> "CategoryCounter":
+        import pandas as pd
+
+        counts = pd.Series(values).dropna().astype(str).value_counts(sort=False)
+        for value, count in counts.items():
+            if value in self.counts:
+                self.counts[value] += int(count)
+            elif len(self.counts) < self.max_categories:
+                self.counts[value] = int(count)
+        return self
+
+    def merge(self, other: "CategoryCounter") -> "CategoryCounter":
+        for value, count in other.counts.items():
+            if value in self.counts:
+                self.counts[value] += count
+            elif len(self.counts) < self.max_categories:
+                self.counts[value] = count
+        return self
+
+    def mode(self, default: str = 'Unknown') -> str:
+        if not self.counts:
+            return default
+        return max(self.counts.items(), key=lambda item: item[1])[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'max_categories': self.max_categories, 'counts': self.counts}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CategoryCounter":
+        counter = cls(max_categories=data['max_categories'])
+        counter.counts = dict(data['counts'])
+        return counter
+
+
+class HyperLogLog:
+    """Mergeable distinct-count estimator with ``2 ** precision`` one-byte registers
+
+    Values are hashed with ``pandas.util.hash_array``; the top ``precision``
+    bits pick a register and the register keeps the longest run of leading
+    zeros seen in the remaining bits. Standard error is about
+    ``1.04 / sqrt(2 ** precision)`` (1.6% at the default precision).
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values) -> "HyperLogLog":
+        import pandas as pd
+
+        values = pd.Series(values).dropna().to_numpy()
+        if not values.size:
+            return self
+        hashes = pd.util.hash_array(values)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        rest = hashes << np.uint64(self.precision)
+
+        # Leading zeros of a 64-bit word, exactly, from its two 32-bit halves
+        high = (rest >> np.uint64(32)).astype(np.float64)
+        low = (rest & np.uint64(0xFFFFFFFF)).astype(np.float64)
+        with np.errstate(divide='ignore'):
+            leading = np.where(
+                high > 0, 31 - np.floor(np.log2(high)),
+                np.where(low > 0, 63 - np.floor(np.log2(low)), 64)
+            )
+        rank = np.minimum(leading + 1, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        m = float(self.registers.size)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are empty
+            return float(m * np.log(m / zeros))
+        return float(raw)
+
+    def to_dict(self) -> Dict[str, Any]:
+        import base64
+
+        return {
+            'precision': self.precision,
+            'registers': base64.b64encode(self.registers.tobytes()).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HyperLogLog":
+        import base64
+
+        hll = cls(precision=data['precision'])
+        hll.registers = np.frombuffer(base64.b64decode(data['registers']), dtype=np.uint8).copy()
+        return hll
@@ -0,0 +1,158 @@
+import pandas as pd
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from sklearn.preprocessing import StandardScaler
+from src.data.sketches import CategoryCounter, QuantileSketch
+from src.data.transformation import DataTransformer
+
+
+class StreamingTransformer(DataTransformer):
+    """Out-of-core DataTransformer fitted incrementally over bounded chunks
+
+    ``partial_fit`` folds each chunk into constant-size state: a quantile
+    sketch per numeric column (for the median fill), a growing vocabulary
+    with counts per categorical column (for the mode fill and the codes) and
+    ``StandardScaler.partial_fit`` for scaling. Once fitted, the inherited
+    ``transform`` is applied chunk by chunk, so peak memory depends on the
+    chunk size rather than the input size.
+
+    Differences from the in-memory fit: duplicates are only dropped within a
+    chunk, medians are approximate, fill values used while fitting the
+    scaler are the running estimates, and category codes follow first
+    appearance rather than sorted order.
+    """
+
+    def __init__(self, compression: int = 100, max_categories: int = 100000):
+        super().__init__()
+        self.compression = compression
+        self.max_categories = max_categories
+        self.numeric_sketches: Dict[str, QuantileSketch] = {}
+        self.category_counters: Dict[str, CategoryCounter] = {}
+
+    def partial_fit(self, chunk: pd.DataFrame) -> "StreamingTransformer":
+        """Update the fitted state with one chunk"""
+        chunk = chunk.drop_duplicates()
+        if chunk.empty:
+            return self
+
+        # Column kinds are frozen on the first chunk; an all-null chunk would
+        # otherwise turn a numeric column into an object one
+        if not self.numeric_sketches and not self.category_counters:
+            for col in chunk.select_dtypes(include=[np.number]).columns:
+                self.numeric_sketches[col] = QuantileSketch(self.compression)
+            for col in chunk.select_dtypes(include=['object']).columns:
+                self.category_counters[col] = CategoryCounter(self.max_categories)
+
+        for col, sketch in self.numeric_sketches.items():
+            if col in chunk.columns:
+                sketch.update(pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64))
+        for col, counter in self.category_counters.items():
+            if col in chunk.columns:
+                counter.update(chunk[col])
+
+        self._refresh_state()
+
+        encoded = self.clean_data(chunk, fit=False)
+        encoded = self.engineer_features(encoded)
+        encoded = self.encode_categorical(encoded, fit=False)
+        if not self.scaled_columns_:
+            self.scaled_columns_ = encoded.select_dtypes(include=[np.number]).columns.tolist()
+            self.feature_names_ = encoded.columns.tolist()
+        self.scaler.partial_fit(encoded[self.scaled_columns_])
+        self.fitted = True
+        return self
+
+    def merge(self, other: "StreamingTransformer") -> "StreamingTransformer":
+        """Fold in the state of a transformer fitted on a different partition
+
+        Sketches and vocabularies merge exactly. Scaler moments are combined
+        as they are, which is only right for columns encoded the same way in
+        both partitions: categorical codes follow each partition's own first
+        appearance, so their merged moments are meaningless. Recompute the
+        moments over the merged state with ``scaler_moments`` and
+        ``set_scaler_moments`` before transforming.
+        """
+        for col, sketch in other.numeric_sketches.items():
+            self.numeric_sketches.setdefault(col, QuantileSketch(self.compression)).merge(sketch)
+        for col, counter in other.category_counters.items():
+            self.category_counters.setdefault(col, CategoryCounter(self.max_categories)).merge(counter)
+
+        if other.fitted:
+            if not self.fitted:
+                self.scaler = other.scaler
+                self.scaled_columns_ = list(other.scaled_columns_)
+                self.feature_names_ = list(other.feature_names_)
+            else:
+                self.scaler = _merge_scalers(self.scaler, other.scaler)
+            self.fitted = True
+
+        self._refresh_state()
+        return self
+
+    def scaler_moments(self, chunk: pd.DataFrame) -> StandardScaler:
+        """Scaler moments of one chunk under the current fill values and category codes"""
+        encoded = self.clean_data(chunk, fit=False)
+        encoded = self.engineer_features(encoded)
+        encoded = self.encode_categorical(encoded, fit=False)
+        return StandardScaler().partial_fit(encoded[self.scaled_columns_])
+
+    def set_scaler_moments(self, scalers: Iterable[StandardScaler]) -> "StreamingTransformer":
+        """Replace the scaler with the combination of per-chunk ``scaler_moments``"""
+        merged = None
+        for scaler in scalers:
+            merged = scaler if merged is None else _merge_scalers(merged, scaler)
+        if merged is None:
+            raise ValueError("No scaler moments to combine")
+        self.scaler = merged
+        return self
+
+    def _refresh_state(self) -> None:
+        for col, sketch in self.numeric_sketches.items():
+            self.fill_values[col] = sketch.quantile(0.5)
+        for col, counter in self.category_counters.items():
+            self.fill_values[col] = counter.mode()
+            self.categories_[col] = counter.vocabulary
+
+    def transform_stream(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Transform chunks lazily with the fitted state"""
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+
+def _merge_scalers(left, right):
+    """Combine two partially fitted StandardScalers (parallel variance formula)"""
+    n_left, n_right = left.n_samples_seen_, right.n_samples_seen_
+    total = n_left + n_right
+    delta = right.mean_ - left.mean_
+    mean = left.mean_ + delta * n_right / total
+    m2 = left.var_ * n_left + right.var_ * n_right + delta ** 2 * n_left * n_right / total
+
+    left.mean_ = mean
+    left.var_ = m2 / total
+    left.n_samples_seen_ = total
+    left.scale_ = np.where(left.var_ > 0, np.sqrt(left.var_), 1.0)
+    return left
+
+
+def iter_chunks(records: Any, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Split a list of records or a DataFrame into DataFrame chunks"""
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        yield chunk.copy() if isinstance(chunk, pd.DataFrame) else pd.DataFrame(chunk)
+
+
+def transform_data_streaming(chunk_source: Callable[[], Iterable[pd.DataFrame]],
+                             transformer: Optional[DataTransformer] = None) -> Iterator[pd.DataFrame]:
+    """Two-pass out-of-core transformation
+
+    ``chunk_source`` is called once per pass and must return a fresh
+    iterable of DataFrame chunks (e.g. re-reading pages or files). The first
+    pass is skipped when a fitted transformer is supplied.
+    """
+    if transformer is None or not transformer.fitted:
+        transformer = StreamingTransformer()
+        for chunk in chunk_source():
+            transformer.partial_fit(chunk)
+
+    for chunk in chunk_source():
+        yield transformer.transform(chunk)
@@ -1,70 +1,127 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 
 class DataTransformer:
     def __init__(self):
         self.scaler = StandardScaler()
         self.label_encoders = {}
+        # Fitted state, reused by transform() so encodings don't drift between batches
+        self.fill_values = {}
+        self.categories_ = {}
+        self.scaled_columns_ = []
+        self.feature_names_ = []
+        self.fitted = False
     
-    def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Fit every stage on df and return the transformed frame"""
+        df = self.clean_data(df)
+        df = self.engineer_features(df)
+        df = self.encode_categorical(df)
+        df = self.normalize_features(df)
+        self.feature_names_ = df.columns.tolist()
+        self.fitted = True
+        return df
+    
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply previously fitted stages without refitting"""
+        if not self.fitted:
+            raise ValueError("DataTransformer has not been fitted")
+        df = self.clean_data(df, fit=False)
+        df = self.engineer_features(df)
+        df = self.encode_categorical(df, fit=False)
+        df = self.normalize_features(df, fit=False)
+        return df
+    
+    def clean_data(self, df: pd.DataFrame, fit: bool = True) -> pd.DataFrame:
         """Clean and preprocess data"""
         # Remove duplicates
         df = df.drop_duplicates()
         
+        if not fit:
+            fills = {col: value for col, value in self.fill_values.items() if col in df.columns}
+            return df.fillna(fills)
+        
         # Handle missing values
         numeric_cols = df.select_dtypes(include=[np.number]).columns
         categorical_cols = df.select_dtypes(include=['object']).columns
         
-        # Fill numeric missing values with median
-        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
-        
-        # Fill categorical missing values with mode
+        # Numeric columns fill with the median, categorical with the mode
+        # (computed once per column); a single fillna applies all of them
+        fills = df[numeric_cols].median().to_dict()
         for col in categorical_cols:
-            df[col] = df[col].fillna(df[col].mode()[0] if not df[col].mode().empty else 'Unknown')
+            modes = df[col].mode()
+            fills[col] = modes.iloc[0] if not modes.empty else 'Unknown'
         
-        return df
+        self.fill_values.update(fills)
+        return df.fillna(fills)
     
     def engineer_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Create new features"""
         # Example feature engineering
         if 'timestamp' in df.columns:
-            df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
-            df['day_of_week'] = pd.to_datetime(df['timestamp']).dt.dayofweek
+            # Parse once, derive both features from the same datetimes
+            timestamps = pd.to_datetime(df['timestamp'])
+            df['hour'] = timestamps.dt.hour
+            df['day_of_week'] = timestamps.dt.dayofweek
         
         return df
     
-    def encode_categorical(self, df: pd.DataFrame) -> pd.DataFrame:
+    def encode_categorical(self, df: pd.DataFrame, fit: bool = True) -> pd.DataFrame:
         """Encode categorical variables"""
+        if not fit:
+            # Hash lookup against the fitted vocabulary; unseen categories map
+            # to -1 instead of shifting the known codes
+            for col, categories in self.categories_.items():
+                if col in df.columns:
+                    df[col] = pd.Index(categories).get_indexer(_as_str(df[col]))
+            return df
+        
         categorical_cols = df.select_dtypes(include=['object']).columns
         
         for col in categorical_cols:
-            if col not in self.label_encoders:
-                self.label_encoders[col] = LabelEncoder()
-            
-            df[col] = self.label_encoders[col].fit_transform(df[col].astype(str))
+            # factorize(sort=True) yields the same codes as LabelEncoder's sorted
+            # np.unique, in one hashing pass instead of a sort + searchsorted
+            codes, uniques = pd.factorize(_as_str(df[col]), sort=True)
+            encoder = self.label_encoders.setdefault(col, LabelEncoder())
+            encoder.classes_ = np.asarray(uniques, dtype=object)
+            df[col] = codes
+            self.categories_[col] = list(uniques)
         
         return df
     
-    def normalize_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def normalize_features(self, df: pd.DataFrame, fit: bool = True) -> pd.DataFrame:
         """Normalize numerical features"""
+        if not fit:
+            df[self.scaled_columns_] = self.scaler.transform(df[self.scaled_columns_])
+            return df
+        
         numeric_cols = df.select_dtypes(include=[np.number]).columns
         df[numeric_cols] = self.scaler.fit_transform(df[numeric_cols])
+        self.scaled_columns_ = numeric_cols.tolist()
         return df
 
-def transform_data(raw_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Main transformation function"""
-    transformer = DataTransformer()
+def _as_str(column: pd.Series) -> pd.Series:
+    """Cast to str only when needed; all-string columns are used as they are"""
+    if pd.api.types.is_string_dtype(column) and not column.hasnans:
+        return column
+    return column.astype(str)
+
+def transform_frame(df: pd.DataFrame, transformer: Optional[DataTransformer] = None) -> pd.DataFrame:
+    """Transform a raw DataFrame, reusing ``transformer`` when it is fitted"""
+    if transformer is not None and transformer.fitted:
+        return transformer.transform(df)
+    return DataTransformer().fit_transform(df)
+
+def transform_data(raw_data: Dict[str, Any], transformer: Optional[DataTransformer] = None) -> Dict[str, Any]:
+    """Main transformation function
     
+    Pass a fitted transformer (e.g. the one registered with the model) to
+    reuse its encodings and scaling instead of refitting on this batch.
+    """
     # Convert to DataFrame
-    df = pd.DataFrame(raw_data['api_data'])
-    
-    # Apply transformations
-    df = transformer.clean_data(df)
-    df = transformer.engineer_features(df)
-    df = transformer.encode_categorical(df)
-    df = transformer.normalize_features(df)
+    df = transform_frame(pd.DataFrame(raw_data['api_data']), transformer)
     
     return {
         'features': df.to_dict('records'),
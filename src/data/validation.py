@@ -1,18 +1,27 @@
-import great_expectations as gx
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from src.data.rules import SCHEMA_EXPECTATIONS, RuleEngine, RuleSuite
+from src.utils.config import Config
 
 class DataValidator:
-    def __init__(self):
-        self.context = gx.get_context()
+    def __init__(self, suite_path: Optional[str] = None, backend: Optional[str] = None):
+        # The suite is loaded once; Great Expectations is only imported and
+        # set up when it is selected as the backend
+        self.suite = RuleSuite.load(suite_path or Config.VALIDATION_SUITE_PATH)
+        self.backend = backend or Config.VALIDATION_BACKEND
+        self.schema_engine = RuleEngine(self.suite.select(include=SCHEMA_EXPECTATIONS))
+        self.quality_suite = self.suite.select(exclude=SCHEMA_EXPECTATIONS)
+        self._quality_engine = None
     
-    def create_expectation_suite(self, suite_name: str) -> None:
-        """Create a new expectation suite"""
-        try:
-            suite = self.context.add_expectation_suite(expectation_suite_name=suite_name)
-        except Exception:
-            # Suite already exists
-            pass
+    @property
+    def quality_engine(self):
+        if self._quality_engine is None:
+            if self.backend == 'great_expectations':
+                from src.data.rules import GreatExpectationsBackend
+                self._quality_engine = GreatExpectationsBackend(self.quality_suite)
+            else:
+                self._quality_engine = RuleEngine(self.quality_suite)
+        return self._quality_engine
     
     def validate_schema(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Validate data schema and basic constraints"""
@@ -22,62 +31,28 @@ class DataValidator:
             'warnings': []
         }
         
-        # Check for required columns
-        required_cols = ['user_id', 'feature_1', 'feature_2']  # Define your required columns
-        missing_cols = set(required_cols) - set(df.columns)
+        evaluation = self.schema_engine.evaluate(df)
+        failed = [result for result in evaluation['results'] if not result['success']]
         
+        # Check for required columns
+        missing_cols = {result['column'] for result in failed if result['expectation_type'] == 'expect_column_to_exist'}
         if missing_cols:
-            results['success'] = False
             results['errors'].append(f"Missing required columns: {missing_cols}")
         
-        # Check data types
-        if 'user_id' in df.columns and df['user_id'].dtype != 'int64':
-            results['warnings'].append("user_id should be integer type")
-        
-        # Check for null values in critical columns
-        critical_cols = ['user_id']
-        for col in critical_cols:
-            if col in df.columns and df[col].isnull().any():
-                results['success'] = False
-                results['errors'].append(f"Null values found in critical column: {col}")
+        # Check data types and null values
+        for result in failed:
+            if result['expectation_type'] == 'expect_column_to_exist' or result['column'] in missing_cols:
+                continue
+            target = results['warnings'] if result['severity'] == 'warning' else results['errors']
+            target.append(result['message'])
         
+        results['success'] = not results['errors']
         return results
     
     def validate_data_quality(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Validate data quality using Great Expectations"""
-        # Create a data asset
-        data_asset = self.context.sources.add_pandas("pandas_source").add_asset(
-            name="validation_asset",
-            dataframe=df
-        )
-        
-        # Create batch request
-        batch_request = data_asset.build_batch_request()
-        
-        # Get expectation suite
-        suite_name = "data_quality_suite"
-        self.create_expectation_suite(suite_name)
-        
-        # Run validation
+        """Validate data quality against the suite's table and value rules"""
         try:
-            validator = self.context.get_validator(
-                batch_request=batch_request,
-                expectation_suite_name=suite_name
-            )
-            
-            # Add expectations
-            validator.expect_table_row_count_to_be_between(min_value=1, max_value=100000)
-            validator.expect_table_column_count_to_equal(len(df.columns))
-            
-            # Validate and return results
-            validation_result = validator.validate()
-            
-            return {
-                'success': validation_result.success,
-                'statistics': validation_result.statistics,
-                'results': validation_result.results
-            }
-            
+            return self.quality_engine.evaluate(df)
         except Exception as e:
             return {
                 'success': False,
@@ -86,18 +61,29 @@ class DataValidator:
 
 def validate_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """Main validation function"""
-    validator = DataValidator()
-    
     # Convert to DataFrame
-    df = pd.DataFrame(data['features'])
+    return validate_frame(pd.DataFrame(data['features']), data['timestamp'])
+
+def validate_frame(df: pd.DataFrame, timestamp: str, validator: Optional[DataValidator] = None) -> Dict[str, Any]:
+    """Validate a feature DataFrame"""
+    validator = validator or DataValidator()
     
     # Run validations
     schema_validation = validator.validate_schema(df)
     quality_validation = validator.validate_data_quality(df)
     
+    errors: List[str] = list(schema_validation['errors'])
+    if 'error' in quality_validation:
+        errors.append(quality_validation['error'])
+    errors.extend(
+        result['message'] for result in quality_validation.get('results', [])
+        if isinstance(result, dict) and not result.get('success', True) and result.get('message')
+    )
+    
     return {
         'success': schema_validation['success'] and quality_validation['success'],
         'schema_validation': schema_validation,
         'quality_validation': quality_validation,
-        'timestamp': data['timestamp']
+        'errors': errors,
+        'timestamp': timestamp
     }
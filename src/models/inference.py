@@ -1,16 +1,76 @@
 import numpy as np
-import pandas as pd
-from typing import Dict, Any, List
-from src.utils.redis_client import RedisClient
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Dict, Any, List, Iterator, Optional
+from src.utils.config import Config
+from src.utils.redis_client import FeaturesNotFoundError, RedisClient
 from src.models.model_manager import ModelManager
 import logging
 
 logger = logging.getLogger(__name__)
 
+ENSEMBLE_STRATEGIES = ("all", "mean", "vote", "weighted")
+
+class ChunkSizeTuner:
+    """Per-model scoring chunk size steered toward a target latency per chunk
+
+    Keeps an EWMA of seconds per row for each model and sizes chunks so one
+    takes about ``target_seconds``: small enough to stay cache-resident and
+    spread over the pool, large enough to amortize per-call overhead.
+    """
+
+    def __init__(self, target_seconds: float, initial_rows: int, min_rows: int, max_rows: int,
+                 smoothing: float = 0.2):
+        self.target_seconds = target_seconds
+        self.initial_rows = initial_rows
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.smoothing = smoothing
+        self._seconds_per_row: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def chunk_size(self, key: str) -> int:
+        per_row = self._seconds_per_row.get(key)
+        if not per_row:
+            return self.initial_rows
+        return int(min(self.max_rows, max(self.min_rows, self.target_seconds / per_row)))
+
+    def observe(self, key: str, rows: int, seconds: float) -> None:
+        if rows <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            sample = seconds / rows
+            current = self._seconds_per_row.get(key)
+            self._seconds_per_row[key] = sample if current is None else (
+                self.smoothing * sample + (1 - self.smoothing) * current
+            )
+
+    def state(self) -> Dict[str, int]:
+        return {key: self.chunk_size(key) for key in list(self._seconds_per_row)}
+
 class InferenceEngine:
     def __init__(self, redis_client: RedisClient, model_manager: ModelManager):
         self.redis_client = redis_client
         self.model_manager = model_manager
+        self.config = Config()
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.config.INFERENCE_WORKERS,
+            thread_name_prefix="inference"
+        )
+        # Chunks of one large batch are scored here; separate from the ensemble
+        # pool so a batch can't starve (or wait on) ensemble members
+        self.scoring_executor = ThreadPoolExecutor(
+            max_workers=self.config.SCORING_WORKERS,
+            thread_name_prefix="scoring"
+        )
+        self.chunk_tuner = ChunkSizeTuner(
+            target_seconds=self.config.SCORING_TARGET_CHUNK_MS / 1000,
+            initial_rows=self.config.SCORING_MIN_CHUNK_ROWS,
+            min_rows=self.config.SCORING_MIN_CHUNK_ROWS,
+            max_rows=self.config.SCORING_MAX_CHUNK_ROWS
+        )
     
     def predict(self, features: Dict[str, Any], model_name: str = "default", 
                 model_version: str = "latest") -> Dict[str, Any]:
@@ -19,8 +79,12 @@ class InferenceEngine:
             # Load model
             model = self.model_manager.load_model(model_name, model_version)
             
-            # Prepare features
-            feature_array = self._prepare_features(features)
+            # Prepare features, through the model's fitted transform when one is registered
+            transform = self.model_manager.load_transformer(model_name, model_version)
+            if transform is not None:
+                feature_array = transform.transform_row(features)
+            else:
+                feature_array = self._prepare_features(features)
             
             # Make prediction
             prediction = model.predict(feature_array)
@@ -36,7 +100,7 @@ class InferenceEngine:
                 "confidence": confidence,
                 "model_name": model_name,
                 "model_version": model_version,
-                "timestamp": pd.Timestamp.now().isoformat()
+                "timestamp": datetime.now().isoformat()
             }
             
         except Exception as e:
@@ -45,33 +109,45 @@ class InferenceEngine:
     
     def batch_predict(self, feature_ids: List[str], model_name: str = "default",
                      model_version: str = "latest") -> List[Dict[str, Any]]:
-        """Make batch predictions"""
+        """Make batch predictions
+        
+        With ``PRECOMPUTE_PREDICTIONS`` the predictions stored by
+        ``precompute_predictions`` for the version ``model_version`` resolves
+        to are served as they are; only ids without one are scored live.
+        """
         try:
-            # Load model
-            model = self.model_manager.load_model(model_name, model_version)
+            predictions: Dict[int, Any] = {}
+            pending = list(range(len(feature_ids)))
+            if self.config.PRECOMPUTE_PREDICTIONS:
+                version = self.redis_client.resolve_version(model_name, model_version)
+                stored = self.redis_client.get_predictions(model_name, version, feature_ids)
+                predictions = {i: prediction for i, prediction in enumerate(stored) if prediction is not None}
+                pending = [i for i in pending if i not in predictions]
             
-            # Get features from Redis
-            features_list = []
-            for feature_id in feature_ids:
-                features = self.redis_client.get_features_by_id(feature_id)
-                if features:
-                    features_list.append(features)
+            if pending:
+                # Get features from Redis in one multi-key read
+                found = [
+                    (i, features)
+                    for i, features in zip(pending, self.redis_client.get_features_by_ids([feature_ids[i] for i in pending]))
+                    if features
+                ]
+                if found:
+                    model = self.model_manager.load_model(model_name, model_version)
+                    feature_matrix = self._prepare_batch_features([features for _, features in found])
+                    # Make predictions, chunked over the scoring pool for large batches
+                    scored = self.score_matrix(model, feature_matrix, f"{model_name}:{model_version}")
+                    for (i, _), prediction in zip(found, scored):
+                        predictions[i] = prediction.tolist() if hasattr(prediction, 'tolist') else prediction
             
-            if not features_list:
+            if not predictions:
                 raise ValueError("No features found for provided IDs")
             
-            # Prepare batch features
-            feature_matrix = self._prepare_batch_features(features_list)
-            
-            # Make predictions
-            predictions = model.predict(feature_matrix)
-            
-            # Prepare results
+            # Prepare results, in request order
             results = []
-            for i, prediction in enumerate(predictions):
+            for i in sorted(predictions):
                 result = {
-                    "feature_id": feature_ids[i] if i < len(feature_ids) else None,
-                    "prediction": prediction.tolist() if hasattr(prediction, 'tolist') else prediction,
+                    "feature_id": feature_ids[i],
+                    "prediction": predictions[i],
                     "model_name": model_name,
                     "model_version": model_version
                 }
@@ -83,13 +159,245 @@ class InferenceEngine:
             logger.error(f"Batch prediction failed: {e}")
             raise
     
+    def precompute_predictions(self, df, batch_id: str, model_name: str = "default",
+                               model_version: str = "latest", ttl: Optional[int] = None,
+                               chunk_size: int = 100000) -> Dict[str, Any]:
+        """Score a feature batch as it is loaded and store the predictions for ``batch_predict``
+        
+        ``df`` is the frame just stored under ``batch_id``, so row ``i`` is
+        feature id ``{batch_id}:{i}``. Predictions are keyed by the concrete
+        version ``model_version`` resolves to and expire with the features
+        (``FEATURE_TTL`` by default).
+        """
+        version = self.redis_client.resolve_version(model_name, model_version)
+        model = self.model_manager.load_model(model_name, version)
+        ttl = ttl or self.config.FEATURE_TTL
+        columns = df.columns.tolist()
+        
+        for start in range(0, len(df), chunk_size):
+            matrix = self._validate_feature_schema(model, df.iloc[start:start + chunk_size].to_numpy(), columns)
+            predictions = self.score_matrix(model, matrix, f"{model_name}:{version}")
+            feature_ids = [f"{batch_id}:{i}" for i in range(start, start + len(matrix))]
+            self.redis_client.store_predictions(model_name, version, feature_ids, predictions, ttl=ttl)
+        
+        return {"rows": len(df), "model_name": model_name, "model_version": version}
+    
+    def predict_entities(self, entity_ids: List[Any], model_name: str = "default",
+                         model_version: str = "latest") -> Dict[str, Any]:
+        """Score entities by id with their newest stored features
+
+        All rows are fetched in one round trip and scored as one matrix.
+        Stored rows are already transformed by the ETL, so no transform is
+        applied here. Unknown entities are listed under ``missing``.
+        """
+        import pandas as pd
+
+        model = self.model_manager.load_model(model_name, model_version)
+        rows = self.redis_client.get_features_by_entity(entity_ids)
+
+        found = [(entity_id, row) for entity_id, row in zip(entity_ids, rows) if row is not None]
+        missing = [entity_id for entity_id, row in zip(entity_ids, rows) if row is None]
+        if not found:
+            raise FeaturesNotFoundError(f"No features found for entities: {missing}")
+
+        frame = pd.DataFrame([row for _, row in found])
+        matrix = self._validate_feature_schema(model, frame.to_numpy(), frame.columns.tolist())
+        predictions = self.score_matrix(model, matrix, f"{model_name}:{model_version}")
+
+        return {
+            "predictions": [
+                {
+                    "entity_id": entity_id,
+                    "prediction": prediction.tolist() if hasattr(prediction, 'tolist') else prediction
+                }
+                for (entity_id, _), prediction in zip(found, predictions)
+            ],
+            "missing": missing,
+            "model_name": model_name,
+            "model_version": model_version,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def score_matrix(self, model: Any, matrix: np.ndarray, key: str) -> np.ndarray:
+        """``model.predict(matrix)``, split into tuned chunks scored in parallel
+
+        Matrices up to one chunk are scored inline. Larger ones are cut into
+        row slices (views, no copies) that run on the scoring pool, where
+        NumPy/sklearn kernels release the GIL, and the results are
+        concatenated in row order. Each chunk's latency feeds the tuner for
+        ``key`` (the model name and version).
+        """
+        chunk_size = self.chunk_tuner.chunk_size(key)
+        workers = self.config.SCORING_WORKERS
+        if len(matrix) <= chunk_size or workers <= 1:
+            return self._timed_predict(model, matrix, key)
+
+        # Never fewer chunks than workers, so every core gets a share
+        chunk_size = max(self.chunk_tuner.min_rows, min(chunk_size, -(-len(matrix) // workers)))
+        chunks = [matrix[offset:offset + chunk_size] for offset in range(0, len(matrix), chunk_size)]
+        results = list(self.scoring_executor.map(lambda chunk: self._timed_predict(model, chunk, key), chunks))
+        return np.concatenate([np.asarray(result) for result in results])
+
+    def _timed_predict(self, model: Any, matrix: np.ndarray, key: str) -> np.ndarray:
+        started = time.perf_counter()
+        predictions = model.predict(matrix)
+        self.chunk_tuner.observe(key, len(matrix), time.perf_counter() - started)
+        return predictions
+
+    def ensemble_predict(self, features: Dict[str, Any], models: List[Dict[str, Any]],
+                         strategy: str = "all", timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Score one feature record with several models concurrently
+
+        ``models`` entries take ``model_name`` and optional ``model_version``,
+        ``weight`` and ``timeout`` (seconds, overriding the ensemble ``timeout``).
+        Members that are slow or fail are reported individually and left out
+        of the combined prediction.
+        """
+        if strategy not in ENSEMBLE_STRATEGIES:
+            raise ValueError(f"Unknown ensemble strategy: {strategy!r}")
+        if not models:
+            raise ValueError("Ensemble needs at least one model")
+        if timeout is None:
+            timeout = self.config.ENSEMBLE_TIMEOUT_MS / 1000
+
+        # Features are prepared once and shared (read-only) by members without a registered transform
+        feature_array = self._prepare_features(features)
+        started = time.monotonic()
+        futures = [
+            self.executor.submit(
+                self._score_member, spec['model_name'], spec.get('model_version', 'latest'), features, feature_array
+            )
+            for spec in models
+        ]
+
+        members = []
+        for spec, future in zip(models, futures):
+            member = {
+                "model_name": spec['model_name'],
+                "model_version": spec.get('model_version', 'latest'),
+                "weight": spec.get('weight', 1.0)
+            }
+            member_timeout = spec.get('timeout') or timeout
+            remaining = max(0.0, started + member_timeout - time.monotonic())
+            try:
+                member["prediction"] = future.result(timeout=remaining)
+                member["status"] = "ok"
+            except FuturesTimeoutError:
+                future.cancel()
+                member["status"] = "timeout"
+                logger.warning(f"Ensemble member {member['model_name']} timed out")
+            except Exception as e:
+                member["status"] = "error"
+                member["error"] = str(e)
+                logger.error(f"Ensemble member {member['model_name']} failed: {e}")
+            members.append(member)
+
+        succeeded = [member for member in members if member["status"] == "ok"]
+        if not succeeded:
+            raise RuntimeError("No ensemble member produced a prediction")
+
+        return {
+            "prediction": self._combine_predictions(succeeded, strategy),
+            "strategy": strategy,
+            "members": members,
+            "partial": len(succeeded) < len(members),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def _score_member(self, model_name: str, model_version: str, features: Dict[str, Any],
+                      feature_array: np.ndarray) -> List[Any]:
+        model = self.model_manager.load_model(model_name, model_version)
+        # Same inputs the member gets through predict()
+        transform = self.model_manager.load_transformer(model_name, model_version)
+        if transform is not None:
+            feature_array = transform.transform_row(features)
+        prediction = model.predict(feature_array)
+        return prediction.tolist() if hasattr(prediction, 'tolist') else prediction
+
+    def _combine_predictions(self, members: List[Dict[str, Any]], strategy: str) -> Any:
+        """Combine successful member predictions with the given strategy"""
+        if strategy == "all":
+            return None
+
+        stacked = np.array([member["prediction"] for member in members])
+        if strategy == "mean":
+            return np.mean(stacked, axis=0).tolist()
+        if strategy == "weighted":
+            weights = np.array([member["weight"] for member in members], dtype=float)
+            return np.average(stacked, axis=0, weights=weights).tolist()
+
+        # Majority vote per output position, ties go to the first label seen
+        votes = []
+        for column in stacked.reshape(len(members), -1).T:
+            labels, counts = np.unique(column, return_counts=True)
+            votes.append(labels[np.argmax(counts)].item())
+        return votes
+
+    def predict_matrix(self, matrix: np.ndarray, model_name: str = "default",
+                       model_version: str = "latest", columns: Optional[List[str]] = None,
+                       chunk_size: int = 10000) -> Iterator[Dict[str, Any]]:
+        """Score a raw feature matrix in chunks
+
+        The model is loaded and the matrix validated before this returns, so
+        schema errors surface immediately rather than mid-stream.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+
+        model = self.model_manager.load_model(model_name, model_version)
+        matrix = self._validate_feature_schema(model, matrix, columns)
+
+        return self._iter_matrix_predictions(model, matrix, model_name, model_version, chunk_size)
+
+    def _iter_matrix_predictions(self, model: Any, matrix: np.ndarray, model_name: str,
+                                 model_version: str, chunk_size: int) -> Iterator[Dict[str, Any]]:
+        for offset in range(0, len(matrix), chunk_size):
+            # Slicing a row range is a view, no per-chunk copy
+            predictions = self.score_matrix(model, matrix[offset:offset + chunk_size], f"{model_name}:{model_version}")
+            yield {
+                "offset": offset,
+                "predictions": predictions.tolist() if hasattr(predictions, 'tolist') else predictions,
+                "model_name": model_name,
+                "model_version": model_version
+            }
+
+    def _validate_feature_schema(self, model: Any, matrix: np.ndarray,
+                                 columns: Optional[List[str]] = None) -> np.ndarray:
+        """Check a matrix against the model's feature schema, reordering named columns"""
+        if matrix.ndim != 2:
+            raise ValueError(f"Expected a 2-D feature matrix, got {matrix.ndim} dimensions")
+
+        expected_names = getattr(model, 'feature_names_in_', None)
+        if columns is not None and expected_names is not None:
+            expected_names = list(expected_names)
+            missing = set(expected_names) - set(columns)
+            if missing:
+                raise ValueError(f"Missing model features: {sorted(missing)}")
+            if list(columns) != expected_names:
+                positions = {name: i for i, name in enumerate(columns)}
+                matrix = matrix[:, [positions[name] for name in expected_names]]
+
+        expected_width = getattr(model, 'n_features_in_', None)
+        if expected_width is not None and matrix.shape[1] != expected_width:
+            raise ValueError(
+                f"Model expects {expected_width} features, got {matrix.shape[1]}"
+            )
+
+        if not np.issubdtype(matrix.dtype, np.number) and matrix.dtype != np.bool_:
+            raise ValueError(f"Feature matrix must be numeric, got dtype {matrix.dtype}")
+
+        return matrix
+
     def _prepare_features(self, features: Dict[str, Any]) -> np.ndarray:
         """Prepare single feature record for prediction"""
+        # pandas is imported on first use rather than at process start
+        import pandas as pd
         # Convert dict to DataFrame then to numpy array
         df = pd.DataFrame([features])
         return df.values
     
     def _prepare_batch_features(self, features_list: List[Dict[str, Any]]) -> np.ndarray:
         """Prepare batch features for prediction"""
+        import pandas as pd
         df = pd.DataFrame(features_list)
         return df.values
@@ -1,8 +1,8 @@
 import logging
 from typing import Dict, Any, List, Optional
+from src.utils.config import Config
 from src.utils.redis_client import RedisClient
-import joblib
-import pandas as pd
+from src.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -10,9 +10,17 @@ class ModelManager:
     def __init__(self, redis_client: RedisClient):
         self.redis_client = redis_client
         self.loaded_models = {}
+        self.loaded_transformers = {}
+        # Concurrent cache misses for the same model share one GET + unpickle
+        self.loads = SingleFlight()
     
     def load_model(self, model_name: str, version: str = "latest") -> Any:
-        """Load model from Redis or cache"""
+        """Load model from Redis or cache
+        
+        Concurrent misses are collapsed per (name, resolved version): one
+        caller loads, the others wait up to ``MODEL_LOAD_TIMEOUT_S`` for its
+        result or exception.
+        """
         cache_key = f"{model_name}:{version}"
         
         # Check if model is already loaded
@@ -21,14 +29,59 @@ class ModelManager:
         
         # Load from Redis
         try:
-            model = self.redis_client.load_model(model_name, version)
+            resolved = self.redis_client.resolve_version(model_name, version)
+            resolved_key = f"{model_name}:{resolved}"
+            model = self.loaded_models.get(resolved_key)
+            if model is None:
+                model = self.loads.do(
+                    ('model', model_name, resolved),
+                    lambda: self.redis_client.load_model(model_name, resolved),
+                    timeout=Config.MODEL_LOAD_TIMEOUT_S
+                )
+                self.loaded_models[resolved_key] = model
+                logger.info(f"Model {resolved_key} loaded successfully")
             self.loaded_models[cache_key] = model
-            logger.info(f"Model {cache_key} loaded successfully")
             return model
         except Exception as e:
             logger.error(f"Failed to load model {cache_key}: {e}")
             raise
     
+    def load_transformer(self, model_name: str, version: str = "latest") -> Optional[Any]:
+        """Load the compiled feature transform registered with a model, if any
+        
+        ``latest`` is resolved on every call and the cache is keyed on the
+        concrete version, so a version promoted by another process brings
+        its transform with it.
+        """
+        from src.utils.redis_client import ModelNotFoundError
+        
+        try:
+            resolved = self.redis_client.resolve_version(model_name, version)
+        except ModelNotFoundError:
+            return None
+        cache_key = f"{model_name}:{resolved}"
+        
+        # None is cached too, so unregistered models don't cost a GET + unpickle per request
+        if cache_key in self.loaded_transformers:
+            return self.loaded_transformers[cache_key]
+        
+        from src.data.feature_transform import FeatureTransform
+        
+        def load():
+            transformer = self.redis_client.load_transformer(model_name, resolved)
+            return FeatureTransform.from_transformer(transformer) if transformer is not None else None
+        
+        transform = self.loads.do(('transformer', model_name, resolved), load, timeout=Config.MODEL_LOAD_TIMEOUT_S)
+        self.loaded_transformers[cache_key] = transform
+        return transform
+    
+    def register_transformer(self, model_name: str, transformer: Any, version: str) -> None:
+        """Publish a fitted DataTransformer alongside a model version"""
+        self.redis_client.store_transformer(model_name, transformer, version)
+        for cache_key in (f"{model_name}:{version}", f"{model_name}:latest"):
+            self.loaded_transformers.pop(cache_key, None)
+        logger.info(f"Transformer for {model_name}:{version} registered")
+    
     def hot_swap_model(self, model_name: str, new_version: str = "latest") -> None:
         """Hot swap model with zero downtime"""
         try:
@@ -45,12 +98,20 @@ class ModelManager:
                 del self.loaded_models[latest_key]
             self.loaded_models[latest_key] = new_model
             
+            # Pick up the transformer registered with the new version
+            self.loaded_transformers.pop(cache_key, None)
+            self.loaded_transformers.pop(latest_key, None)
+            
             logger.info(f"Model {model_name} hot-swapped to version {new_version}")
             
         except Exception as e:
             logger.error(f"Hot swap failed for {model_name}: {e}")
             raise
     
+    def load_metrics(self) -> Dict[str, Any]:
+        """In-flight and deduplicated model/transformer loads"""
+        return self.loads.metrics()
+    
     def list_models(self) -> List[str]:
         """List all available models"""
         # This would query Redis for available models
@@ -8,22 +8,100 @@ class Config:
     REDIS_HOST: str = os.getenv('REDIS_HOST', 'localhost')
     REDIS_PORT: int = int(os.getenv('REDIS_PORT', 6379))
     REDIS_PASSWORD: Optional[str] = os.getenv('REDIS_PASSWORD')
+    REDIS_SHARDS: Optional[str] = os.getenv('REDIS_SHARDS')  # e.g. "redis-a:6379,redis-b:6379"; overrides host/port
+    REDIS_SHARD_VNODES: int = int(os.getenv('REDIS_SHARD_VNODES', 160))  # ring points per shard
     
     # API Configuration
     API_BASE_URL: str = os.getenv('API_BASE_URL', 'https://api.example.com')
     API_KEY: Optional[str] = os.getenv('API_KEY')
+    API_TIMEOUT: float = float(os.getenv('API_TIMEOUT', 30))
+    API_PAGINATED: bool = os.getenv('API_PAGINATED', 'false').lower() == 'true'
+    API_PAGE_SIZE: int = int(os.getenv('API_PAGE_SIZE', 1000))
+    API_PAGE_PARAM: str = os.getenv('API_PAGE_PARAM', 'page')
+    API_PAGE_SIZE_PARAM: str = os.getenv('API_PAGE_SIZE_PARAM', 'per_page')
+    API_MAX_CONCURRENCY: int = int(os.getenv('API_MAX_CONCURRENCY', 8))
+    API_MAX_RETRIES: int = int(os.getenv('API_MAX_RETRIES', 5))
+    API_BACKOFF_FACTOR: float = float(os.getenv('API_BACKOFF_FACTOR', 0.5))
     
     # Database Configuration
-    DATABASE_URL: Optional[str] = os.getenv('DATABASE_URL')
+    DATABASE_URL: Optional[str] = os.getenv('DATABASE_URL')  # e.g. sqlite:///data.db, postgresql://...
+    DATABASE_BATCH_SIZE: int = int(os.getenv('DATABASE_BATCH_SIZE', 10000))
+    DATABASE_PARTITIONS: int = int(os.getenv('DATABASE_PARTITIONS', 4))
     
     # AWS Configuration
     AWS_REGION: str = os.getenv('AWS_REGION', 'us-east-1')
     AWS_ACCESS_KEY_ID: Optional[str] = os.getenv('AWS_ACCESS_KEY_ID')
     AWS_SECRET_ACCESS_KEY: Optional[str] = os.getenv('AWS_SECRET_ACCESS_KEY')
     
+    # Object Store Extraction
+    OBJECT_STORE_ROOT: Optional[str] = os.getenv('OBJECT_STORE_ROOT')  # local directory standing in for S3
+    OBJECT_STORE_WORKERS: int = int(os.getenv('OBJECT_STORE_WORKERS', 8))
+    OBJECT_STORE_PART_SIZE: int = int(os.getenv('OBJECT_STORE_PART_SIZE', 8 * 1024 * 1024))
+    OBJECT_STORE_RANGE_THRESHOLD: int = int(os.getenv('OBJECT_STORE_RANGE_THRESHOLD', 16 * 1024 * 1024))
+    OBJECT_STORE_BATCH_SIZE: int = int(os.getenv('OBJECT_STORE_BATCH_SIZE', 65536))
+    
+    # Pipeline Artifacts (local directory or s3://bucket/prefix)
+    ARTIFACT_ROOT: str = os.getenv('ARTIFACT_ROOT', '/tmp/ml-pipeline/artifacts')
+    ARTIFACT_BATCH_SIZE: int = int(os.getenv('ARTIFACT_BATCH_SIZE', 65536))
+    
+    # Feature Store Layout
+    FEATURE_LAYOUT: str = os.getenv('FEATURE_LAYOUT', 'keys')  # keys (one key per row) | buckets
+    FEATURE_TTL: int = int(os.getenv('FEATURE_TTL', 3600))
+    FEATURE_BUCKET_SECONDS: int = int(os.getenv('FEATURE_BUCKET_SECONDS', 3600))  # time window per bucket
+    FEATURE_BUCKET_ROWS: int = int(os.getenv('FEATURE_BUCKET_ROWS', 128))  # rows per bucket hash before rollover
+    FEATURE_EXPORT_WORKERS: int = int(os.getenv('FEATURE_EXPORT_WORKERS', 8))  # batches read/written at once
+    
+    # Incremental ETL
+    INCREMENTAL_ETL: bool = os.getenv('INCREMENTAL_ETL', 'false').lower() == 'true'
+    WATERMARK_COLUMN: str = os.getenv('WATERMARK_COLUMN', 'updated_at')
+    API_WATERMARK_PARAM: str = os.getenv('API_WATERMARK_PARAM', 'updated_since')
+    ENTITY_KEY_COLUMN: str = os.getenv('ENTITY_KEY_COLUMN', 'user_id')
+    
+    # Validation
+    VALIDATION_SUITE_PATH: str = os.getenv('VALIDATION_SUITE_PATH', os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', '..', 'great_expectations', 'expectations', 'data_suite.json'
+    ))
+    VALIDATION_BACKEND: str = os.getenv('VALIDATION_BACKEND', 'native')  # native | great_expectations
+    
+    # Profiling and Drift Detection
+    PROFILE_MAX_CATEGORIES: int = int(os.getenv('PROFILE_MAX_CATEGORIES', 1000))
+    PROFILE_TTL: int = int(os.getenv('PROFILE_TTL', 7 * 24 * 3600))
+    DRIFT_REFERENCE_WINDOW: int = int(os.getenv('DRIFT_REFERENCE_WINDOW', 24))  # accepted batches merged as reference
+    DRIFT_PSI_THRESHOLD: float = float(os.getenv('DRIFT_PSI_THRESHOLD', 0.25))
+    DRIFT_KS_THRESHOLD: float = float(os.getenv('DRIFT_KS_THRESHOLD', 0.2))
+    DRIFT_NULL_RATE_THRESHOLD: float = float(os.getenv('DRIFT_NULL_RATE_THRESHOLD', 0.1))
+    DRIFT_EXCLUDE_COLUMNS: str = os.getenv('DRIFT_EXCLUDE_COLUMNS', 'user_id,timestamp,updated_at')
+    DRIFT_BLOCKING: bool = os.getenv('DRIFT_BLOCKING', 'true').lower() == 'true'
+    
+    # Partitioned ETL
+    ETL_PARTITIONED: bool = os.getenv('ETL_PARTITIONED', 'false').lower() == 'true'
+    ETL_PARTITIONS: int = int(os.getenv('ETL_PARTITIONS', 8))
+    ETL_PARTITION_KEY: str = os.getenv('ETL_PARTITION_KEY', 'user_id')
+    ETL_PARTITION_TIME_COLUMN: str = os.getenv('ETL_PARTITION_TIME_COLUMN', '')  # overrides the key when set
+    ETL_MAX_ACTIVE_PARTITIONS: int = int(os.getenv('ETL_MAX_ACTIVE_PARTITIONS', 8))  # mapped task instances at once
+    
     # Model Configuration
     MODEL_BUCKET: str = os.getenv('MODEL_BUCKET', 'ml-models')
     DEFAULT_MODEL_NAME: str = os.getenv('DEFAULT_MODEL_NAME', 'default')
+    MODEL_LOAD_TIMEOUT_S: float = float(os.getenv('MODEL_LOAD_TIMEOUT_S', 30))  # wait on another request's load
+    
+    # Inference Configuration
+    INFERENCE_WORKERS: int = int(os.getenv('INFERENCE_WORKERS', 8))
+    ENSEMBLE_TIMEOUT_MS: int = int(os.getenv('ENSEMBLE_TIMEOUT_MS', 500))
+    SCORING_WORKERS: int = int(os.getenv('SCORING_WORKERS', os.cpu_count() or 4))  # threads per large batch
+    SCORING_TARGET_CHUNK_MS: float = float(os.getenv('SCORING_TARGET_CHUNK_MS', 20))  # tuned latency per chunk
+    SCORING_MIN_CHUNK_ROWS: int = int(os.getenv('SCORING_MIN_CHUNK_ROWS', 1024))
+    SCORING_MAX_CHUNK_ROWS: int = int(os.getenv('SCORING_MAX_CHUNK_ROWS', 65536))
+    # Score each loaded batch with the latest model and serve /predict/batch from the stored results
+    PRECOMPUTE_PREDICTIONS: bool = os.getenv('PRECOMPUTE_PREDICTIONS', 'false').lower() == 'true'
+    
+    # Admission Control
+    MAX_CONCURRENT_REQUESTS: int = int(os.getenv('MAX_CONCURRENT_REQUESTS', 64))
+    MAX_CONCURRENT_PER_MODEL: int = int(os.getenv('MAX_CONCURRENT_PER_MODEL', 32))
+    MODEL_CONCURRENCY_LIMITS: Optional[str] = os.getenv('MODEL_CONCURRENCY_LIMITS')  # e.g. "default=8,ranker=2"
+    MAX_QUEUE_DEPTH: int = int(os.getenv('MAX_QUEUE_DEPTH', 128))
+    DEFAULT_REQUEST_TIMEOUT_MS: int = int(os.getenv('DEFAULT_REQUEST_TIMEOUT_MS', 0))  # 0 disables deadlines
+    REQUEST_TIMEOUT_HEADER: str = os.getenv('REQUEST_TIMEOUT_HEADER', 'X-Request-Timeout-Ms')
     
     # Logging
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
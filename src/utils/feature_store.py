@@ -0,0 +1,233 @@
+import json
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from src.utils.config import Config
+
+# Keys of the per-row layout written by RedisClient.store_features
+_LEGACY_ROW_KEY = re.compile(r'^features:(?P<timestamp>.+):(?P<index>\d+)$')
+# Leading ISO timestamp of a batch id such as '2024-01-01T10:00:00.123:p3'
+_BATCH_TIME = re.compile(r'\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?')
+
+
+def batch_time(batch_id: str) -> Optional[datetime]:
+    """Time of a batch from its id (``{timestamp}`` or ``{timestamp}:p{partition}``)"""
+    match = _BATCH_TIME.match(batch_id)
+    return datetime.fromisoformat(match.group(0)) if match else None
+
+
+class BucketedFeatureStore:
+    """Time-partitioned feature layout: rows packed into bucket hashes, one TTL per bucket
+
+    Rows are assigned consecutive slots within a time window of
+    ``bucket_seconds`` (an atomic INCRBY on ``{prefix}:{window}:rows``, so
+    concurrent loaders never collide). Slot ``s`` is field ``s % bucket_rows``
+    of the hash ``{prefix}:{window}:{s // bucket_rows}``, so a bucket rolls
+    over to the next one after ``bucket_rows`` rows and a new window starts a
+    new set of buckets. Each batch records its first slot in
+    ``{prefix}:{window}:batches``, so ``{timestamp}:{i}`` ids resolve to one
+    HGET without a per-row index.
+
+    Every key of a window expires at once, ``ttl`` seconds after the window
+    closes; rows therefore live between ``ttl`` and ``ttl + bucket_seconds``.
+    Keeping ``bucket_rows`` at or below Redis' ``hash-max-listpack-entries``
+    (128 by default) keeps buckets in the compact listpack encoding as long as
+    rows are shorter than ``hash-max-listpack-value``.
+    """
+
+    def __init__(self, redis_client=None, bucket_seconds: int = None, bucket_rows: int = None,
+                 ttl: int = None, prefix: str = 'fbucket'):
+        if redis_client is None:
+            from src.utils.redis_client import RedisClient
+            redis_client = RedisClient()
+        self.redis_client = redis_client
+        self.bucket_seconds = bucket_seconds or Config.FEATURE_BUCKET_SECONDS
+        self.bucket_rows = bucket_rows or Config.FEATURE_BUCKET_ROWS
+        self.ttl = ttl or Config.FEATURE_TTL
+        self.prefix = prefix
+
+    @property
+    def client(self):
+        return self.redis_client.client
+
+    def window(self, timestamp: str) -> int:
+        """Start (epoch seconds) of the window a batch timestamp falls in"""
+        when = batch_time(timestamp)
+        # Batch ids without a time go into the current window
+        seconds = when.timestamp() if when else time.time()
+        return int(seconds // self.bucket_seconds * self.bucket_seconds)
+
+    def bucket_key(self, window: int, segment: int) -> str:
+        return f"{self.prefix}:{window}:{segment}"
+
+    def store_frame(self, df, timestamp: str, chunk_size: int = 10000, entity_ids=None) -> Dict[str, Any]:
+        """Append a feature DataFrame as one batch"""
+        lines: List[Optional[str]] = []
+        for start in range(0, len(df), chunk_size):
+            lines.extend(df.iloc[start:start + chunk_size].to_json(orient='records', lines=True).splitlines())
+        return self.store_lines(lines, timestamp, df.columns.tolist(), entity_ids)
+
+    def store_lines(self, lines: Sequence[Optional[str]], timestamp: str,
+                    feature_names: Optional[List[str]] = None, entity_ids=None) -> Dict[str, Any]:
+        """Append serialized rows as one batch; ``None`` entries keep their slot but store nothing
+
+        ``entity_ids`` (aligned with ``lines``) are kept per batch in
+        ``{prefix}:{window}:entities`` for point-in-time joins.
+        """
+        window = self.window(timestamp)
+        expire_at = window + self.bucket_seconds + self.ttl
+        counter = f"{self.prefix}:{window}:rows"
+        end = self.client.incrby(counter, len(lines))
+        start = end - len(lines)
+
+        buckets: Dict[int, Dict[str, str]] = {}
+        for slot, line in enumerate(lines, start):
+            if line is not None:
+                buckets.setdefault(slot // self.bucket_rows, {})[str(slot % self.bucket_rows)] = line
+
+        pipe = self.client.pipeline(transaction=False)
+        for segment, mapping in buckets.items():
+            key = self.bucket_key(window, segment)
+            pipe.hset(key, mapping=mapping)
+            pipe.expireat(key, expire_at)
+        batches = f"{self.prefix}:{window}:batches"
+        pipe.hset(batches, timestamp, json.dumps({
+            'start': start,
+            'count': len(lines),
+            'feature_names': feature_names or []
+        }))
+        window_keys = [counter, batches]
+        if entity_ids is not None:
+            entities = f"{self.prefix}:{window}:entities"
+            pipe.hset(entities, timestamp, json.dumps([str(value) for value in entity_ids]))
+            window_keys.append(entities)
+        for key in window_keys:
+            pipe.expireat(key, expire_at)
+        pipe.zadd(f"{self.prefix}:windows", {str(window): window})
+        pipe.set(f"{self.prefix}:latest", timestamp)
+        pipe.execute()
+        return {'rows': len(lines), 'window': window, 'buckets': len(buckets)}
+
+    def get(self, feature_id: str) -> Optional[Dict[str, Any]]:
+        """Row ``i`` of batch ``timestamp`` for an id ``{timestamp}:{i}``; a bare ``i`` means the latest batch"""
+        timestamp, _, index = str(feature_id).rpartition(':')
+        if not timestamp:
+            timestamp = self.client.get(f"{self.prefix}:latest")
+        if not timestamp or not index.isdigit():
+            return None
+        window = self.window(timestamp)
+        batch = self.client.hget(f"{self.prefix}:{window}:batches", timestamp)
+        if not batch:
+            return None
+        batch = json.loads(batch)
+        if int(index) >= batch['count']:
+            return None
+        slot = batch['start'] + int(index)
+        row = self.client.hget(self.bucket_key(window, slot // self.bucket_rows), str(slot % self.bucket_rows))
+        return json.loads(row) if row else None
+
+    def batch_ids(self) -> List[str]:
+        """Ids of every live batch, oldest window first"""
+        ids: List[str] = []
+        for window in self.client.zrange(f"{self.prefix}:windows", 0, -1):
+            ids.extend(self.client.hkeys(f"{self.prefix}:{window}:batches"))
+        return ids
+
+    def read_batch(self, timestamp: str) -> Optional[Dict[str, Any]]:
+        """All rows of a batch as ``{'lines', 'entity_ids', 'feature_names'}`` (expired rows are ``None``)"""
+        window = self.window(timestamp)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hget(f"{self.prefix}:{window}:batches", timestamp)
+        pipe.hget(f"{self.prefix}:{window}:entities", timestamp)
+        batch, entities = pipe.execute()
+        if not batch:
+            return None
+        batch = json.loads(batch)
+
+        slots = range(batch['start'], batch['start'] + batch['count'])
+        pipe = self.client.pipeline(transaction=False)
+        segments = range(slots.start // self.bucket_rows, (slots.stop - 1) // self.bucket_rows + 1) if slots else []
+        for segment in segments:
+            first = max(slots.start, segment * self.bucket_rows)
+            last = min(slots.stop, (segment + 1) * self.bucket_rows)
+            pipe.hmget(self.bucket_key(window, segment), [str(slot % self.bucket_rows) for slot in range(first, last)])
+        lines = [line for values in pipe.execute() for line in values]
+        return {
+            'lines': lines,
+            'entity_ids': json.loads(entities) if entities else None,
+            'feature_names': batch['feature_names']
+        }
+
+    def latest(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """The most recently stored rows, newest first"""
+        rows: List[Dict[str, Any]] = []
+        for window in self.client.zrevrange(f"{self.prefix}:windows", 0, -1):
+            count = self.client.get(f"{self.prefix}:{window}:rows")
+            if not count:
+                continue
+            for segment in range((int(count) - 1) // self.bucket_rows, -1, -1):
+                bucket = self.client.hgetall(self.bucket_key(int(window), segment))
+                for field in sorted(bucket, key=int, reverse=True):
+                    rows.append(json.loads(bucket[field]))
+                    if len(rows) >= limit:
+                        return rows
+        return rows
+
+    def compact(self, migrate: bool = True, scan_count: int = 1000, batch_size: int = 10000) -> Dict[str, int]:
+        """Background maintenance: prune expired windows and fold per-row keys into buckets
+
+        Legacy ``features:{timestamp}:{i}`` keys are moved batch by batch
+        (index positions are kept, so ``{timestamp}:{i}`` ids stay valid)
+        and deleted once their bucket is written. Entity rows still under
+        the old ``features:entity:{id}`` keys are moved to ``entity:{id}``
+        unless a newer row is already there.
+        """
+        stats = {'expired_windows': 0, 'migrated_batches': 0, 'migrated_rows': 0, 'migrated_entities': 0}
+
+        windows_key = f"{self.prefix}:windows"
+        for window in self.client.zrange(windows_key, 0, -1):
+            if not self.client.exists(f"{self.prefix}:{window}:rows"):
+                self.client.zrem(windows_key, window)
+                stats['expired_windows'] += 1
+
+        if not migrate:
+            return stats
+
+        legacy: Dict[str, Dict[int, str]] = {}
+        for key in self.client.scan_iter(match='features:*', count=scan_count):
+            if key.startswith('features:entity:'):
+                stats['migrated_entities'] += self._move_entity_row(key, key[len('features:'):])
+                continue
+            match = _LEGACY_ROW_KEY.match(key)
+            if match:
+                legacy.setdefault(match.group('timestamp'), {})[int(match.group('index'))] = key
+
+        for timestamp, keys in legacy.items():
+            indices = sorted(keys)
+            values = []
+            for start in range(0, len(indices), batch_size):
+                values.extend(self.client.mget([keys[i] for i in indices[start:start + batch_size]]))
+            lines: List[Optional[str]] = [None] * (indices[-1] + 1)
+            for i, value in zip(indices, values):
+                lines[i] = value
+            metadata = self.client.get(f"metadata:{timestamp}")
+            feature_names = json.loads(metadata).get('feature_names') if metadata else None
+            entities = self.client.get(f"entities:{timestamp}")
+            self.store_lines(lines, timestamp, feature_names, json.loads(entities) if entities else None)
+            self.client.unlink(f"entities:{timestamp}")
+
+            for start in range(0, len(indices), batch_size):
+                self.client.unlink(*[keys[i] for i in indices[start:start + batch_size]])
+            stats['migrated_batches'] += 1
+            stats['migrated_rows'] += sum(value is not None for value in values)
+        return stats
+
+    def _move_entity_row(self, old_key: str, new_key: str) -> int:
+        # GET/SET rather than RENAME: with sharding the two keys can live on different nodes
+        value, ttl = self.client.get(old_key), self.client.pttl(old_key)
+        moved = 0
+        if value is not None:
+            moved = int(bool(self.client.set(new_key, value, px=ttl if ttl > 0 else None, nx=True)))
+        self.client.unlink(old_key)
+        return moved
@@ -1,24 +1,60 @@
-import redis
 import json
 import pickle
 from typing import Dict, Any, List, Optional
-import pandas as pd
 from src.utils.config import Config
 
+class ModelNotFoundError(ValueError):
+    """Raised when a model or model version is not in the registry"""
+
+
+class FeaturesNotFoundError(ValueError):
+    """Raised when none of the requested entities has features in the store"""
+
+
 class RedisClient:
     def __init__(self):
         self.config = Config()
-        self.client = redis.Redis(
-            host=self.config.REDIS_HOST,
-            port=self.config.REDIS_PORT,
-            decode_responses=True
-        )
-        self.binary_client = redis.Redis(
+        # Clients (and the redis import) are created on first use to keep
+        # process start-up cheap
+        self._client = None
+        self._binary_client = None
+    
+    def _connect(self, decode_responses: bool):
+        if self.config.REDIS_SHARDS:
+            from src.utils.sharding import ShardedRedis, connect_shards, parse_shards
+            nodes = parse_shards(self.config.REDIS_SHARDS)
+            return ShardedRedis(
+                connect_shards(nodes, decode_responses, self.config.REDIS_PASSWORD),
+                vnodes=self.config.REDIS_SHARD_VNODES
+            )
+        
+        import redis
+        return redis.Redis(
             host=self.config.REDIS_HOST,
             port=self.config.REDIS_PORT,
-            decode_responses=False
+            decode_responses=decode_responses
         )
     
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._connect(decode_responses=True)
+        return self._client
+    
+    @client.setter
+    def client(self, value) -> None:
+        self._client = value
+    
+    @property
+    def binary_client(self):
+        if self._binary_client is None:
+            self._binary_client = self._connect(decode_responses=False)
+        return self._binary_client
+    
+    @binary_client.setter
+    def binary_client(self, value) -> None:
+        self._binary_client = value
+    
     def store_features(self, data: Dict[str, Any], ttl: int = 3600) -> None:
         """Store features in Redis with TTL"""
         features = data['features']
@@ -37,8 +73,123 @@ class RedisClient:
         }
         self.client.setex(metadata_key, ttl, json.dumps(metadata))
     
+    def store_feature_frame(self, df, timestamp: str, ttl: int = 3600, chunk_size: int = 10000,
+                            entity_ids=None) -> None:
+        """Store a feature DataFrame under the same keys as ``store_features``
+        
+        Rows are serialized per chunk with ``to_json`` and written through a
+        pipeline, so no list of row dicts is built for the whole frame.
+        ``entity_ids`` (aligned with the rows) are kept as one list under
+        ``entities:{timestamp}`` for point-in-time joins.
+        """
+        for start in range(0, len(df), chunk_size):
+            lines = df.iloc[start:start + chunk_size].to_json(orient='records', lines=True).splitlines()
+            pipe = self.client.pipeline(transaction=False)
+            for i, record in enumerate(lines, start):
+                pipe.setex(f"features:{timestamp}:{i}", ttl, record)
+            pipe.execute()
+        
+        if entity_ids is not None:
+            self.client.setex(f"entities:{timestamp}", ttl, json.dumps([str(value) for value in entity_ids]))
+        
+        metadata = {
+            'feature_names': df.columns.tolist(),
+            'count': len(df),
+            'timestamp': timestamp
+        }
+        self.client.setex(f"metadata:{timestamp}", ttl, json.dumps(metadata))
+    
+    def store_feature_batch(self, df, timestamp: str, entity_ids=None) -> None:
+        """Store a feature DataFrame in the layout selected by ``FEATURE_LAYOUT``
+        
+        With ``entity_ids`` each entity's row is also indexed as its newest
+        features (see ``store_entity_rows``).
+        """
+        if self.config.FEATURE_LAYOUT == 'buckets':
+            from src.utils.feature_store import BucketedFeatureStore
+            BucketedFeatureStore(self).store_frame(df, timestamp, entity_ids=entity_ids)
+        else:
+            self.store_feature_frame(df, timestamp, ttl=self.config.FEATURE_TTL, entity_ids=entity_ids)
+        if entity_ids is not None:
+            self.store_entity_rows(df, entity_ids, ttl=self.config.FEATURE_TTL)
+    
+    def store_entity_rows(self, df, entity_ids, ttl: int = 3600, chunk_size: int = 10000) -> None:
+        """Point ``entity:{id}`` at each entity's newest row
+        
+        These are the keys the incremental upserts maintain, so both load
+        modes serve ``get_features_by_entity``. Rows are written in order;
+        if an entity repeats within the batch, its last row wins.
+        """
+        ids = [str(entity_id) for entity_id in entity_ids]
+        for start in range(0, len(df), chunk_size):
+            lines = df.iloc[start:start + chunk_size].to_json(orient='records', lines=True).splitlines()
+            pipe = self.client.pipeline(transaction=False)
+            for entity_id, record in zip(ids[start:start + chunk_size], lines):
+                pipe.setex(f"entity:{entity_id}", ttl, record)
+            pipe.execute()
+    
+    def get_features_by_entity(self, entity_ids: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """Newest feature row of each entity (``None`` if unknown), in one round trip"""
+        if not entity_ids:
+            return []
+        values = self.client.mget([f"entity:{entity_id}" for entity_id in entity_ids])
+        return [json.loads(value) if value else None for value in values]
+    
+    def store_features_incremental(self, df, entity_ids, hashes, timestamp: str, ttl: int = 3600,
+                                   chunk_size: int = 10000) -> Dict[str, int]:
+        """Upsert feature rows keyed by entity, skipping rows whose content is unchanged
+        
+        Each entity's row lives at ``entity:{id}`` and its content
+        hash in the ``feature_hashes`` hash, kept outside ``features:*`` so
+        scans of that pattern only see rows. Rows whose hash matches only get
+        their TTL refreshed; if the key has already expired the row is
+        written again.
+        """
+        ids = [str(entity_id) for entity_id in entity_ids]
+        hashes = [str(value) for value in hashes]
+        written = refreshed = 0
+        
+        for start in range(0, len(ids), chunk_size):
+            chunk_ids = ids[start:start + chunk_size]
+            chunk_hashes = hashes[start:start + chunk_size]
+            stored = self.client.hmget("feature_hashes", chunk_ids)
+            
+            unchanged = [i for i, (old, new) in enumerate(zip(stored, chunk_hashes)) if old == new]
+            pipe = self.client.pipeline(transaction=False)
+            for i in unchanged:
+                pipe.expire(f"entity:{chunk_ids[i]}", ttl)
+            alive = dict(zip(unchanged, pipe.execute()))
+            
+            to_write = [i for i in range(len(chunk_ids)) if not alive.get(i)]
+            refreshed += len(chunk_ids) - len(to_write)
+            if not to_write:
+                continue
+            
+            rows = df.iloc[[start + i for i in to_write]]
+            lines = rows.to_json(orient='records', lines=True).splitlines()
+            pipe = self.client.pipeline(transaction=False)
+            for i, record in zip(to_write, lines):
+                pipe.setex(f"entity:{chunk_ids[i]}", ttl, record)
+            pipe.hset("feature_hashes", mapping={chunk_ids[i]: chunk_hashes[i] for i in to_write})
+            pipe.execute()
+            written += len(to_write)
+        
+        metadata = {
+            'feature_names': df.columns.tolist(),
+            'count': len(ids),
+            'written': written,
+            'refreshed': refreshed,
+            'timestamp': timestamp
+        }
+        self.client.setex(f"metadata:{timestamp}", ttl, json.dumps(metadata))
+        return {'written': written, 'refreshed': refreshed}
+    
     def get_latest_features(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get latest features from Redis"""
+        if self.config.FEATURE_LAYOUT == 'buckets':
+            from src.utils.feature_store import BucketedFeatureStore
+            return BucketedFeatureStore(self).latest(limit)
+        
         # Get all feature keys sorted by timestamp
         keys = self.client.keys("features:*")
         if not keys:
@@ -57,12 +208,59 @@ class RedisClient:
     
     def get_features_by_id(self, feature_id: str) -> Optional[Dict[str, Any]]:
         """Get specific features by ID"""
+        if self.config.FEATURE_LAYOUT == 'buckets':
+            from src.utils.feature_store import BucketedFeatureStore
+            return BucketedFeatureStore(self).get(feature_id)
+        
         keys = self.client.keys(f"features:*:{feature_id}")
         if keys:
             feature_data = self.client.get(keys[0])
             return json.loads(feature_data) if feature_data else None
         return None
     
+    def get_features_by_ids(self, feature_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Features for several ids, aligned with ``feature_ids`` (``None`` when missing)
+        
+        Full ``{timestamp}:{i}`` ids are read with one MGET, which a sharded
+        client splits per shard and issues in parallel; bare indices fall
+        back to ``get_features_by_id``.
+        """
+        if self.config.FEATURE_LAYOUT == 'buckets':
+            return [self.get_features_by_id(feature_id) for feature_id in feature_ids]
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(feature_ids)
+        full = [i for i, feature_id in enumerate(feature_ids) if ':' in str(feature_id)]
+        if full:
+            values = self.client.mget([f"features:{feature_ids[i]}" for i in full])
+            for i, value in zip(full, values):
+                results[i] = json.loads(value) if value else None
+        for i, feature_id in enumerate(feature_ids):
+            if ':' not in str(feature_id):
+                results[i] = self.get_features_by_id(feature_id)
+        return results
+    
+    def store_predictions(self, model_name: str, version: str, feature_ids: List[str], predictions,
+                          ttl: int = 3600, chunk_size: int = 10000) -> None:
+        """Store precomputed predictions as ``pred:{model}:{version}:{feature_id}``
+        
+        ``version`` must be concrete (not ``latest``), so results of an older
+        version are never served once a new one is promoted.
+        """
+        for start in range(0, len(feature_ids), chunk_size):
+            pipe = self.client.pipeline(transaction=False)
+            for feature_id, prediction in zip(feature_ids[start:start + chunk_size],
+                                              predictions[start:start + chunk_size]):
+                value = prediction.tolist() if hasattr(prediction, 'tolist') else prediction
+                pipe.setex(f"pred:{model_name}:{version}:{feature_id}", ttl, json.dumps(value))
+            pipe.execute()
+    
+    def get_predictions(self, model_name: str, version: str, feature_ids: List[str]) -> List[Optional[Any]]:
+        """Precomputed predictions aligned with ``feature_ids`` (``None`` when missing), in one MGET"""
+        if not feature_ids:
+            return []
+        values = self.client.mget([f"pred:{model_name}:{version}:{feature_id}" for feature_id in feature_ids])
+        return [json.loads(value) if value is not None else None for value in values]
+    
     def store_model(self, model_name: str, model_object: Any, version: str = "latest") -> None:
         """Store ML model in Redis"""
         key = f"model:{model_name}:{version}"
@@ -73,21 +271,41 @@ class RedisClient:
         latest_key = f"model:{model_name}:latest"
         self.client.set(latest_key, version)
     
-    def load_model(self, model_name: str, version: str = "latest") -> Any:
-        """Load ML model from Redis"""
+    def resolve_version(self, model_name: str, version: str = "latest") -> str:
+        """The concrete version ``latest`` points at (other versions are returned as is)"""
         if version == "latest":
             latest_key = f"model:{model_name}:latest"
             version = self.client.get(latest_key)
             if not version:
-                raise ValueError(f"No model found for {model_name}")
+                raise ModelNotFoundError(f"No model found for {model_name}")
+        return version
+    
+    def load_model(self, model_name: str, version: str = "latest") -> Any:
+        """Load ML model from Redis"""
+        version = self.resolve_version(model_name, version)
         
         key = f"model:{model_name}:{version}"
         serialized_model = self.binary_client.get(key)
         if not serialized_model:
-            raise ValueError(f"Model {model_name}:{version} not found")
+            raise ModelNotFoundError(f"Model {model_name}:{version} not found")
         
         return pickle.loads(serialized_model)
     
+    def store_transformer(self, model_name: str, transformer: Any, version: str) -> None:
+        """Store a fitted feature transformer next to the model version it was trained with"""
+        key = f"transformer:{model_name}:{version}"
+        self.binary_client.set(key, pickle.dumps(transformer))
+    
+    def load_transformer(self, model_name: str, version: str = "latest") -> Optional[Any]:
+        """Load the fitted transformer for a model version, or None if none was registered"""
+        if version == "latest":
+            version = self.client.get(f"model:{model_name}:latest")
+            if not version:
+                return None
+        
+        serialized = self.binary_client.get(f"transformer:{model_name}:{version}")
+        return pickle.loads(serialized) if serialized else None
+    
     def health_check(self) -> bool:
         """Check Redis connection health"""
         try:
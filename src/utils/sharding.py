@@ -0,0 +1,287 @@
+import argparse
+import bisect
+import hashlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+# Commands that take several keys; they are split per shard rather than routed
+_MULTI_KEY = ('mget', 'delete', 'unlink', 'exists', 'touch')
+
+
+def hash_key(key) -> str:
+    """The part of a key that is hashed: the ``{tag}`` if present, as in Redis Cluster
+
+    Keys sharing a tag (``features:{2024-01-01}:1``, ``metadata:{2024-01-01}``)
+    always land on the same shard.
+    """
+    if isinstance(key, bytes):
+        key = key.decode()
+    start = key.find('{')
+    if start != -1:
+        end = key.find('}', start + 1)
+        if end > start + 1:
+            return key[start + 1:end]
+    return key
+
+
+def _point(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+class ConsistentHashRing:
+    """Maps keys to node names; adding or removing a node moves ~1/N of the keys
+
+    Each node is placed at ``vnodes`` points on a 64-bit ring and a key
+    belongs to the first node clockwise from its hash.
+    """
+
+    def __init__(self, nodes: Sequence[str], vnodes: int = 160):
+        if not nodes:
+            raise ValueError("A hash ring needs at least one node")
+        self.nodes = list(nodes)
+        self.vnodes = vnodes
+        points = sorted((_point(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key) -> str:
+        index = bisect.bisect(self._points, _point(hash_key(key)))
+        return self._owners[index % len(self._owners)]
+
+
+class ShardedRedis:
+    """A redis.Redis look-alike that spreads keys over several clients
+
+    Single-key commands are routed by the ring. ``mget``/``delete``/
+    ``unlink``/``exists`` are split per shard and issued in parallel;
+    ``keys``/``scan_iter``/``ping``/``flushall``/``dbsize`` fan out to every
+    shard. Pipelines buffer commands per shard and execute the shards
+    concurrently; they are never atomic across shards.
+    """
+
+    def __init__(self, clients: Dict[str, Any], vnodes: int = 160, max_workers: Optional[int] = None):
+        self.clients = dict(clients)
+        self.ring = ConsistentHashRing(list(self.clients), vnodes)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or len(self.clients),
+                                           thread_name_prefix="redis-shard")
+
+    def client_for(self, key) -> Any:
+        return self.clients[self.ring.node_for(key)]
+
+    def group(self, keys: Sequence[Any]) -> Dict[str, List[int]]:
+        """Positions of ``keys`` per owning node"""
+        groups: Dict[str, List[int]] = {}
+        for position, key in enumerate(keys):
+            groups.setdefault(self.ring.node_for(key), []).append(position)
+        return groups
+
+    def map_shards(self, calls: Dict[str, Callable[[Any], Any]]) -> Dict[str, Any]:
+        """Run one call per node, concurrently when more than one node is involved"""
+        if len(calls) == 1:
+            node, call = next(iter(calls.items()))
+            return {node: call(self.clients[node])}
+        futures = {node: self.executor.submit(call, self.clients[node]) for node, call in calls.items()}
+        return {node: future.result() for node, future in futures.items()}
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def routed(key, *args, **kwargs):
+            return getattr(self.client_for(key), name)(key, *args, **kwargs)
+        return routed
+
+    def mget(self, keys, *args) -> List[Any]:
+        keys = [keys, *args] if isinstance(keys, (str, bytes)) else list(keys) + list(args)
+        groups = self.group(keys)
+        results = self.map_shards({
+            node: (lambda client, positions=positions: client.mget([keys[i] for i in positions]))
+            for node, positions in groups.items()
+        })
+        values: List[Any] = [None] * len(keys)
+        for node, positions in groups.items():
+            for position, value in zip(positions, results[node]):
+                values[position] = value
+        return values
+
+    def _count_per_shard(self, command: str, keys: Sequence[Any]) -> int:
+        if not keys:
+            return 0
+        results = self.map_shards({
+            node: (lambda client, positions=positions: getattr(client, command)(*[keys[i] for i in positions]))
+            for node, positions in self.group(keys).items()
+        })
+        return sum(results.values())
+
+    def delete(self, *keys) -> int:
+        return self._count_per_shard('delete', keys)
+
+    def unlink(self, *keys) -> int:
+        return self._count_per_shard('unlink', keys)
+
+    def exists(self, *keys) -> int:
+        return self._count_per_shard('exists', keys)
+
+    def touch(self, *keys) -> int:
+        return self._count_per_shard('touch', keys)
+
+    def _all(self, command: str, *args, **kwargs) -> Dict[str, Any]:
+        return self.map_shards({
+            node: (lambda client: getattr(client, command)(*args, **kwargs)) for node in self.clients
+        })
+
+    def keys(self, pattern: str = '*') -> List[Any]:
+        return [key for keys in self._all('keys', pattern).values() for key in keys]
+
+    def scan_iter(self, match: Optional[str] = None, count: Optional[int] = None, **kwargs) -> Iterator[Any]:
+        for client in self.clients.values():
+            yield from client.scan_iter(match=match, count=count, **kwargs)
+
+    def ping(self) -> bool:
+        return all(self._all('ping').values())
+
+    def flushall(self) -> bool:
+        return all(self._all('flushall').values())
+
+    def dbsize(self) -> int:
+        return sum(self._all('dbsize').values())
+
+    def pipeline(self, transaction: bool = True) -> "ShardedPipeline":
+        return ShardedPipeline(self)
+
+
+class ShardedPipeline:
+    """Buffers single-key commands per shard; ``execute`` returns results in call order"""
+
+    def __init__(self, sharded: ShardedRedis):
+        self.sharded = sharded
+        self._commands: List[tuple] = []
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in _MULTI_KEY:
+            raise NotImplementedError(f"{name} with several keys is not supported in a sharded pipeline")
+
+        def buffered(key, *args, **kwargs):
+            self._commands.append((self.sharded.ring.node_for(key), name, (key, *args), kwargs))
+            return self
+        return buffered
+
+    def execute(self) -> List[Any]:
+        groups: Dict[str, List[int]] = {}
+        for position, (node, _, _, _) in enumerate(self._commands):
+            groups.setdefault(node, []).append(position)
+
+        def run(positions):
+            def call(client):
+                pipe = client.pipeline(transaction=False)
+                for position in positions:
+                    _, name, args, kwargs = self._commands[position]
+                    getattr(pipe, name)(*args, **kwargs)
+                return pipe.execute()
+            return call
+
+        results = self.sharded.map_shards({node: run(positions) for node, positions in groups.items()}) if groups else {}
+        values: List[Any] = [None] * len(self._commands)
+        for node, positions in groups.items():
+            for position, value in zip(positions, results[node]):
+                values[position] = value
+        self._commands = []
+        return values
+
+
+def parse_shards(spec: str) -> List[str]:
+    """``"host:port,host:port"`` -> node names, in order"""
+    return [node.strip() for node in spec.split(',') if node.strip()]
+
+
+def connect_shards(nodes: Sequence[str], decode_responses: bool = True, password: Optional[str] = None) -> Dict[str, Any]:
+    import redis
+
+    clients = {}
+    for node in nodes:
+        host, _, port = node.rpartition(':')
+        clients[node] = redis.Redis(host=host or node, port=int(port or 6379), password=password,
+                                    decode_responses=decode_responses)
+    return clients
+
+
+def rebalance(clients: Dict[str, Any], old_nodes: Sequence[str], new_nodes: Sequence[str], vnodes: int = 160,
+              dry_run: bool = False, scan_count: int = 1000, batch_size: int = 500) -> Dict[str, Any]:
+    """Move keys whose owner differs between two shard maps
+
+    ``clients`` (with ``decode_responses=False``) must cover every node of
+    both maps. Keys are copied with DUMP/RESTORE, keeping their remaining
+    TTL, and deleted from the old owner once restored. Run it after the new
+    map is deployed; until a key is moved, reads through the new map miss it.
+    """
+    ring = ConsistentHashRing(new_nodes, vnodes)
+    stats: Dict[str, Any] = {'scanned': 0, 'moved': 0, 'targets': {node: 0 for node in new_nodes}}
+
+    def flush(source, batch: List[tuple]) -> None:
+        pipe = source.pipeline(transaction=False)
+        for key, _ in batch:
+            pipe.pttl(key)
+            pipe.dump(key)
+        results = pipe.execute()
+
+        moved = []
+        per_target: Dict[str, Any] = {}
+        for (key, target), ttl, payload in zip(batch, results[0::2], results[1::2]):
+            if payload is None or ttl == -2:
+                # Expired while moving
+                continue
+            pipe = per_target.setdefault(target, clients[target].pipeline(transaction=False))
+            pipe.restore(key, max(ttl, 0), payload, replace=True)
+            moved.append((key, target))
+        for pipe in per_target.values():
+            pipe.execute()
+        if moved:
+            source.unlink(*[key for key, _ in moved])
+        for _, target in moved:
+            stats['targets'][target] += 1
+        stats['moved'] += len(moved)
+
+    for node in old_nodes:
+        source = clients[node]
+        batch: List[tuple] = []
+        for key in source.scan_iter(count=scan_count):
+            stats['scanned'] += 1
+            target = ring.node_for(key)
+            if target == node:
+                continue
+            if dry_run:
+                stats['moved'] += 1
+                stats['targets'][target] += 1
+                continue
+            batch.append((key, target))
+            if len(batch) >= batch_size:
+                flush(source, batch)
+                batch = []
+        if batch:
+            flush(source, batch)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import json
+    from src.utils.config import Config
+
+    parser = argparse.ArgumentParser(description="Move keys between Redis shards after a shard map change")
+    parser.add_argument("--from", dest="old", required=True, help="Current shard map, host:port,host:port")
+    parser.add_argument("--to", dest="new", required=True, help="New shard map, host:port,host:port")
+    parser.add_argument("--vnodes", type=int, default=Config.REDIS_SHARD_VNODES)
+    parser.add_argument("--dry-run", action="store_true", help="Only count the keys that would move")
+    args = parser.parse_args(argv)
+
+    old_nodes, new_nodes = parse_shards(args.old), parse_shards(args.new)
+    clients = connect_shards(sorted(set(old_nodes) | set(new_nodes)), decode_responses=False,
+                             password=Config.REDIS_PASSWORD)
+    print(json.dumps(rebalance(clients, old_nodes, new_nodes, args.vnodes, args.dry_run), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Raised when a caller gives up waiting on another caller's in-flight call"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for it and get the same result, or the same exception.
+    Nothing is cached: once the call finishes, the next caller runs it again.
+    ``timeout`` bounds how long a waiter blocks; the running call itself is
+    not interrupted and still completes for the other callers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executions = 0
+        self._deduplicated = 0
+        self._timeouts = 0
+        self._errors = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+            else:
+                call.waiters += 1
+                self._deduplicated += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                    if call.error is not None:
+                        self._errors += 1
+                call.done.set()
+        elif not call.done.wait(timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise SingleFlightTimeout(f"Timed out after {timeout}s waiting for in-flight call {key!r}")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "executions": self._executions,
+                "deduplicated": self._deduplicated,
+                "timeouts": self._timeouts,
+                "errors": self._errors,
+                "in_flight": len(self._calls),
+                "waiting": sum(call.waiters for call in self._calls.values())
+            }
@@ -0,0 +1,184 @@
+import unittest
+from unittest.mock import Mock, patch
+import asyncio
+import io
+import time
+import numpy as np
+from fastapi.testclient import TestClient
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.main import app
+# main.py registers its handler for the src.api.admission classes
+from src.api.admission import AdmissionController, AdmissionRejected, parse_model_limits
+
+class TestAdmissionController(unittest.TestCase):
+    def test_parse_model_limits(self):
+        self.assertEqual(parse_model_limits("default=8, ranker=2"), {"default": 8, "ranker": 2})
+        self.assertEqual(parse_model_limits(None), {})
+
+    def test_queue_full_is_rejected(self):
+        controller = AdmissionController(max_concurrency=1, max_queue_depth=1, model_limits={})
+
+        async def scenario():
+            await controller.acquire("default")
+            queued = asyncio.create_task(controller.acquire("default"))
+            await asyncio.sleep(0)
+            with self.assertRaises(AdmissionRejected) as ctx:
+                await controller.acquire("default")
+            self.assertEqual(ctx.exception.status_code, 429)
+            self.assertGreaterEqual(ctx.exception.retry_after, 1)
+
+            controller.release("default")
+            await queued
+            controller.release("default")
+
+        asyncio.run(scenario())
+
+        metrics = controller.metrics()
+        self.assertEqual(metrics["shed"]["queue_full"], 1)
+        self.assertEqual(metrics["admitted"], 2)
+        self.assertEqual(metrics["active"], 0)
+
+    def test_deadline_exceeded_while_queued(self):
+        controller = AdmissionController(max_concurrency=1, max_queue_depth=4, model_limits={})
+        controller._service_time = 0.0
+
+        async def scenario():
+            await controller.acquire("default")
+            with self.assertRaises(AdmissionRejected) as ctx:
+                await controller.acquire("default", deadline=time.monotonic() + 0.05)
+            self.assertEqual(ctx.exception.status_code, 503)
+            self.assertEqual(controller.metrics()["queue_depth"], 0)
+
+        asyncio.run(scenario())
+
+        self.assertEqual(controller.metrics()["shed"]["deadline"], 1)
+
+    def test_per_model_limit(self):
+        controller = AdmissionController(max_concurrency=4, max_queue_depth=4,
+                                         model_limits={"slow": 1})
+
+        async def scenario():
+            await controller.acquire("slow")
+            waiting = asyncio.create_task(controller.acquire("slow"))
+            await asyncio.sleep(0)
+            # Other models are unaffected by the slow model's limit
+            await controller.acquire("fast")
+            self.assertFalse(waiting.done())
+
+            controller.release("slow")
+            await waiting
+            self.assertEqual(controller.metrics()["active_per_model"], {"slow": 1, "fast": 1})
+
+        asyncio.run(scenario())
+
+    def test_invalid_timeout_header(self):
+        controller = AdmissionController(model_limits={})
+
+        for value in ("abc", "0", "-5"):
+            with self.assertRaises(AdmissionRejected) as ctx:
+                controller.deadline_from_headers({controller.timeout_header: value})
+            self.assertEqual(ctx.exception.status_code, 400)
+
+        self.assertIsNotNone(controller.deadline_from_headers({controller.timeout_header: "250"}))
+
+class TestAdmissionAPI(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_shed_request_returns_retry_after(self):
+        controller = AdmissionController(max_concurrency=1, max_queue_depth=0, model_limits={})
+        controller._active = 1
+
+        with patch('api.main.admission_controller', controller):
+            response = self.client.post("/predict", json={"features": {"feature_1": 1}})
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response.headers)
+
+    def test_malformed_timeout_header_returns_400(self):
+        controller = AdmissionController(model_limits={})
+
+        with patch('api.main.admission_controller', controller):
+            response = self.client.post(
+                "/predict",
+                json={"features": {"feature_1": 1}},
+                headers={controller.timeout_header: "abc"}
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(controller.metrics()["active"], 0)
+
+    def test_bulk_predict_releases_slot(self):
+        controller = AdmissionController(max_concurrency=1, model_limits={})
+        engine = Mock()
+        engine.predict_matrix.return_value = iter([{"offset": 0, "predictions": [1.0]}])
+        buffer = io.BytesIO()
+        np.save(buffer, np.ones((1, 2)))
+
+        with patch('api.main.admission_controller', controller), \
+                patch('api.main.inference_engine', engine):
+            response = self.client.post(
+                "/predict/bulk",
+                content=buffer.getvalue(),
+                headers={"content-type": "application/x-npy"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        metrics = controller.metrics()
+        self.assertEqual(metrics["active"], 0)
+        # Bulk work feeds the service-time estimate
+        self.assertNotEqual(metrics["service_time_ms"], 50.0)
+
+    def test_unstarted_bulk_stream_releases_on_the_event_loop(self):
+        from starlette.requests import Request
+        from api import main
+
+        controller = AdmissionController(max_concurrency=1, model_limits={})
+        on_loop = []
+        release = controller.release
+
+        def recording_release(*args):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            release(*args)
+
+        controller.release = recording_release
+        engine = Mock()
+        engine.predict_matrix.return_value = iter([])
+        buffer = io.BytesIO()
+        np.save(buffer, np.ones((1, 2)))
+
+        async def scenario():
+            async def receive():
+                return {"type": "http.request", "body": buffer.getvalue(), "more_body": False}
+
+            request = Request({"type": "http", "method": "POST", "path": "/predict/bulk", "query_string": b"",
+                               "headers": [(b"content-type", b"application/x-npy")]}, receive)
+            response = await main.bulk_predict(request)
+            # The body is never iterated, as when the client goes away first
+            await response.background()
+
+        with patch('api.main.admission_controller', controller), \
+                patch('api.main.inference_engine', engine):
+            asyncio.run(scenario())
+
+        self.assertEqual(on_loop, [True])
+        self.assertEqual(controller.metrics()["active"], 0)
+
+    def test_admission_metrics(self):
+        response = self.client.get("/metrics/admission")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("queue_depth", response.json())
+        self.assertIn("shed", response.json())
+
+if __name__ == '__main__':
+    unittest.main()
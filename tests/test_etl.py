@@ -1,21 +1,31 @@
 import unittest
 from unittest.mock import Mock, patch, MagicMock
+import numpy as np
 import pandas as pd
 import sys
 import os
+import json
+import sqlite3
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from data.extraction import DataExtractor, extract_data
 from data.transformation import DataTransformer, transform_data
+from data.feature_transform import FeatureTransform
+from data.sketches import CategoryCounter, HyperLogLog, QuantileSketch
+from data.streaming import StreamingTransformer, iter_chunks, transform_data_streaming
 from data.validation import DataValidator, validate_data
 
 class TestDataExtraction(unittest.TestCase):
     def setUp(self):
         self.extractor = DataExtractor()
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_extract_from_api_success(self, mock_get):
         # Mock successful API response
         mock_response = Mock()
@@ -32,8 +42,10 @@ class TestDataExtraction(unittest.TestCase):
         self.assertEqual(len(result), 2)
         self.assertIn('id', result.columns)
         self.assertIn('name', result.columns)
+        # Goes through the pooled session, with the configured timeout
+        self.assertEqual(mock_get.call_args.kwargs['timeout'], self.extractor.config.API_TIMEOUT)
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_extract_from_api_failure(self, mock_get):
         # Mock API failure
         mock_get.side_effect = Exception("API Error")
@@ -53,6 +65,613 @@ class TestDataExtraction(unittest.TestCase):
         self.assertIn('timestamp', result)
         self.assertIsInstance(result['api_data'], list)
 
+class _PagedUsersHandler(BaseHTTPRequestHandler):
+    """Serves ``records`` in pages; the first request for ``throttle_page`` gets a 429"""
+    records = []
+    throttle_page = None
+    throttled = set()
+    
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query['page'][0])
+        per_page = int(query['per_page'][0])
+        if page == self.throttle_page and page not in self.throttled:
+            self.throttled.add(page)
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = json.dumps({'data': self.records[(page - 1) * per_page:page * per_page]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+class TestPaginatedExtraction(unittest.TestCase):
+    def setUp(self):
+        _PagedUsersHandler.records = [{'id': i, 'value': i * 2} for i in range(95)]
+        _PagedUsersHandler.throttle_page = 3
+        _PagedUsersHandler.throttled = set()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _PagedUsersHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        
+        self.extractor = DataExtractor()
+        self.extractor.config.API_BASE_URL = f'http://127.0.0.1:{self.server.server_port}'
+        self.extractor.config.API_BACKOFF_FACTOR = 0
+    
+    def test_pages_stream_in_order(self):
+        pages = list(self.extractor.iter_api_pages('users', page_size=10, max_concurrency=4))
+        
+        self.assertEqual(len(pages), 10)
+        self.assertTrue(all(len(page) <= 10 for page in pages))
+        result = pd.concat(pages, ignore_index=True)
+        self.assertEqual(result['id'].tolist(), list(range(95)))
+        # The throttled page was retried
+        self.assertEqual(_PagedUsersHandler.throttled, {3})
+    
+    def test_stats_reported(self):
+        list(self.extractor.iter_api_pages('users', page_size=20, max_concurrency=2))
+        
+        stats = self.extractor.last_extraction_stats
+        self.assertEqual(stats['pages'], 5)
+        self.assertEqual(stats['records'], 95)
+        self.assertGreater(stats['bytes'], 0)
+        self.assertGreater(stats['pages_per_sec'], 0)
+        self.assertGreater(stats['bytes_per_sec'], 0)
+    
+    def test_exact_multiple_ends_on_empty_page(self):
+        _PagedUsersHandler.records = _PagedUsersHandler.records[:40]
+        
+        pages = list(self.extractor.iter_api_pages('users', page_size=10, max_concurrency=3))
+        
+        self.assertEqual(sum(len(page) for page in pages), 40)
+    
+    def test_http_error_raises(self):
+        self.extractor.config.API_MAX_RETRIES = 0
+        
+        with self.assertRaises(Exception):
+            list(self.extractor.iter_api_pages('users', page_size=10))
+
+class TestDatabaseExtraction(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, 'source.db')
+        with sqlite3.connect(path) as connection:
+            connection.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age REAL)')
+            connection.executemany(
+                'INSERT INTO users VALUES (?, ?, ?)',
+                [(i, f'user_{i}', 20 + i % 50) for i in range(1, 1001)]
+            )
+        
+        self.extractor = DataExtractor()
+        self.extractor.config.DATABASE_URL = f'sqlite:///{path}'
+    
+    def test_batches_are_bounded(self):
+        batches = list(self.extractor.iter_database_batches('users', batch_size=300))
+        
+        self.assertEqual([len(batch) for batch in batches], [300, 300, 300, 100])
+        self.assertEqual(list(batches[0].columns), ['id', 'name', 'age'])
+    
+    def test_column_projection_and_arrow(self):
+        batches = list(self.extractor.iter_database_batches(
+            'SELECT * FROM users WHERE age > 60', columns=['id', 'age'], as_arrow=True
+        ))
+        
+        self.assertEqual(batches[0].schema.names, ['id', 'age'])
+        self.assertEqual(sum(batch.num_rows for batch in batches), 180)
+    
+    def test_invalid_identifier_rejected(self):
+        with self.assertRaises(ValueError):
+            list(self.extractor.iter_database_batches('users; DROP TABLE users'))
+    
+    def test_partitioned_read_covers_every_row_once(self):
+        batches = list(self.extractor.iter_database_partitions('users', 'id', partitions=4, batch_size=100))
+        
+        ids = pd.concat(batches)['id'].sort_values().tolist()
+        self.assertEqual(ids, list(range(1, 1001)))
+    
+    def test_extract_from_database(self):
+        result = self.extractor.extract_from_database('SELECT name FROM users WHERE id <= 5')
+        
+        self.assertEqual(result['name'].tolist(), [f'user_{i}' for i in range(1, 6)])
+
+class _CountingStore:
+    """Wraps an ObjectStore and counts the bytes it serves"""
+    def __init__(self, store):
+        self.store = store
+        self.bytes_served = 0
+    
+    def __getattr__(self, name):
+        return getattr(self.store, name)
+    
+    def get_range(self, key, start, end):
+        data = self.store.get_range(key, start, end)
+        self.bytes_served += len(data)
+        return data
+
+class TestObjectStoreExtraction(unittest.TestCase):
+    def setUp(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from src.data.object_store import LocalObjectStore
+        
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        for date in ('2024-01-01', '2024-01-02'):
+            for region in ('eu', 'us'):
+                directory = os.path.join(self.root, 'events', f'date={date}', f'region={region}')
+                os.makedirs(directory)
+                n = 1000
+                table = pa.table({
+                    'id': np.arange(n),
+                    'value': np.random.default_rng(0).normal(size=n),
+                    'payload': [f'{date}-{region}-{i}' * 10 for i in range(n)]
+                })
+                pq.write_table(table, os.path.join(directory, 'part-0.parquet'), row_group_size=250)
+        pd.DataFrame({'id': [1, 2, 3], 'name': ['a', 'b', 'c']}).to_csv(
+            os.path.join(self.root, 'users.csv'), index=False
+        )
+        self.store = LocalObjectStore(self.root)
+        self.extractor = DataExtractor()
+    
+    def test_partition_pruning_and_projection(self):
+        batches = list(self.extractor.iter_object_batches(
+            'bucket', 'events/', columns=['id', 'region'], filters={'region': 'eu'}, store=self.store
+        ))
+        
+        table = pd.concat([batch.to_pandas() for batch in batches])
+        self.assertEqual(list(table.columns), ['id', 'region'])
+        self.assertEqual(set(table['region']), {'eu'})
+        self.assertEqual(len(table), 2000)
+        self.assertEqual(self.extractor.last_extraction_stats['objects'], 2)
+    
+    def test_row_group_pruning_by_statistics(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from src.data.object_store import read_object
+        
+        n = 20000
+        key = 'large/part-0.parquet'
+        os.makedirs(os.path.join(self.root, 'large'))
+        table = pa.table({
+            'id': np.arange(n),
+            'value': np.random.default_rng(1).normal(size=n),
+            'payload': [f'row-{i}' * 10 for i in range(n)]
+        })
+        pq.write_table(table, os.path.join(self.root, key), row_group_size=2500)
+        store = _CountingStore(self.store)
+        
+        with patch('src.utils.config.Config.OBJECT_STORE_RANGE_THRESHOLD', 0):
+            batches = read_object(store, key, columns=['id', 'value'], filters={'id': [10, 15000]})
+        
+        ids = pd.concat([batch.to_pandas() for batch in batches])['id'].tolist()
+        self.assertEqual(ids, [10, 15000])
+        # Only the footer and two columns of two row groups were fetched
+        self.assertLess(store.bytes_served, self.store.size(key) / 2)
+    
+    def test_parallel_ranged_download(self):
+        from src.data.object_store import download
+        key = 'events/date=2024-01-02/region=us/part-0.parquet'
+        
+        data = download(self.store, key, part_size=1024, workers=4)
+        
+        self.assertEqual(data, self.store.get(key))
+    
+    def test_csv_objects(self):
+        with patch('src.utils.config.Config.OBJECT_STORE_ROOT', self.root):
+            result = self.extractor.extract_from_s3('', 'users.csv', columns=['name'])
+        
+        self.assertEqual(result['name'].tolist(), ['a', 'b', 'c'])
+    
+    def test_s3_store_with_moto(self):
+        import boto3
+        from moto import mock_aws
+        from src.data.object_store import S3ObjectStore
+        
+        with mock_aws():
+            client = boto3.client('s3', region_name='us-east-1')
+            client.create_bucket(Bucket='raw')
+            for key in self.store.list_keys('events/'):
+                client.put_object(Bucket='raw', Key=key, Body=self.store.get(key))
+            store = S3ObjectStore('raw', client=client)
+            
+            with patch('src.utils.config.Config.OBJECT_STORE_RANGE_THRESHOLD', 0):
+                batches = list(self.extractor.iter_object_batches(
+                    'raw', 'events/', columns=['value'], filters={'date': '2024-01-02'}, store=store
+                ))
+        
+        self.assertEqual(sum(batch.num_rows for batch in batches), 2000)
+
+class TestArtifacts(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.df = pd.DataFrame({
+            'user_id': [1, 2, 3],
+            'feature_1': [0.5, 1.5, np.nan],
+            'category': ['a', 'b', None]
+        })
+    
+    def test_local_roundtrip_is_memory_mapped(self):
+        from src.data.artifacts import read_artifact, read_artifact_table, write_artifact
+        
+        ref = write_artifact(self.df, 'features', 'manual__2024-01-01T00:00:00+00:00',
+                             {'timestamp': '2024-01-01T00:00:00'}, root=self.root)
+        
+        self.assertTrue(ref['uri'].startswith(self.root))
+        self.assertNotIn(':', os.path.relpath(ref['uri'], self.root))
+        self.assertEqual(ref['rows'], 3)
+        self.assertEqual(ref['timestamp'], '2024-01-01T00:00:00')
+        # The reference is all that goes through XCom
+        self.assertLess(len(json.dumps(ref)), 512)
+        
+        pd.testing.assert_frame_equal(read_artifact(ref), self.df)
+        table = read_artifact_table(ref, columns=['feature_1'])
+        self.assertEqual(table.column_names, ['feature_1'])
+    
+    def test_s3_roundtrip(self):
+        import boto3
+        from moto import mock_aws
+        from src.data.artifacts import read_artifact, write_artifact
+        
+        with mock_aws(), patch('src.utils.config.Config.AWS_REGION', 'us-east-1'):
+            boto3.client('s3', region_name='us-east-1').create_bucket(Bucket='pipeline')
+            ref = write_artifact(self.df, 'raw', 'run-1', root='s3://pipeline/artifacts')
+            result = read_artifact(ref)
+        
+        self.assertEqual(ref['uri'], 's3://pipeline/artifacts/run-1/raw.arrow')
+        pd.testing.assert_frame_equal(result, self.df)
+    
+    def test_frame_helpers_match_dict_api(self):
+        from data.transformation import transform_frame
+        
+        raw = {'api_data': self.df.to_dict('records'), 'timestamp': '2024-01-01T00:00:00'}
+        expected = transform_data(raw)
+        
+        result = transform_frame(self.df.copy())
+        self.assertEqual(result.columns.tolist(), expected['feature_names'])
+        self.assertEqual(len(result), len(expected['features']))
+
+class TestIncrementalETL(unittest.TestCase):
+    def setUp(self):
+        import fakeredis
+        from src.utils.redis_client import RedisClient
+        
+        self.redis_client = RedisClient()
+        self.redis_client.client = fakeredis.FakeRedis(decode_responses=True)
+        self.raw = pd.DataFrame({
+            'user_id': [1, 2, 3, 4],
+            'feature_1': [1.0, 2.0, 3.0, 4.0],
+            'updated_at': ['2024-01-01T00:00:00', '2024-01-01T01:00:00',
+                           '2024-01-01T02:00:00', '2024-01-01T03:00:00']
+        })
+    
+    def test_watermark_filter_and_advance(self):
+        from data.incremental import filter_since, next_watermark
+        
+        newer = filter_since(self.raw, 'updated_at', '2024-01-01T01:00:00')
+        self.assertEqual(newer['user_id'].tolist(), [3, 4])
+        self.assertEqual(next_watermark(newer, 'updated_at', '2024-01-01T01:00:00')[:19], '2024-01-01T03:00:00')
+        self.assertEqual(next_watermark(newer.iloc[:0], 'updated_at', '2024-01-01T01:00:00'), '2024-01-01T01:00:00')
+        
+        cursor = filter_since(self.raw, 'user_id', 2)
+        self.assertEqual(cursor['user_id'].tolist(), [3, 4])
+        self.assertEqual(next_watermark(cursor, 'user_id', 2), 4)
+    
+    def test_watermark_store_roundtrip(self):
+        from data.incremental import WatermarkStore
+        
+        store = WatermarkStore(self.redis_client)
+        self.assertIsNone(store.get('users'))
+        store.set('users', '2024-01-01T03:00:00')
+        self.assertEqual(store.get('users'), '2024-01-01T03:00:00')
+    
+    def test_entity_ids_survive_deduplication(self):
+        from data.incremental import entity_ids
+        
+        raw = pd.concat([self.raw, self.raw.iloc[[1]]], ignore_index=True)
+        features = DataTransformer().fit_transform(raw.copy())
+        
+        self.assertEqual(entity_ids(raw, features, 'user_id').tolist(), [1, 2, 3, 4])
+    
+    def test_unchanged_rows_only_refresh_ttl(self):
+        from data.incremental import row_hashes
+        features = self.raw[['feature_1']]
+        ids = self.raw['user_id']
+        
+        first = self.redis_client.store_features_incremental(features, ids, row_hashes(features), 't1', ttl=100)
+        self.assertEqual(first, {'written': 4, 'refreshed': 0})
+        
+        changed = features.copy()
+        changed.loc[2, 'feature_1'] = 30.0
+        self.redis_client.client.expire('entity:4', 5)
+        self.redis_client.client.delete('entity:1')
+        second = self.redis_client.store_features_incremental(changed, ids, row_hashes(changed), 't2', ttl=100)
+        
+        # Row 3 changed and row 1 had expired; rows 2 and 4 were only touched
+        self.assertEqual(second, {'written': 2, 'refreshed': 2})
+        self.assertEqual(json.loads(self.redis_client.client.get('entity:3')), {'feature_1': 30.0})
+        self.assertGreater(self.redis_client.client.ttl('entity:4'), 5)
+        self.assertIsNotNone(self.redis_client.client.get('entity:1'))
+    
+    def test_redelivered_rows_are_skipped(self):
+        from data.incremental import entity_ids, source_hashes
+        
+        def load(raw, timestamp):
+            # Each batch refits its transformer, as the DAG does without a registered one
+            features = DataTransformer().fit_transform(raw.copy())
+            return self.redis_client.store_features_incremental(
+                features, entity_ids(raw, features), source_hashes(raw, features), timestamp
+            )
+        
+        load(self.raw, 't1')
+        # Rows 1 and 2 come back with a newer updated_at but the same content; row 3 changed
+        redelivered = self.raw.iloc[:3].copy()
+        redelivered['updated_at'] = '2024-01-02T00:00:00'
+        redelivered.loc[2, 'feature_1'] = 30.0
+        
+        self.assertEqual(load(redelivered, 't2'), {'written': 1, 'refreshed': 2})
+    
+    def test_entity_index_does_not_collide_with_batch_rows(self):
+        batch = pd.DataFrame({'feature_1': [10.0, 20.0, 30.0]})
+        
+        self.redis_client.store_feature_batch(batch, '2024-01-01T10:00:00', entity_ids=[1, 2, 0])
+        
+        # Entity 1's row is batch row 0; batch row 1 has the same id as entity 1
+        self.assertEqual(self.redis_client.get_features_by_id('1'), {'feature_1': 20.0})
+        self.assertEqual(self.redis_client.get_features_by_entity(['1']), [{'feature_1': 10.0}])
+        self.assertEqual(len(self.redis_client.get_latest_features()), 3)
+    
+    def test_latest_features_after_incremental_load(self):
+        from data.incremental import row_hashes
+        features = self.raw[['feature_1']]
+        
+        self.redis_client.store_feature_frame(features, 't0')
+        self.redis_client.store_features_incremental(features, self.raw['user_id'], row_hashes(features), 't1')
+        
+        # Only the batch rows; hashes and entity rows live outside features:*
+        rows = self.redis_client.get_latest_features()
+        self.assertEqual(sorted(row['feature_1'] for row in rows), [1.0, 2.0, 3.0, 4.0])
+
+class TestBucketedFeatureStore(unittest.TestCase):
+    def setUp(self):
+        import fakeredis
+        from src.utils.redis_client import RedisClient
+        from src.utils.feature_store import BucketedFeatureStore
+        
+        self.redis_client = RedisClient()
+        self.redis_client.client = fakeredis.FakeRedis(decode_responses=True)
+        self.store = BucketedFeatureStore(self.redis_client, bucket_seconds=3600, bucket_rows=4, ttl=600)
+        self.df = pd.DataFrame({'feature_1': np.arange(10, dtype=float)})
+        # Batch times inside the current window; older windows would already be expired
+        from datetime import datetime
+        window = self.store.window(datetime.now().isoformat())
+        self.t1 = datetime.fromtimestamp(window + 60).isoformat()
+        self.t2 = datetime.fromtimestamp(window + 120).isoformat()
+    
+    def test_rows_roll_over_into_buckets_with_one_ttl(self):
+        result = self.store.store_frame(self.df, self.t1)
+        # Another loader in the same window continues from the shared slot counter
+        self.store.store_frame(self.df.iloc[:3], self.t2 + ':p1')
+        
+        client = self.redis_client.client
+        window = self.store.window(self.t1)
+        self.assertEqual(result['buckets'], 3)
+        self.assertEqual([client.hlen(self.store.bucket_key(window, s)) for s in range(4)], [4, 4, 4, 1])
+        # The whole window expires together, ttl after it closes
+        expire_at = window + 3600 + 600
+        for key in client.keys('fbucket:*:*'):
+            self.assertAlmostEqual(client.ttl(key), expire_at - client.time()[0], delta=2)
+        self.assertEqual(len(client.keys('features:*')), 0)
+        
+        self.assertEqual(self.store.get(self.t1 + ':7'), {'feature_1': 7.0})
+        self.assertEqual(self.store.get(self.t2 + ':p1:2'), {'feature_1': 2.0})
+        self.assertEqual(self.store.get('2'), {'feature_1': 2.0})
+        self.assertIsNone(self.store.get(self.t1 + ':10'))
+        self.assertEqual([row['feature_1'] for row in self.store.latest(4)], [2.0, 1.0, 0.0, 9.0])
+    
+    def test_redis_client_reads_the_configured_layout(self):
+        with patch('src.utils.config.Config.FEATURE_LAYOUT', 'buckets'):
+            self.redis_client.store_feature_batch(self.df, self.t1)
+            self.assertEqual(self.redis_client.get_features_by_id(self.t1 + ':3'), {'feature_1': 3.0})
+            self.assertEqual(len(self.redis_client.get_latest_features(limit=20)), 10)
+    
+    def test_compaction_folds_row_keys_and_prunes_windows(self):
+        client = self.redis_client.client
+        self.redis_client.store_feature_frame(self.df, self.t1)
+        client.delete(f'features:{self.t1}:5')
+        client.zadd('fbucket:windows', {'0': 0})
+        # Entity rows written under the old prefix
+        client.setex('features:entity:5', 600, json.dumps({'feature_1': 5.0}))
+        client.set('features:entity:6', json.dumps({'feature_1': 0.0}))
+        client.set('entity:6', json.dumps({'feature_1': 6.0}))
+        store = self.store
+        
+        stats = store.compact()
+        
+        self.assertEqual(stats, {'expired_windows': 1, 'migrated_batches': 1, 'migrated_rows': 9,
+                                 'migrated_entities': 1})
+        self.assertEqual(self.redis_client.get_features_by_entity([5, 6]), [{'feature_1': 5.0}, {'feature_1': 6.0}])
+        self.assertGreater(client.ttl('entity:5'), 0)
+        self.assertEqual(client.keys(f'features:{self.t1}:*'), [])
+        self.assertEqual(store.get(self.t1 + ':9'), {'feature_1': 9.0})
+        self.assertIsNone(store.get(self.t1 + ':5'))
+        self.assertEqual(client.zrange('fbucket:windows', 0, -1), [str(store.window(self.t1))])
+
+class TestPointInTimeExport(unittest.TestCase):
+    def setUp(self):
+        import fakeredis
+        from datetime import datetime, timedelta
+        from src.utils.redis_client import RedisClient
+        
+        self.redis_client = RedisClient()
+        self.redis_client.client = fakeredis.FakeRedis(decode_responses=True)
+        # Recent batch times, so bucket windows have not expired yet
+        self.base = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=1)
+        self.batches = [
+            (self.base, pd.DataFrame({'feature_1': [1.0, 2.0]}), ['1', '2']),
+            (self.base + timedelta(hours=2), pd.DataFrame({'feature_1': [10.0, 30.0]}), ['1', '3'])
+        ]
+        self.events = pd.DataFrame({
+            'user_id': [1, 1, 2, 3, 1],
+            'event_timestamp': [self.base + timedelta(hours=h) for h in (1, 3, 3, 1, -1)],
+            'label': [0, 1, 0, 1, 0]
+        })
+    
+    def _store(self, layout):
+        with patch('src.utils.config.Config.FEATURE_LAYOUT', layout), \
+                patch('src.utils.config.Config.FEATURE_TTL', 7 * 24 * 3600):
+            for when, df, ids in self.batches:
+                self.redis_client.store_feature_batch(df, when.isoformat(), entity_ids=ids)
+    
+    def test_as_of_join_for_both_layouts(self):
+        from data.point_in_time import build_training_set
+        
+        for layout in ('keys', 'buckets'):
+            with self.subTest(layout=layout):
+                self.redis_client.client.flushall()
+                self._store(layout)
+                result = build_training_set(self.events, 'user_id', redis_client=self.redis_client, layout=layout)
+                
+                self.assertEqual(result['label'].tolist(), self.events['label'].tolist())
+                # Entity 1 sees the first snapshot at +1h and the second at +3h; entity 3
+                # only exists from +2h on and nothing exists before the first batch
+                np.testing.assert_array_equal(result['feature_1'].to_numpy(),
+                                              [1.0, 10.0, 2.0, np.nan, np.nan])
+                self.assertEqual(result['feature_timestamp'].iloc[1], pd.Timestamp(self.batches[1][0]))
+    
+    def test_max_age_drops_stale_snapshots(self):
+        from data.point_in_time import build_training_set
+        
+        self._store('keys')
+        result = build_training_set(self.events, 'user_id', max_age='30min', redis_client=self.redis_client,
+                                    layout='keys')
+        self.assertTrue(result['feature_1'].isna().all())
+    
+    def test_parquet_export_matches_live_store(self):
+        from data.point_in_time import build_training_set, export_feature_store, read_feature_export
+        
+        self._store('buckets')
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        
+        stats = export_feature_store(tmp.name, redis_client=self.redis_client, layout='buckets', workers=2)
+        self.assertEqual(stats['batches'], 2)
+        self.assertEqual(stats['rows'], 4)
+        
+        offline = build_training_set(self.events, 'user_id', history=read_feature_export(tmp.name))
+        online = build_training_set(self.events, 'user_id', redis_client=self.redis_client, layout='buckets')
+        pd.testing.assert_frame_equal(offline, online, check_dtype=False)
+
+class TestPartitionedPipeline(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = patch('src.utils.config.Config.ARTIFACT_ROOT', tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        rng = np.random.default_rng(0)
+        self.raw = pd.DataFrame({
+            'user_id': np.repeat(np.arange(50), 4),
+            'feature_1': rng.normal(10, 2, 200),
+            'category': rng.choice(['a', 'b', 'c', 'd'], 200),
+            'updated_at': pd.date_range('2024-01-01', periods=200, freq='min').astype(str)
+        })
+    
+    def test_key_partitions_are_disjoint_and_complete(self):
+        from data.partitioning import partition_frame
+        
+        parts = partition_frame(self.raw, 4, key='user_id')
+        self.assertLessEqual(len(parts), 4)
+        self.assertEqual(sum(len(p) for p in parts), len(self.raw))
+        owners = [set(p['user_id']) for p in parts]
+        for i, left in enumerate(owners):
+            for right in owners[i + 1:]:
+                # Every row of an entity lands in the same partition
+                self.assertFalse(left & right)
+        
+        by_time = partition_frame(self.raw.sample(frac=1, random_state=0), 4, time_column='updated_at')
+        self.assertEqual(len(by_time), 4)
+        self.assertLess(by_time[0]['updated_at'].max(), by_time[1]['updated_at'].min())
+    
+    def test_merged_statistics_match_a_single_fit(self):
+        from src.data.artifacts import read_artifact, read_state, write_artifact
+        from data.partitioning import fit_partition, merge_partition_states, split_into_partitions, transform_partition
+        
+        raw_ref = write_artifact(self.raw, 'raw', 'run-1', {'timestamp': '2024-01-01T00:00:00'})
+        splits = split_into_partitions(raw_ref, 'run-1', partitions=4, key='user_id')
+        state_refs = [fit_partition(s['raw_ref'], s['index'], 'run-1') for s in splits]
+        merged = read_state(merge_partition_states(state_refs, 'run-1'))
+        single = StreamingTransformer().partial_fit(self.raw)
+        
+        self.assertEqual(sorted(merged.categories_['category']), sorted(single.categories_['category']))
+        # Category codes follow first appearance, so only the numeric inputs' moments are comparable
+        numeric = [merged.scaled_columns_.index(col) for col in ('user_id', 'feature_1')]
+        np.testing.assert_allclose(merged.scaler.mean_[numeric], single.scaler.mean_[numeric])
+        np.testing.assert_allclose(merged.scaler.var_[numeric], single.scaler.var_[numeric])
+        
+        transformer_ref = merge_partition_states(state_refs, 'run-1')
+        outputs = [transform_partition(s['raw_ref'], s['index'], 'run-1', transformer_ref, incremental=True)
+                   for s in splits]
+        self.assertEqual(sum(o['features_ref']['rows'] for o in outputs), len(self.raw))
+        keys = read_artifact(outputs[0]['features_ref']['keys'])
+        self.assertEqual(len(keys), outputs[0]['features_ref']['rows'])
+    
+    def test_categorical_scaling_matches_a_single_pass(self):
+        from src.data.artifacts import read_artifact, read_state, write_artifact
+        from data.partitioning import (fit_partition, merge_partition_states, merge_scaler_states,
+                                       scale_partition, split_into_partitions, transform_partition)
+        
+        rng = np.random.default_rng(1)
+        # First appearance across partitions matches sorted order, so codes agree with LabelEncoder
+        raw = pd.DataFrame({
+            'feature_1': rng.normal(10, 2, 300),
+            'category': ['a'] * 100 + ['b'] * 100 + ['c'] * 100
+        })
+        raw_ref = write_artifact(raw, 'raw', 'run-1', {'timestamp': '2024-01-01T00:00:00'})
+        splits = split_into_partitions(raw_ref, 'run-1', partitions=3, key='', time_column='')
+        state_refs = [fit_partition(s['raw_ref'], s['index'], 'run-1') for s in splits]
+        transformer_ref = merge_partition_states(state_refs, 'run-1')
+        moment_refs = [scale_partition(s['raw_ref'], s['index'], 'run-1', transformer_ref) for s in splits]
+        transformer_ref = merge_scaler_states(transformer_ref, moment_refs, 'run-1')
+        
+        single = DataTransformer()
+        expected = single.fit_transform(raw.copy())
+        merged = read_state(transformer_ref)
+        np.testing.assert_allclose(merged.scaler.mean_, single.scaler.mean_)
+        np.testing.assert_allclose(merged.scaler.var_, single.scaler.var_)
+        
+        outputs = [transform_partition(s['raw_ref'], s['index'], 'run-1', transformer_ref) for s in splits]
+        result = pd.concat([read_artifact(o['features_ref']) for o in outputs])
+        np.testing.assert_allclose(result['category'].to_numpy(), expected['category'].to_numpy())
+        self.assertAlmostEqual(result['category'].mean(), 0.0)
+    
+    def test_partition_profiles_merge(self):
+        from src.data.artifacts import write_artifact
+        from data.partitioning import merge_profiles, profile_partition, split_into_partitions
+        from data.profiling import profile_frame
+        
+        raw_ref = write_artifact(self.raw, 'raw', 'run-1', {'timestamp': '2024-01-01T00:00:00'})
+        splits = split_into_partitions(raw_ref, 'run-1', partitions=3, key='')
+        merged = merge_profiles(profile_partition(s['raw_ref'], s['index'], 'run-1') for s in splits)
+        
+        merged, single = merged.summary(), profile_frame(self.raw).summary()
+        self.assertEqual(merged['row_count'], single['row_count'])
+        for stat in ('count', 'null_rate', 'min', 'max'):
+            self.assertEqual(merged['columns']['feature_1'][stat], single['columns']['feature_1'][stat])
+        self.assertAlmostEqual(merged['columns']['feature_1']['mean'], single['columns']['feature_1']['mean'])
+        self.assertEqual(merged['columns']['category']['histogram'], single['columns']['category']['histogram'])
+
 class TestDataTransformation(unittest.TestCase):
     def setUp(self):
         self.transformer = DataTransformer()
@@ -110,6 +729,206 @@ class TestDataTransformation(unittest.TestCase):
         self.assertIn('timestamp', result)
         self.assertIsInstance(result['features'], list)
 
+class TestFittedTransformer(unittest.TestCase):
+    def setUp(self):
+        self.train = pd.DataFrame({
+            'user_id': [1, 2, 3, 4],
+            'plan': ['basic', 'pro', None, 'basic'],
+            'amount': [10.0, None, 30.0, 40.0],
+            'timestamp': ['2024-01-01 10:30:00', '2024-01-02 15:45:00',
+                          '2024-01-03 08:00:00', '2024-01-04 23:10:00']
+        })
+        self.transformer = DataTransformer()
+        self.fitted = self.transformer.fit_transform(self.train.copy())
+
+    def test_transform_reuses_fitted_encodings(self):
+        batch = pd.DataFrame({
+            'user_id': [5],
+            'plan': ['pro'],
+            'amount': [20.0],
+            'timestamp': ['2024-01-05 12:00:00']
+        })
+
+        transformed = self.transformer.transform(batch.copy())
+
+        # 'pro' keeps the code it was fitted with rather than being re-encoded as 0
+        expected_code = self.transformer.categories_['plan'].index('pro')
+        plan_position = self.transformer.scaled_columns_.index('plan')
+        raw_code = transformed['plan'].iloc[0] * self.transformer.scaler.scale_[plan_position] \
+            + self.transformer.scaler.mean_[plan_position]
+        self.assertAlmostEqual(raw_code, expected_code)
+
+    def test_transform_unseen_category(self):
+        batch = self.train.iloc[:1].copy()
+        batch['plan'] = 'enterprise'
+
+        transformed = self.transformer.transform(batch)
+
+        self.assertFalse(transformed.isnull().any().any())
+
+    def test_transform_requires_fit(self):
+        with self.assertRaises(ValueError):
+            DataTransformer().transform(self.train.copy())
+
+    def test_feature_transform_matches_batch_transform(self):
+        compiled = FeatureTransform.from_transformer(self.transformer)
+        records = self.train.to_dict('records')
+        expected = self.transformer.transform(self.train.copy())[compiled.feature_names].values
+
+        batch = compiled.transform_batch(records)
+        rows = [compiled.transform_row(record)[0] for record in records]
+
+        np.testing.assert_allclose(batch, expected)
+        np.testing.assert_allclose(rows, expected)
+
+    def test_transform_data_with_fitted_transformer(self):
+        raw_data = {
+            'api_data': self.train.to_dict('records'),
+            'timestamp': '2024-01-05T00:00:00'
+        }
+
+        result = transform_data(raw_data, transformer=self.transformer)
+
+        np.testing.assert_allclose(pd.DataFrame(result['features']).values, self.fitted.values)
+
+class TestSketches(unittest.TestCase):
+    def test_quantile_sketch_accuracy(self):
+        values = np.random.default_rng(0).normal(50, 10, 100000)
+        sketch = QuantileSketch(compression=100)
+        for chunk in np.array_split(values, 20):
+            sketch.update(chunk)
+
+        self.assertLess(len(sketch.means), 250)
+        np.testing.assert_allclose(sketch.quantile([0.01, 0.5, 0.99]),
+                                   np.quantile(values, [0.01, 0.5, 0.99]), rtol=0.01)
+        self.assertAlmostEqual(sketch.cdf(50.0), 0.5, delta=0.01)
+
+    def test_quantile_sketch_merge_and_roundtrip(self):
+        left = QuantileSketch().update(np.arange(0, 500))
+        right = QuantileSketch().update(np.arange(500, 1000))
+
+        merged = QuantileSketch.from_dict(left.merge(right).to_dict())
+
+        self.assertEqual(merged.count, 1000)
+        self.assertAlmostEqual(merged.quantile(0.5), 499.5, delta=5)
+
+    def test_category_counter(self):
+        counter = CategoryCounter(max_categories=2)
+        counter.update(['b', 'a', 'b', None])
+        counter.update(['c', 'a', 'a'])
+
+        self.assertEqual(counter.vocabulary, ['b', 'a'])
+        self.assertEqual(counter.mode(), 'a')
+
+    def test_hyperloglog_accuracy_and_merge(self):
+        left = HyperLogLog().update(np.arange(0, 60000))
+        right = HyperLogLog().update(np.arange(40000, 100000))
+
+        self.assertAlmostEqual(left.estimate(), 60000, delta=60000 * 0.05)
+        merged = HyperLogLog.from_dict(left.merge(right).to_dict())
+        self.assertAlmostEqual(merged.estimate(), 100000, delta=100000 * 0.05)
+        self.assertEqual(round(HyperLogLog().update(['a', 'b', 'a', None]).estimate()), 2)
+
+class TestStreamingTransformation(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            'user_id': np.arange(1000),
+            'amount': rng.normal(100, 20, 1000),
+            'plan': rng.choice(['basic', 'pro', 'team'], 1000)
+        })
+
+    def test_streaming_scaler_matches_batch_statistics(self):
+        transformer = StreamingTransformer()
+        for chunk in iter_chunks(self.df, 100):
+            transformer.partial_fit(chunk)
+
+        batch = DataTransformer()
+        batch.fit_transform(self.df.copy())
+
+        amount = transformer.scaled_columns_.index('amount')
+        self.assertAlmostEqual(transformer.scaler.mean_[amount], batch.scaler.mean_[amount])
+        self.assertAlmostEqual(transformer.scaler.scale_[amount], batch.scaler.scale_[amount])
+        self.assertEqual(sorted(transformer.categories_['plan']), batch.categories_['plan'])
+
+    def test_transform_data_streaming_yields_bounded_chunks(self):
+        chunks = list(transform_data_streaming(lambda: iter_chunks(self.df, 250)))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [250] * 4)
+        result = pd.concat(chunks)
+        self.assertAlmostEqual(result['amount'].mean(), 0.0, places=6)
+        self.assertFalse(result.isnull().any().any())
+
+    def test_merge_partitions(self):
+        left, right = StreamingTransformer(), StreamingTransformer()
+        left.partial_fit(self.df.iloc[:500].copy())
+        right.partial_fit(self.df.iloc[500:].copy())
+
+        merged = left.merge(right)
+
+        amount = merged.scaled_columns_.index('amount')
+        self.assertAlmostEqual(merged.scaler.mean_[amount], self.df['amount'].mean())
+        self.assertEqual(merged.scaler.n_samples_seen_, 1000)
+
+class TestVectorizedTransformer(unittest.TestCase):
+    def test_matches_reference_implementation(self):
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+        from benchmarks.transform_bench import run_benchmark
+
+        report = run_benchmark(rows=2000, numeric=3, categorical=3, cardinality=7, null_rate=0.1)
+
+        self.assertTrue(report['equivalent_output'])
+        self.assertIn('encode_categorical', report['stages'])
+
+class TestEtlBenchmark(unittest.TestCase):
+    def setUp(self):
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+    def test_generator_is_deterministic(self):
+        from benchmarks.datagen import make_frame, parse_size
+
+        first = make_frame(1000, numeric=3, categorical=2, cardinality=5, null_rate=0.2, seed=1)
+
+        pd.testing.assert_frame_equal(first, make_frame(1000, numeric=3, categorical=2, cardinality=5,
+                                                        null_rate=0.2, seed=1))
+        self.assertTrue(first['user_id'].is_unique)
+        self.assertLessEqual(first['category_1'].nunique(), 5)
+        self.assertAlmostEqual(first['feature_1'].isnull().mean(), 0.2, delta=0.05)
+        self.assertEqual([parse_size(size) for size in ('10k', '1M', '2500')], [10000, 1000000, 2500])
+
+    def test_every_stage_is_measured(self):
+        from benchmarks.etl_bench import STAGES, run_benchmark
+
+        report = run_benchmark([500], numeric=2, categorical=1, page_size=200)
+
+        run = report['sizes']['500']
+        self.assertTrue(run['validation_success'])
+        self.assertEqual(list(run['stages']), list(STAGES))
+        for measured in run['stages'].values():
+            self.assertGreater(measured['seconds'], 0)
+            self.assertGreaterEqual(measured['peak_mb'], 0)
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        from benchmarks.etl_bench import compare
+
+        baseline = {'sizes': {'1000': {'stages': {
+            'transform_data': {'seconds': 1.0, 'peak_mb': 100.0},
+            'validate_data': {'seconds': 1.0, 'peak_mb': 100.0}
+        }}}}
+        report = {'sizes': {
+            '1000': {'stages': {
+                'transform_data': {'seconds': 1.4, 'peak_mb': 130.0},
+                'validate_data': {'seconds': 2.0, 'peak_mb': 90.0}
+            }},
+            # No baseline for this size
+            '5000': {'stages': {'transform_data': {'seconds': 9.0, 'peak_mb': 900.0}}}
+        }}
+
+        regressions = compare(report, baseline, time_tolerance=0.5, memory_tolerance=0.2)
+
+        self.assertEqual([(r['stage'], r['metric']) for r in regressions],
+                         [('transform_data', 'peak_mb'), ('validate_data', 'seconds')])
+
 class TestDataValidation(unittest.TestCase):
     def setUp(self):
         self.validator = DataValidator()
@@ -0,0 +1,434 @@
+import unittest
+from unittest.mock import Mock, patch
+import io
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LinearRegression
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from api.main import app
+from api.codecs import decode_feature_matrix
+from models.inference import InferenceEngine
+# main.py maps the src.utils.redis_client class to 404
+from src.utils.redis_client import ModelNotFoundError
+
+
+def _fit_model(with_names: bool = True):
+    X = pd.DataFrame({'feature_1': [1.0, 2.0, 3.0, 4.0], 'feature_2': [0.0, 1.0, 0.0, 1.0]})
+    y = X['feature_1'] * 2 + X['feature_2']
+    return LinearRegression().fit(X if with_names else X.values, y)
+
+
+def _npy_bytes(array: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def _arrow_bytes(df: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class TestFeatureMatrixCodecs(unittest.TestCase):
+    def test_decode_npy(self):
+        array = np.arange(6, dtype=np.float64).reshape(3, 2)
+
+        matrix, columns = decode_feature_matrix(_npy_bytes(array), "application/x-npy")
+
+        np.testing.assert_array_equal(matrix, array)
+        self.assertIsNone(columns)
+        # Decoded without copying the payload
+        self.assertFalse(matrix.flags.owndata)
+
+    def test_decode_arrow(self):
+        df = pd.DataFrame({'feature_1': [1.0, 2.0], 'feature_2': [3.0, 4.0]})
+
+        matrix, columns = decode_feature_matrix(_arrow_bytes(df), "application/vnd.apache.arrow.stream")
+
+        np.testing.assert_array_equal(matrix, df.values)
+        self.assertEqual(columns, ['feature_1', 'feature_2'])
+
+    def test_decode_csv(self):
+        body = b"feature_1,feature_2\n1.5,2\n3.5,4\n"
+
+        matrix, columns = decode_feature_matrix(body, "text/csv; charset=utf-8")
+
+        np.testing.assert_array_equal(matrix, [[1.5, 2.0], [3.5, 4.0]])
+        self.assertEqual(columns, ['feature_1', 'feature_2'])
+
+    def test_decode_arrow_fixed_size_list_rejects_nulls(self):
+        values = pa.array([[1.0, 2.0], [3.0, None]], type=pa.list_(pa.float64(), 2))
+        table = pa.table({'features': values})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        with self.assertRaises(ValueError):
+            decode_feature_matrix(sink.getvalue().to_pybytes(), "application/vnd.apache.arrow.stream")
+
+    def test_decode_unsupported_content_type(self):
+        with self.assertRaises(ValueError):
+            decode_feature_matrix(b"{}", "application/json")
+
+
+class TestPredictMatrix(unittest.TestCase):
+    def setUp(self):
+        self.model = _fit_model()
+        self.model_manager = Mock()
+        self.model_manager.load_model.return_value = self.model
+        self.engine = InferenceEngine(Mock(), self.model_manager)
+
+    def test_predict_matrix_chunks(self):
+        matrix = np.array([[1.0, 0.0], [2.0, 1.0], [3.0, 0.0]])
+
+        chunks = list(self.engine.predict_matrix(matrix, chunk_size=2))
+
+        self.assertEqual([chunk['offset'] for chunk in chunks], [0, 2])
+        predictions = sum((chunk['predictions'] for chunk in chunks), [])
+        np.testing.assert_allclose(predictions, [2.0, 5.0, 6.0])
+
+    def test_predict_matrix_reorders_named_columns(self):
+        matrix = np.array([[1.0, 3.0]])
+
+        chunks = list(self.engine.predict_matrix(matrix, columns=['feature_2', 'feature_1']))
+
+        np.testing.assert_allclose(chunks[0]['predictions'], [7.0])
+
+    def test_predict_matrix_missing_feature(self):
+        with self.assertRaises(ValueError):
+            self.engine.predict_matrix(np.ones((2, 2)), columns=['feature_1', 'other'])
+
+    def test_predict_matrix_wrong_width(self):
+        with self.assertRaises(ValueError):
+            self.engine.predict_matrix(np.ones((2, 3)))
+
+
+class _ConstantModel:
+    def __init__(self, value, delay=0.0):
+        self.value = value
+        self.delay = delay
+
+    def predict(self, X):
+        if self.delay:
+            time.sleep(self.delay)
+        return np.full(len(X), self.value)
+
+
+class TestEnsemblePredict(unittest.TestCase):
+    def setUp(self):
+        self.models = {
+            'a': _ConstantModel(1.0),
+            'b': _ConstantModel(3.0),
+            'c': _ConstantModel(3.0),
+            'slow': _ConstantModel(9.0, delay=0.5),
+        }
+        model_manager = Mock()
+        model_manager.load_model.side_effect = lambda name, version: self.models[name]
+        model_manager.load_transformer.return_value = None
+        self.model_manager = model_manager
+        self.engine = InferenceEngine(Mock(), model_manager)
+        self.features = {'feature_1': 1.0, 'feature_2': 0.0}
+
+    def test_mean_and_weighted(self):
+        members = [{'model_name': 'a', 'weight': 3.0}, {'model_name': 'b', 'weight': 1.0}]
+
+        mean = self.engine.ensemble_predict(self.features, members, strategy='mean')
+        weighted = self.engine.ensemble_predict(self.features, members, strategy='weighted')
+
+        self.assertEqual(mean['prediction'], [2.0])
+        self.assertEqual(weighted['prediction'], [1.5])
+        self.assertFalse(mean['partial'])
+
+    def test_vote(self):
+        members = [{'model_name': name} for name in ('a', 'b', 'c')]
+
+        result = self.engine.ensemble_predict(self.features, members, strategy='vote')
+
+        self.assertEqual(result['prediction'], [3.0])
+
+    def test_slow_member_returns_partial_result(self):
+        members = [{'model_name': 'a'}, {'model_name': 'slow', 'timeout': 0.05}]
+
+        result = self.engine.ensemble_predict(self.features, members, strategy='mean', timeout=1.0)
+
+        self.assertTrue(result['partial'])
+        self.assertEqual(result['prediction'], [1.0])
+        statuses = {member['model_name']: member['status'] for member in result['members']}
+        self.assertEqual(statuses, {'a': 'ok', 'slow': 'timeout'})
+
+    def test_members_apply_their_registered_transform(self):
+        self.models['first'] = Mock(predict=lambda X: X[:, 0])
+        self.models['scaled'] = Mock(predict=lambda X: X[:, 0])
+        transform = Mock()
+        transform.transform_row.return_value = np.array([[10.0, 0.0]])
+        self.model_manager.load_transformer.side_effect = (
+            lambda name, version: transform if name == 'scaled' else None
+        )
+
+        result = self.engine.ensemble_predict(self.features, [{'model_name': 'first'}, {'model_name': 'scaled'}])
+
+        self.assertEqual([member['prediction'] for member in result['members']], [[1.0], [10.0]])
+        transform.transform_row.assert_called_once_with(self.features)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            self.engine.ensemble_predict(self.features, [{'model_name': 'a'}], strategy='median')
+
+    def test_ensemble_endpoint(self):
+        request_data = {
+            "features": self.features,
+            "models": [{"model_name": "a"}, {"model_name": "b"}],
+            "strategy": "mean"
+        }
+
+        with patch('api.main.inference_engine', self.engine):
+            response = TestClient(app).post("/predict/ensemble", json=request_data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['prediction'], [2.0])
+        self.assertEqual(len(response.json()['members']), 2)
+
+
+class TestTransformerRegistry(unittest.TestCase):
+    def setUp(self):
+        import fakeredis
+        from src.utils.redis_client import RedisClient
+        from src.models.model_manager import ModelManager
+        from src.data.transformation import DataTransformer
+
+        server = fakeredis.FakeServer()
+        self.redis_client = RedisClient()
+        self.redis_client.client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        self.redis_client.binary_client = fakeredis.FakeRedis(server=server, decode_responses=False)
+        self.model_manager = ModelManager(self.redis_client)
+
+        raw = pd.DataFrame({'feature_1': [1.0, 2.0, 3.0], 'feature_2': ['a', 'b', 'a']})
+        self.transformer = DataTransformer()
+        X = self.transformer.fit_transform(raw.copy())
+        self.redis_client.store_model("default", LinearRegression().fit(X.values, [1.0, 2.0, 3.0]), version="v1")
+
+    def test_unregistered_model_has_no_transform(self):
+        self.assertIsNone(self.model_manager.load_transformer("default"))
+
+    def test_version_promoted_elsewhere_brings_its_transform(self):
+        from src.models.model_manager import ModelManager
+
+        self.assertIsNone(self.model_manager.load_transformer("default"))
+        # Another process publishes v2 with a transformer and promotes it
+        other = ModelManager(self.redis_client)
+        other.register_transformer("default", self.transformer, version="v2")
+        self.redis_client.store_model("default", LinearRegression(), version="v2")
+
+        self.assertIsNotNone(self.model_manager.load_transformer("default"))
+        self.assertIsNone(self.model_manager.load_transformer("default", "v1"))
+
+    def test_predict_applies_registered_transform(self):
+        self.model_manager.register_transformer("default", self.transformer, version="v1")
+        engine = InferenceEngine(self.redis_client, self.model_manager)
+
+        result = engine.predict({'feature_1': 2.0, 'feature_2': 'b'})
+
+        self.assertAlmostEqual(result['prediction'][0], 2.0)
+
+
+class TestEntityPredict(unittest.TestCase):
+    def setUp(self):
+        import fakeredis
+        from src.utils.redis_client import RedisClient
+
+        self.redis_client = RedisClient()
+        self.redis_client.client = fakeredis.FakeRedis(decode_responses=True)
+        features = pd.DataFrame({'feature_2': [0.0, 1.0, 1.0], 'feature_1': [1.0, 2.0, 3.0]})
+        self.redis_client.store_feature_batch(features, '2024-01-01T10:00:00', entity_ids=[7, 8, 7])
+        model_manager = Mock()
+        model_manager.load_model.return_value = _fit_model()
+        self.engine = InferenceEngine(self.redis_client, model_manager)
+
+    def test_newest_row_per_entity_is_scored(self):
+        result = self.engine.predict_entities(['7', '8', '9'])
+
+        # Entity 7 appears twice in the batch; its last row is the newest
+        self.assertEqual([p['entity_id'] for p in result['predictions']], ['7', '8'])
+        np.testing.assert_allclose([p['prediction'] for p in result['predictions']], [7.0, 5.0])
+        self.assertEqual(result['missing'], ['9'])
+
+    def test_entity_endpoint(self):
+        with patch('api.main.inference_engine', self.engine):
+            client = TestClient(app)
+            response = client.post("/predict/entity", json={"entity_ids": [8]})
+            unknown = client.post("/predict/entity", json={"entity_ids": ["nobody"]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertAlmostEqual(response.json()['predictions'][0]['prediction'], 5.0)
+        self.assertEqual(unknown.status_code, 404)
+
+
+class TestPrecomputedPredictions(unittest.TestCase):
+    def setUp(self):
+        import fakeredis
+        from src.utils.redis_client import RedisClient
+        from src.models.model_manager import ModelManager
+
+        server = fakeredis.FakeServer()
+        self.redis_client = RedisClient()
+        self.redis_client.client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        self.redis_client.binary_client = fakeredis.FakeRedis(server=server, decode_responses=False)
+        self.redis_client.store_model("default", _fit_model(), version="v1")
+        self.features = pd.DataFrame({'feature_1': [1.0, 2.0, 3.0], 'feature_2': [0.0, 1.0, 0.0]})
+        self.redis_client.store_feature_batch(self.features, '2024-01-01T10:00:00')
+        self.engine = InferenceEngine(self.redis_client, ModelManager(self.redis_client))
+        self.ids = [f'2024-01-01T10:00:00:{i}' for i in range(3)]
+
+    def test_precompute_stores_predictions_per_version(self):
+        result = self.engine.precompute_predictions(self.features, '2024-01-01T10:00:00')
+
+        self.assertEqual(result, {"rows": 3, "model_name": "default", "model_version": "v1"})
+        np.testing.assert_allclose(self.redis_client.get_predictions("default", "v1", self.ids), [2.0, 5.0, 6.0])
+        self.assertGreater(self.redis_client.client.ttl(f"pred:default:v1:{self.ids[0]}"), 0)
+
+    @patch('src.utils.config.Config.PRECOMPUTE_PREDICTIONS', True)
+    def test_batch_predict_serves_stored_predictions_and_scores_the_rest(self):
+        self.engine.precompute_predictions(self.features, '2024-01-01T10:00:00')
+        # Marker values show which results came from the store
+        self.redis_client.client.set(f"pred:default:v1:{self.ids[0]}", json.dumps(42.0))
+        self.redis_client.client.delete(f"pred:default:v1:{self.ids[2]}")
+
+        results = self.engine.batch_predict(self.ids + ['2024-01-01T10:00:00:9'])
+
+        self.assertEqual([r['feature_id'] for r in results], self.ids)
+        np.testing.assert_allclose([r['prediction'] for r in results], [42.0, 5.0, 6.0])
+
+    @patch('src.utils.config.Config.PRECOMPUTE_PREDICTIONS', True)
+    def test_new_model_version_is_scored_live(self):
+        self.engine.precompute_predictions(self.features, '2024-01-01T10:00:00')
+        self.redis_client.client.set(f"pred:default:v1:{self.ids[0]}", json.dumps(42.0))
+        self.redis_client.store_model("default", _fit_model(), version="v2")
+
+        results = self.engine.batch_predict(self.ids[:1])
+
+        self.assertAlmostEqual(results[0]['prediction'], 2.0)
+
+
+class _RecordingModel:
+    """Returns the first column and records each call's thread and size"""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, X):
+        self.calls.append((threading.current_thread().name, len(X)))
+        return X[:, 0] * 2
+
+
+class TestChunkedScoring(unittest.TestCase):
+    def setUp(self):
+        self.engine = InferenceEngine(Mock(), Mock())
+        self.engine.config.SCORING_WORKERS = 4
+
+    def test_large_matrix_is_scored_in_order_on_the_pool(self):
+        model = _RecordingModel()
+        matrix = np.arange(20000, dtype=float).reshape(-1, 1)
+
+        predictions = self.engine.score_matrix(model, matrix, "m:v1")
+
+        np.testing.assert_array_equal(predictions, matrix[:, 0] * 2)
+        self.assertGreaterEqual(len(model.calls), 4)
+        self.assertTrue(all(name.startswith("scoring") for name, _ in model.calls))
+        self.assertEqual(sum(rows for _, rows in model.calls), 20000)
+
+    def test_small_matrix_is_scored_inline(self):
+        model = _RecordingModel()
+
+        self.engine.score_matrix(model, np.ones((10, 1)), "m:v1")
+
+        self.assertEqual(model.calls, [(threading.current_thread().name, 10)])
+
+    def test_tuner_targets_chunk_latency(self):
+        from models.inference import ChunkSizeTuner
+
+        tuner = ChunkSizeTuner(target_seconds=0.02, initial_rows=1024, min_rows=256, max_rows=65536)
+        self.assertEqual(tuner.chunk_size("fast"), 1024)
+        tuner.observe("fast", 10000, 0.002)   # 0.2us/row -> 100k rows, capped
+        tuner.observe("slow", 1000, 0.2)      # 200us/row -> 100 rows, floored
+        tuner.observe("medium", 1000, 0.004)  # 4us/row -> 5000 rows
+
+        self.assertEqual(tuner.chunk_size("fast"), 65536)
+        self.assertEqual(tuner.chunk_size("slow"), 256)
+        self.assertEqual(tuner.chunk_size("medium"), 5000)
+
+    def test_batch_predict_uses_chunked_scoring(self):
+        rows = [{'feature_1': float(i), 'feature_2': 0.0} for i in range(5000)]
+        redis_client = Mock()
+        redis_client.get_features_by_ids.return_value = rows
+        model_manager = Mock()
+        model_manager.load_model.return_value = _fit_model()
+        engine = InferenceEngine(redis_client, model_manager)
+        engine.config.SCORING_WORKERS = 4
+
+        results = engine.batch_predict([f"t:{i}" for i in range(5000)])
+
+        self.assertEqual(results[4999]['feature_id'], "t:4999")
+        self.assertAlmostEqual(results[4999]['prediction'], 9998.0)
+
+
+class TestBulkPredictAPI(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        model_manager = Mock()
+        model_manager.load_model.return_value = _fit_model(with_names=False)
+        self.engine = InferenceEngine(Mock(), model_manager)
+
+    def test_bulk_predict_npy(self):
+        body = _npy_bytes(np.array([[1.0, 0.0], [2.0, 1.0], [3.0, 0.0]]))
+
+        with patch('api.main.inference_engine', self.engine):
+            response = self.client.post(
+                "/predict/bulk?chunk_size=2",
+                content=body,
+                headers={"content-type": "application/x-npy"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1]['offset'], 2)
+
+    def test_bulk_predict_bad_payload(self):
+        with patch('api.main.inference_engine', self.engine):
+            response = self.client.post(
+                "/predict/bulk",
+                content=b"not a matrix",
+                headers={"content-type": "application/x-npy"}
+            )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_predict_unknown_model(self):
+        model_manager = Mock()
+        model_manager.load_model.side_effect = ModelNotFoundError("No model found for nope")
+        engine = InferenceEngine(Mock(), model_manager)
+
+        with patch('api.main.inference_engine', engine):
+            response = self.client.post(
+                "/predict/bulk?model_name=nope",
+                content=_npy_bytes(np.ones((1, 2))),
+                headers={"content-type": "application/x-npy"}
+            )
+
+        self.assertEqual(response.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
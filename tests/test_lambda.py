@@ -0,0 +1,137 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add lambda to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda'))
+
+import data_processor
+
+class TestLambdaProcessor(unittest.TestCase):
+    def setUp(self):
+        data_processor._s3_client = None
+        self.addCleanup(setattr, data_processor, '_s3_client', None)
+
+    @patch('boto3.client')
+    def test_s3_client_reused_across_invocations(self, mock_client):
+        mock_client.return_value = MagicMock()
+        event = {
+            'features': [{'feature_1': 1.0}, {'feature_1': 2.0}],
+            'timestamp': '2024-01-01T10:00:00'
+        }
+
+        first = data_processor.lambda_handler(event, None)
+        second = data_processor.lambda_handler(event, None)
+
+        self.assertEqual(first['statusCode'], 200)
+        self.assertEqual(second['statusCode'], 200)
+        mock_client.assert_called_once_with('s3')
+        self.assertEqual(mock_client.return_value.put_object.call_count, 2)
+
+    def test_process_data_rolling_mean(self):
+        result = data_processor.process_data({
+            'features': [{'value': 1.0}, {'value': 3.0}],
+            'timestamp': '2024-01-01T10:00:00'
+        })
+
+        self.assertIn('value_rolling_mean', result['feature_names'])
+        self.assertEqual(result['features'][1]['value_rolling_mean'], 2.0)
+
+    def test_artifact_reference_event(self):
+        import boto3
+        import pyarrow as pa
+        from moto import mock_aws
+
+        table = pa.table({'value': [1.0, 3.0, 5.0]})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        with mock_aws():
+            client = boto3.client('s3', region_name='us-east-1')
+            for bucket in ('artifacts', 'ml-pipeline-processed-data'):
+                client.create_bucket(Bucket=bucket)
+            client.put_object(Bucket='artifacts', Key='run/features.arrow', Body=sink.getvalue().to_pybytes())
+            data_processor._s3_client = client
+
+            response = data_processor.lambda_handler({
+                'uri': 's3://artifacts/run/features.arrow',
+                'format': 'arrow',
+                'timestamp': '2024-01-01T10:00:00'
+            }, None)
+
+        self.assertEqual(response['statusCode'], 200, response['body'])
+        self.assertIn('"processed_records": 3', response['body'])
+
+    def _stream_fixture(self, client, table, key='run/features.arrow'):
+        import pyarrow as pa
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=7)
+        for bucket in ('artifacts', 'ml-pipeline-processed-data'):
+            client.create_bucket(Bucket=bucket)
+        client.put_object(Bucket='artifacts', Key=key, Body=sink.getvalue().to_pybytes())
+        data_processor._s3_client = client
+        return f's3://artifacts/{key}'
+
+    def test_stream_matches_in_memory_processing(self):
+        import boto3
+        import numpy as np
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from moto import mock_aws
+
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({'a': rng.normal(size=50), 'b': np.arange(50), 'label': ['x'] * 50})
+        expected = pd.DataFrame(data_processor.process_data({'features': df.to_dict('records')})['features'])
+
+        with mock_aws():
+            client = boto3.client('s3', region_name='us-east-1')
+            uri = self._stream_fixture(client, pa.Table.from_pandas(df))
+            # Chunks of 2 rows are shorter than the window, so the carried tail spans chunks
+            result = data_processor.process_stream({'uri': uri, 'timestamp': 't1'}, window=3, chunk_rows=2)
+            body = client.get_object(Bucket='ml-pipeline-processed-data', Key='processed/t1.parquet')['Body'].read()
+
+        self.assertEqual(result['rows'], 50)
+        self.assertEqual(result['uri'], 's3://ml-pipeline-processed-data/processed/t1.parquet')
+        parquet = pq.ParquetFile(pa.BufferReader(body))
+        self.assertEqual(parquet.metadata.row_group(0).column(0).compression, 'ZSTD')
+        pd.testing.assert_frame_equal(parquet.read().to_pandas(), expected, check_dtype=False)
+
+    def test_stream_failure_aborts_upload(self):
+        import boto3
+        import pyarrow as pa
+        from moto import mock_aws
+
+        with mock_aws():
+            client = boto3.client('s3', region_name='us-east-1')
+            uri = self._stream_fixture(client, pa.table({'value': [1.0, 2.0]}))
+            with patch.object(data_processor, 'add_rolling_means', side_effect=RuntimeError('boom')):
+                response = data_processor.lambda_handler({'uri': uri, 'timestamp': 't1'}, None)
+            uploads = client.list_multipart_uploads(Bucket='ml-pipeline-processed-data')
+
+        self.assertEqual(response['statusCode'], 500)
+        self.assertEqual(uploads.get('Uploads', []), [])
+
+    def test_multipart_writer_splits_parts(self):
+        import boto3
+        from moto import mock_aws
+
+        payload = os.urandom(11 * 1024 * 1024)
+        with mock_aws():
+            client = boto3.client('s3', region_name='us-east-1')
+            client.create_bucket(Bucket='out')
+            writer = data_processor.MultipartUploadWriter('out', 'blob', client, part_size=5 * 1024 * 1024)
+            for offset in range(0, len(payload), 1024 * 1024):
+                writer.write(payload[offset:offset + 1024 * 1024])
+            writer.close()
+            stored = client.get_object(Bucket='out', Key='blob')['Body'].read()
+
+        self.assertEqual(len(writer.parts), 3)
+        self.assertEqual(stored, payload)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.loadgen import LoadGenerator, install_fake_redis, make_client, parse_mix, summarize
+
+class TestLoadGenerator(unittest.TestCase):
+    def test_parse_mix(self):
+        mix = parse_mix("predict=3,features=1")
+
+        self.assertEqual(mix, {"predict": 3.0, "features": 1.0})
+
+        with self.assertRaises(ValueError):
+            parse_mix("unknown=1")
+
+    def test_summarize(self):
+        samples = [("predict", 0.010, True), ("predict", 0.020, True), ("batch", 0.030, False)]
+
+        report = summarize(samples, elapsed=1.0)
+
+        self.assertEqual(report["requests"], 3)
+        self.assertAlmostEqual(report["throughput"], 3.0)
+        self.assertAlmostEqual(report["error_rate"], 1 / 3)
+        self.assertAlmostEqual(report["latency_ms"]["p50"], 20.0)
+        self.assertEqual(report["endpoints"]["batch"]["error_rate"], 1.0)
+
+    def test_closed_loop_against_fake_redis(self):
+        # Batch requests draw ids below batch_size * 10, so seed at least that many rows
+        self.addCleanup(install_fake_redis(seed_rows=100))
+
+        async def scenario():
+            async with make_client("inprocess", timeout=10) as client:
+                generator = LoadGenerator(client, parse_mix("predict=1,batch=1,features=1"))
+                return await generator.run_closed_loop(concurrency=2, duration=0.2)
+
+        report = asyncio.run(scenario())
+
+        self.assertGreater(report["requests"], 0)
+        self.assertEqual(report["error_rate"], 0.0)
+        self.assertIn("p999", report["latency_ms"])
+        self.assertIn("batch", report["endpoints"])
+
+if __name__ == '__main__':
+    unittest.main()
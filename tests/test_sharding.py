@@ -0,0 +1,131 @@
+import unittest
+from unittest.mock import patch
+import json
+import sys
+import os
+
+import fakeredis
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.utils.redis_client import RedisClient
+from src.utils.sharding import ConsistentHashRing, ShardedRedis, hash_key, rebalance
+
+NODES = ['redis-a:6379', 'redis-b:6379', 'redis-c:6379']
+
+
+def _servers(nodes):
+    return {node: fakeredis.FakeServer() for node in nodes}
+
+
+def _clients(servers, decode_responses=True):
+    return {node: fakeredis.FakeRedis(server=server, decode_responses=decode_responses)
+            for node, server in servers.items()}
+
+
+class TestConsistentHashRing(unittest.TestCase):
+    def test_keys_spread_and_move_minimally(self):
+        keys = [f"entity:{i}" for i in range(6000)]
+        ring = ConsistentHashRing(NODES)
+        owners = [ring.node_for(key) for key in keys]
+        counts = {node: owners.count(node) for node in NODES}
+        for count in counts.values():
+            self.assertGreater(count, 1500)
+
+        grown = ConsistentHashRing(NODES + ['redis-d:6379'])
+        moved = [key for key, owner in zip(keys, owners) if grown.node_for(key) != owner]
+        # Only keys taken over by the new node move, about a quarter of them
+        self.assertTrue(all(grown.node_for(key) == 'redis-d:6379' for key in moved))
+        self.assertLess(len(moved), len(keys) * 0.35)
+
+    def test_hash_tags_colocate(self):
+        ring = ConsistentHashRing(NODES)
+        self.assertEqual(hash_key('features:{2024-01-01}:7'), '2024-01-01')
+        self.assertEqual(hash_key('plain:{}:key'), 'plain:{}:key')
+        owners = {ring.node_for(f"features:{{batch-1}}:{i}") for i in range(50)}
+        self.assertEqual(len(owners), 1)
+
+
+class TestShardedRedis(unittest.TestCase):
+    def setUp(self):
+        self.servers = _servers(NODES)
+        self.sharded = ShardedRedis(_clients(self.servers))
+
+    def test_multi_key_reads_are_grouped_per_shard(self):
+        keys = [f"k{i}" for i in range(30)]
+        for i, key in enumerate(keys):
+            self.sharded.set(key, i)
+
+        per_shard = {node: fakeredis.FakeRedis(server=server).dbsize() for node, server in self.servers.items()}
+        self.assertTrue(all(count > 0 for count in per_shard.values()))
+
+        calls = []
+        for node, client in self.sharded.clients.items():
+            original = client.mget
+            client.mget = lambda keys, original=original, node=node: calls.append(node) or original(keys)
+        values = self.sharded.mget(keys + ['missing'])
+
+        self.assertEqual(values, [str(i) for i in range(30)] + [None])
+        # One MGET per shard, not per key
+        self.assertEqual(sorted(calls), sorted(NODES))
+        self.assertEqual(self.sharded.delete(*keys[:10]), 10)
+        self.assertEqual(self.sharded.exists(*keys), 20)
+        self.assertEqual(len(self.sharded.keys('k*')), 20)
+
+    def test_pipeline_keeps_call_order(self):
+        pipe = self.sharded.pipeline(transaction=False)
+        for i in range(20):
+            pipe.setex(f"p{i}", 100, i)
+        pipe.execute()
+        pipe = self.sharded.pipeline(transaction=False)
+        for i in reversed(range(20)):
+            pipe.get(f"p{i}")
+        self.assertEqual(pipe.execute(), [str(i) for i in reversed(range(20))])
+
+    def test_redis_client_over_shards(self):
+        redis_client = RedisClient()
+        redis_client.client = self.sharded
+        df = pd.DataFrame({'feature_1': np.arange(12, dtype=float)})
+        redis_client.store_feature_frame(df, '2024-01-01T10:00:00')
+
+        ids = ['2024-01-01T10:00:00:3', '2024-01-01T10:00:00:11', '2024-01-01T10:00:00:99']
+        self.assertEqual(redis_client.get_features_by_ids(ids), [{'feature_1': 3.0}, {'feature_1': 11.0}, None])
+        self.assertTrue(redis_client.health_check())
+
+    def test_sharded_connection_from_config(self):
+        with patch('src.utils.config.Config.REDIS_SHARDS', 'localhost:6380, localhost:6381'):
+            client = RedisClient().client
+        self.assertIsInstance(client, ShardedRedis)
+        self.assertEqual(sorted(client.clients), ['localhost:6380', 'localhost:6381'])
+
+
+class TestRebalance(unittest.TestCase):
+    def test_keys_follow_the_new_map(self):
+        new_nodes = NODES + ['redis-d:6379']
+        servers = _servers(new_nodes)
+        old = ShardedRedis(_clients({node: servers[node] for node in NODES}))
+        for i in range(300):
+            old.setex(f"entity:{i}", 1000, json.dumps({'i': i}))
+        old.hset('feature_hashes', mapping={'1': 'abc'})
+
+        dry = rebalance(_clients(servers, decode_responses=False), NODES, new_nodes, dry_run=True)
+        stats = rebalance(_clients(servers, decode_responses=False), NODES, new_nodes, batch_size=16)
+
+        self.assertEqual(stats['scanned'], 301)
+        self.assertEqual(stats['moved'], dry['moved'])
+        self.assertEqual(stats['moved'], stats['targets']['redis-d:6379'])
+        self.assertGreater(stats['moved'], 0)
+
+        new = ShardedRedis(_clients(servers))
+        self.assertEqual(new.dbsize(), 301)
+        values = new.mget([f"entity:{i}" for i in range(300)])
+        self.assertEqual([json.loads(value)['i'] for value in values], list(range(300)))
+        self.assertEqual(new.hgetall('feature_hashes'), {'1': 'abc'})
+        self.assertGreater(new.ttl('entity:0'), 900)
+
+
+if __name__ == '__main__':
+    unittest.main()
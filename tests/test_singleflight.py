@@ -0,0 +1,131 @@
+import unittest
+from unittest.mock import patch
+import pickle
+import threading
+import time
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.utils.singleflight import SingleFlight, SingleFlightTimeout
+
+
+def _run_concurrently(fn, callers):
+    """Start ``callers`` threads on ``fn`` at once; returns results or exceptions in order"""
+    barrier = threading.Barrier(callers)
+    results = [None] * callers
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        group = SingleFlight()
+        executions = []
+
+        def slow_load():
+            executions.append(1)
+            time.sleep(0.1)
+            return object()
+
+        results = _run_concurrently(lambda: group.do('model', slow_load), 8)
+
+        self.assertEqual(len(executions), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        metrics = group.metrics()
+        self.assertEqual(metrics['executions'], 1)
+        self.assertEqual(metrics['deduplicated'], 7)
+        self.assertEqual(metrics['in_flight'], 0)
+
+        # Nothing is cached once the call has finished
+        group.do('model', slow_load)
+        self.assertEqual(len(executions), 2)
+
+    def test_errors_reach_every_waiter(self):
+        group = SingleFlight()
+
+        def failing():
+            time.sleep(0.05)
+            raise ValueError("corrupt model")
+
+        results = _run_concurrently(lambda: group.do('model', failing), 4)
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(group.metrics()['errors'], 1)
+
+    def test_waiter_timeout(self):
+        group = SingleFlight()
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            time.sleep(0.3)
+            return 'model'
+
+        leader = threading.Thread(target=group.do, args=('model', slow))
+        leader.start()
+        started.wait()
+        with self.assertRaises(SingleFlightTimeout):
+            group.do('model', slow, timeout=0.05)
+        leader.join()
+
+        self.assertEqual(group.metrics()['timeouts'], 1)
+        self.assertEqual(group.do('model', lambda: 'reloaded'), 'reloaded')
+
+
+class TestModelManagerLoads(unittest.TestCase):
+    def setUp(self):
+        import fakeredis
+        from src.utils.redis_client import RedisClient
+        from src.models.model_manager import ModelManager
+
+        server = fakeredis.FakeServer()
+        self.redis_client = RedisClient()
+        self.redis_client.client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        self.redis_client.binary_client = fakeredis.FakeRedis(server=server, decode_responses=False)
+        self.redis_client.store_model("default", {'weights': [1.0, 2.0]}, version="v1")
+        self.model_manager = ModelManager(self.redis_client)
+
+    def test_concurrent_misses_load_once(self):
+        unpickles = []
+        real_loads = pickle.loads
+
+        def slow_loads(data):
+            unpickles.append(1)
+            time.sleep(0.1)
+            return real_loads(data)
+
+        with patch('src.utils.redis_client.pickle.loads', side_effect=slow_loads):
+            # "latest" and "v1" resolve to the same version, so they share the load
+            results = _run_concurrently(
+                lambda: self.model_manager.load_model("default", "latest"), 6
+            ) + _run_concurrently(lambda: self.model_manager.load_model("default", "v1"), 2)
+
+        self.assertEqual(len(unpickles), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertGreater(self.model_manager.load_metrics()['deduplicated'], 0)
+
+    def test_missing_model_error_propagates(self):
+        from src.utils.redis_client import ModelNotFoundError
+
+        results = _run_concurrently(lambda: self.model_manager.load_model("default", "v9"), 3)
+
+        self.assertTrue(all(isinstance(result, ModelNotFoundError) for result in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,11 +3,31 @@ import pandas as pd
 import numpy as np
 import sys
 import os
+import json
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from data.validation import DataValidator, validate_data
+from data.validation import DataValidator, validate_data, validate_frame
+from data.rules import GreatExpectationsBackend, RuleEngine, RuleSuite
+from data.profiling import DatasetProfile, ProfileStore, check_batch_drift, compare_profiles, profile_frame
+
+SUITE = {
+    'expectation_suite_name': 'test_suite',
+    'expectations': [
+        {'expectation_type': 'expect_table_row_count_to_be_between', 'kwargs': {'min_value': 1, 'max_value': 10}},
+        {'expectation_type': 'expect_column_values_to_not_be_null', 'kwargs': {'column': 'user_id'}},
+        {'expectation_type': 'expect_column_values_to_be_unique', 'kwargs': {'column': 'user_id'}},
+        {'expectation_type': 'expect_column_values_to_be_between',
+         'kwargs': {'column': 'age', 'min_value': 0, 'max_value': 120}},
+        {'expectation_type': 'expect_column_values_to_be_in_set',
+         'kwargs': {'column': 'country', 'value_set': ['US', 'DE', 'IN']}},
+        {'expectation_type': 'expect_column_values_to_match_regex',
+         'kwargs': {'column': 'email', 'regex': '^[^@]+@[^@]+$', 'mostly': 0.5}},
+        {'expectation_type': 'expect_column_values_to_be_of_type',
+         'kwargs': {'column': 'age', 'type_': 'int64'}, 'meta': {'severity': 'warning'}}
+    ]
+}
 
 class TestDataValidator(unittest.TestCase):
     def setUp(self):
@@ -163,5 +183,144 @@ class TestDataValidationEdgeCases(unittest.TestCase):
         # Should not fail on mixed types in non-critical columns
         self.assertTrue(result['success'])
 
+class TestRuleEngine(unittest.TestCase):
+    def setUp(self):
+        self.suite = RuleSuite.from_dict(SUITE)
+        self.df = pd.DataFrame({
+            'user_id': [1, 2, 2, None],
+            'age': [30.0, 150.0, 40.0, np.nan],
+            'country': ['US', 'FR', None, 'DE'],
+            'email': ['a@x.com', 'broken', 'c@y.org', 'd@z.net']
+        })
+    
+    def _by_type(self, evaluation):
+        return {result['expectation_type']: result for result in evaluation['results']}
+    
+    def test_column_rules(self):
+        results = self._by_type(RuleEngine(self.suite).evaluate(self.df))
+        
+        self.assertTrue(results['expect_table_row_count_to_be_between']['success'])
+        self.assertEqual(results['expect_column_values_to_not_be_null']['unexpected_count'], 1)
+        self.assertEqual(results['expect_column_values_to_be_unique']['unexpected_count'], 2)
+        self.assertEqual(results['expect_column_values_to_be_between']['unexpected_count'], 1)
+        self.assertEqual(results['expect_column_values_to_be_in_set']['unexpected_count'], 1)
+        # One of four emails fails, within mostly=0.5
+        self.assertEqual(results['expect_column_values_to_match_regex']['unexpected_count'], 1)
+        self.assertTrue(results['expect_column_values_to_match_regex']['success'])
+    
+    def test_warnings_do_not_fail_the_suite(self):
+        clean = pd.DataFrame({
+            'user_id': [1, 2],
+            'age': [30.0, 40.0],
+            'country': ['US', 'DE'],
+            'email': ['a@x.com', 'b@y.com']
+        })
+        
+        evaluation = RuleEngine(self.suite).evaluate(clean)
+        
+        self.assertTrue(evaluation['success'])
+        self.assertEqual(evaluation['statistics']['unsuccessful_expectations'], 1)
+    
+    def test_missing_column_fails_rule(self):
+        evaluation = RuleEngine(self.suite).evaluate(self.df.drop(columns=['email']))
+        
+        result = self._by_type(evaluation)['expect_column_values_to_match_regex']
+        self.assertFalse(result['success'])
+        self.assertIn('Missing column', result['message'])
+    
+    def test_unknown_expectation_rejected(self):
+        with self.assertRaises(ValueError):
+            RuleSuite.from_dict({'expectations': [{'expectation_type': 'expect_magic', 'kwargs': {}}]})
+    
+    def test_matches_great_expectations_backend(self):
+        native = RuleEngine(self.suite).evaluate(self.df)
+        backend = GreatExpectationsBackend(self.suite)
+        gx_result = backend.evaluate(self.df)
+        # The context is registered once and reused
+        backend.evaluate(self.df)
+        
+        # Great Expectations reorders its results
+        native_success = {result['expectation_type']: result['success'] for result in native['results']}
+        gx_success = {
+            result['expectation_config']['type']: result['success'] for result in gx_result['results']
+        }
+        self.assertEqual(native_success, gx_success)
+    
+    def test_validator_is_reusable(self):
+        validator = DataValidator()
+        df = pd.DataFrame({'user_id': [1, 2], 'feature_1': [0.1, 0.2], 'feature_2': [1.0, 2.0]})
+        
+        first = validate_frame(df, 't1', validator)
+        second = validate_frame(df, 't2', validator)
+        
+        self.assertTrue(first['success'])
+        self.assertTrue(second['success'])
+        self.assertEqual(second['errors'], [])
+
+class TestProfiling(unittest.TestCase):
+    def _batch(self, seed, shift=0.0, null_rate=0.0, countries=('US', 'DE', 'IN'), rows=20000):
+        rng = np.random.default_rng(seed)
+        amount = rng.normal(100 + shift, 15, rows)
+        amount[rng.random(rows) < null_rate] = np.nan
+        return pd.DataFrame({
+            'user_id': np.arange(seed * rows, (seed + 1) * rows),
+            'amount': amount,
+            'country': np.array(countries, dtype=object)[rng.integers(0, len(countries), rows)]
+        })
+    
+    def test_profile_is_one_pass_and_mergeable(self):
+        df = self._batch(0, null_rate=0.1)
+        chunked = profile_frame(df, chunk_size=3000)
+        halves = profile_frame(df.iloc[:10000]).merge(profile_frame(df.iloc[10000:]))
+        
+        for profile in (chunked, DatasetProfile.from_dict(halves.to_dict())):
+            summary = profile.summary()['columns']
+            self.assertEqual(profile.row_count, 20000)
+            self.assertAlmostEqual(summary['amount']['null_rate'], 0.1, delta=0.01)
+            self.assertAlmostEqual(summary['amount']['quantiles']['p50'], df['amount'].median(), delta=1.0)
+            self.assertAlmostEqual(summary['user_id']['distinct'], 20000, delta=1000)
+            self.assertEqual(sorted(summary['country']['histogram']['values']), ['DE', 'IN', 'US'])
+    
+    def test_sketch_size_is_constant_in_rows(self):
+        small = len(json.dumps(profile_frame(self._batch(0, rows=10000)).to_dict()))
+        large = len(json.dumps(profile_frame(self._batch(0, rows=200000)).to_dict()))
+        
+        self.assertLess(large, small * 1.5)
+    
+    def test_drift_scores(self):
+        reference = profile_frame(self._batch(0))
+        
+        same = compare_profiles(reference, profile_frame(self._batch(1)))
+        self.assertFalse(same['drift_detected'], same['columns'])
+        
+        shifted = compare_profiles(reference, profile_frame(self._batch(2, shift=20)))
+        self.assertEqual(shifted['drifted_columns'], ['amount'])
+        self.assertGreater(shifted['columns']['amount']['ks'], 0.3)
+        
+        nulls = compare_profiles(reference, profile_frame(self._batch(3, null_rate=0.3)))
+        self.assertIn('amount', nulls['drifted_columns'])
+        
+        categories = compare_profiles(reference, profile_frame(self._batch(4, countries=('US', 'BR'))))
+        self.assertIn('country', categories['drifted_columns'])
+    
+    def test_bad_batch_is_blocked_and_not_used_as_reference(self):
+        import fakeredis
+        from src.utils.redis_client import RedisClient
+        
+        redis_client = RedisClient()
+        redis_client.client = fakeredis.FakeRedis(decode_responses=True)
+        store = ProfileStore(redis_client)
+        
+        first = check_batch_drift(self._batch(0), '2024-01-01T00:00:00', store)
+        second = check_batch_drift(self._batch(1), '2024-01-01T01:00:00', store)
+        bad = check_batch_drift(self._batch(2, shift=40), '2024-01-01T02:00:00', store)
+        
+        self.assertFalse(first['drift_detected'])
+        self.assertFalse(second['drift_detected'])
+        self.assertTrue(bad['drift_detected'])
+        self.assertEqual(redis_client.client.zcard('profiles'), 2)
+        self.assertIsNotNone(store.load('2024-01-01T02:00:00'))
+        self.assertEqual(store.reference().row_count, 40000)
+
 if __name__ == '__main__':
     unittest.main()